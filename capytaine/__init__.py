@@ -25,3 +25,4 @@ from capytaine.green_functions.delhommeau import Delhommeau, XieDelhommeau
 from capytaine.post_pro.free_surfaces import FreeSurface
 
 from capytaine.io.xarray import assemble_dataset
+from capytaine.io.results_store import ResultsStore
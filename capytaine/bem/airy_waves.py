@@ -5,6 +5,7 @@
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
 import numpy as np
+from scipy.optimize import newton
 
 
 def airy_waves_potential(points, pb, convention="Nemoh"):
@@ -88,12 +89,73 @@ def airy_waves_velocity(points, pb, convention="Nemoh"):
         return v.T
 
 
-def froude_krylov_force(pb, convention="Nemoh"):
-    pressure = -1j * pb.omega * pb.rho * airy_waves_potential(pb.body.mesh.faces_centers, pb, convention=convention)
-    forces = {}
-    for dof in pb.influenced_dofs:
-        # Scalar product on each face:
-        normal_dof_amplitude_on_face = np.sum(pb.body.dofs[dof] * pb.body.mesh.faces_normals, axis=1)
-        # Sum over all faces:
-        forces[dof] = np.sum(pressure * normal_dof_amplitude_on_face * pb.body.mesh.faces_areas)
+def solve_dispersion_relation(omega, water_depth, g):
+    """Return the wavenumber of the Airy waves of angular frequency :code:`omega` in water of depth :code:`water_depth`."""
+    if water_depth == np.infty or omega**2*water_depth/g > 20:
+        return omega**2/g
+    else:
+        return newton(lambda x: x*np.tanh(x) - omega**2*water_depth/g, x0=1.0)/water_depth
+
+
+def froude_krylov_forces(body, omegas, wave_directions, *,
+                         water_depth=np.infty, rho=1000.0, g=9.81, convention="Nemoh"):
+    """Compute the Froude-Krylov forces on all the dofs of a body for all the given frequencies and wave directions.
+
+    Parameters
+    ----------
+    body: FloatingBody
+        the body, with some dofs
+    omegas: float or array of shape (n_omega)
+        angular frequencies of the incoming waves
+    wave_directions: float or array of shape (n_direction)
+        directions of propagation of the incoming waves
+    water_depth: float, optional
+        depth of the water (default: infinity)
+    rho: float, optional
+        density of the water (default: 1000.0)
+    g: float, optional
+        acceleration of gravity (default: 9.81)
+    convention: str, optional
+        convention for the incoming wave field. Accepted values: "Nemoh", "WAMIT".
+
+    Returns
+    -------
+    array of shape (n_omega, n_direction, n_dofs)
+        The Froude-Krylov forces, the dofs being in the same order as in :code:`body.dofs`.
+    """
+    assert convention.lower() in ["nemoh", "wamit"], \
+        "Convention for wave field should be either Nemoh or WAMIT."
+
+    omegas = np.atleast_1d(np.asarray(omegas, dtype=float))
+    wave_directions = np.atleast_1d(np.asarray(wave_directions, dtype=float))
+
+    mesh = body.mesh
+    x, y, z = mesh.faces_centers.T
+
+    # Normal component of each dof on each face, weighted by the area of the face.
+    if len(body.dofs) > 0:
+        dofs = np.array([dof for dof in body.dofs.values()]).reshape((len(body.dofs), mesh.nb_faces, 3))
+        normal_dofs = np.einsum('dij,ij->di', dofs, mesh.faces_normals) * mesh.faces_areas
+    else:
+        normal_dofs = np.zeros((0, mesh.nb_faces))
+
+    wbar = np.outer(np.cos(wave_directions), x) + np.outer(np.sin(wave_directions), y)  # shape (n_direction, n_faces)
+    sign = -1 if convention.lower() == "wamit" else 1
+
+    forces = np.empty((len(omegas), len(wave_directions), len(body.dofs)), dtype=complex)
+    for i, omega in enumerate(omegas):
+        k = solve_dispersion_relation(omega, water_depth, g)
+        if 0 <= k*water_depth < 20:
+            cih = np.cosh(k*(z+water_depth))/np.cosh(k*water_depth)
+        else:
+            cih = np.exp(k*z)
+        # Pressure of the incoming waves, that is -1j*omega*rho times the potential computed by airy_waves_potential.
+        pressure = -sign * rho * g * cih * np.exp(sign * 1j * k * wbar)  # shape (n_direction, n_faces)
+        forces[i, :, :] = pressure @ normal_dofs.T
     return forces
+
+
+def froude_krylov_force(pb, convention="Nemoh"):
+    forces = froude_krylov_forces(pb.body, pb.omega, pb.wave_direction,
+                                  water_depth=pb.depth, rho=pb.rho, g=pb.g, convention=convention)
+    return dict(zip(pb.influenced_dofs, forces[0, 0, :]))
@@ -7,9 +7,8 @@
 import logging
 
 import numpy as np
-from scipy.optimize import newton
 
-from capytaine.bem.airy_waves import airy_waves_velocity, froude_krylov_force
+from capytaine.bem.airy_waves import airy_waves_velocity, froude_krylov_force, solve_dispersion_relation
 
 LOG = logging.getLogger(__name__)
 
@@ -83,8 +82,8 @@ class LinearPotentialFlowProblem:
             )
 
         if self.body is not None:
-            if (any(self.body.mesh.faces_centers[:, 2] >= self.free_surface)
-                    or any(self.body.mesh.faces_centers[:, 2] <= self.sea_bottom)):
+            faces_z = self.body.mesh.faces_centers[:, 2]
+            if np.any(faces_z >= self.free_surface) or np.any(faces_z <= self.sea_bottom):
 
                 LOG.warning(
                     f"The mesh of the body {self.body.name} is not inside the domain.\n"
@@ -160,10 +159,7 @@ class LinearPotentialFlowProblem:
 
     @property
     def wavenumber(self):
-        if self.depth == np.infty or self.omega**2*self.depth/self.g > 20:
-            return self.omega**2/self.g
-        else:
-            return newton(lambda x: x*np.tanh(x) - self.omega**2*self.depth/self.g, x0=1.0)/self.depth
+        return solve_dispersion_relation(self.omega, self.depth, self.g)
 
     @property
     def wavelength(self):
@@ -310,6 +306,9 @@ class LinearPotentialFlowResult:
 
     def __getattr__(self, name):
         """Direct access to the attributes of the included problem."""
+        if name == 'problem':
+            # Not set yet, e.g. while unpickling the result.
+            raise AttributeError(f"{self.__class__} does not have a attribute named {name}.")
         try:
             return getattr(self.problem, name)
         except AttributeError:
@@ -22,7 +22,7 @@ from datetime import datetime
 
 from capytaine.green_functions.delhommeau import Delhommeau
 from capytaine.bem.engines import BasicMatrixEngine, HierarchicalToeplitzMatrixEngine
-from capytaine.io.xarray import problems_from_dataset, assemble_dataset, kochin_data_array
+from capytaine.io.xarray import ProblemsGrid, assemble_dataset, kochin_data_array
 
 LOG = logging.getLogger(__name__)
 
@@ -124,7 +124,7 @@ class BEMSolver:
         """
         return [self.solve(problem, **kwargs) for problem in sorted(problems)]
 
-    def fill_dataset(self, dataset, bodies, **kwargs):
+    def fill_dataset(self, dataset, bodies, *, store=None, **kwargs):
         """Solve a set of problems defined by the coordinates of an xarray dataset.
 
         Parameters
@@ -133,6 +133,10 @@ class BEMSolver:
             dataset containing the problems parameters: frequency, radiating_dof, water_depth, ...
         bodies : list of FloatingBody
             the bodies involved in the problems
+        store : ResultsStore, optional
+            if given, each result is written to the store as soon as it is computed, instead of being kept in memory,
+            and the problems already in the store are not solved again.
+            The returned dataset contains all the results of the store.
 
         Returns
         -------
@@ -140,17 +144,40 @@ class BEMSolver:
         """
         attrs = {'start_of_computation': datetime.now().isoformat(),
                  **self.exportable_settings}
-        problems = problems_from_dataset(dataset, bodies)
+        problems = ProblemsGrid(dataset, bodies)
+        LOG.info(f"Filling a dataset with the results of {len(problems)} problems.")
+        if store is not None:
+            return self._fill_store(problems, store, dataset, bodies, attrs, **kwargs)
         if 'theta' in dataset.coords:
             results = self.solve_all(problems, keep_details=True)
             kochin = kochin_data_array(results, dataset.coords['theta'])
             dataset = assemble_dataset(results, attrs=attrs, **kwargs)
             dataset.update(kochin)
         else:
-            results = self.solve_all(problems, keep_details=False)
+            # The problems are built, solved and read one at a time, such that they are not all kept in memory.
+            results = (self.solve(problem, keep_details=False) for problem in problems)
             dataset = assemble_dataset(results, attrs=attrs, **kwargs)
         return dataset
 
+    def _fill_store(self, problems, store, dataset, bodies, attrs, **kwargs):
+        if 'theta' in dataset.coords and not store.keep_sources:
+            raise ValueError("The computation of the Kochin function requires a store with keep_sources=True.")
+
+        nb_skipped = 0
+        for problem in problems:
+            if problem in store:
+                nb_skipped += 1
+            else:
+                store.append(self.solve(problem, keep_details=store.keep_sources))
+        if nb_skipped > 0:
+            LOG.info(f"Skipped {nb_skipped} problems already solved in {store.directory}.")
+
+        output = store.assemble_dataset(bodies, attrs=attrs, **kwargs)
+        if 'theta' in dataset.coords:
+            results = [store.result(problem) for problem in problems]
+            output.update(kochin_data_array(results, dataset.coords['theta']))
+        return output
+
     def get_potential_on_mesh(self, result, mesh, chunk_size=50):
         """Compute the potential on a mesh for the potential field of a previously solved problem.
         Since the interaction matrix does not need to be computed in full to compute the matrix-vector product,
@@ -195,7 +222,7 @@ class BEMSolver:
             phi = np.empty((mesh.nb_faces,), dtype=np.complex128)
             for i in range(0, mesh.nb_faces, chunk_size):
                 S = self.engine.build_S_matrix(
-                    mesh.extract_faces(list(range(i, i+chunk_size))),
+                    mesh.faces_view(slice(i, i+chunk_size)),
                     result.body.mesh,
                     result.free_surface, result.sea_bottom, result.wavenumber,
                     self.green_function
@@ -430,6 +430,27 @@ class FloatingBody(Abstract3DObject):
             self.clip(Plane(normal=(0, 0, -1), point=(0, 0, sea_bottom)))
         return self
 
+    def immersed_parts(self, positions, rotation_center=(0, 0, 0), **kwargs):
+        """Yield the immersed part of the body for several positions (draft, trim, heel) of the body.
+
+        The mesh is processed by :func:`capytaine.meshes.clipper.immersed_parts`
+        and the dofs are rotated and clipped accordingly.
+        """
+        from capytaine.meshes.clipper import _position_transformation
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        clipped_meshes = self.mesh.immersed_parts(positions, rotation_center=rotation_center, **kwargs)
+        for position, clipped_mesh in zip(positions, clipped_meshes):
+            matrix, vector = _position_transformation(*position, rotation_center=rotation_center)
+            ids = clipped_mesh._clipping_data['faces_ids']
+            dofs = {name: (matrix @ dof[ids].T).T.reshape(-1, 3) for name, dof in self.dofs.items()}
+            draft, trim, heel = position
+            body = FloatingBody(mesh=clipped_mesh, dofs=dofs,
+                                name=f"{self.name}_draft_{draft:g}_trim_{trim:g}_heel_{heel:g}")
+            for point_attr in ('geometric_center', 'rotation_center', 'center_of_mass'):
+                if point_attr in self.__dict__:
+                    body.__dict__[point_attr] = matrix @ self.__dict__[point_attr] + vector
+            yield body
+
     #############
     #  Display  #
     #############
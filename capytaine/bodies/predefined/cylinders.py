@@ -5,11 +5,10 @@
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
 import logging
-from itertools import product
 
 import numpy as np
 
-from capytaine.meshes.geometry import xOy_Plane, xOz_Plane, yOz_Plane, e_x, e_z, Oz_axis
+from capytaine.meshes.geometry import xOy_Plane, xOz_Plane, yOz_Plane, e_x, e_z, Oz_axis, sin_cos
 from capytaine.meshes.meshes import Mesh
 from capytaine.meshes.collections import CollectionOfMeshes
 from capytaine.meshes.symmetric import TranslationalSymmetricMesh, AxialSymmetricMesh, ReflectionSymmetricMesh
@@ -100,21 +99,13 @@ class Disk(FloatingBody):
         theta_range = np.linspace(0, 2*theta_max, ntheta+1)
         r_range = np.linspace(0.0, radius, nr+1)
 
+        sin_theta, cos_theta = sin_cos(theta_range)
         nodes = np.zeros(((ntheta+1)*(nr+1), 3), dtype=float)
-        for i, (r, t) in enumerate(product(r_range, theta_range)):
-            y = +r * np.sin(t)
-            z = -r * np.cos(t)
-            nodes[i, :] = (0, y, z)
+        nodes[:, 1] = (+r_range[:, None] * sin_theta[None, :]).ravel()
+        nodes[:, 2] = (-r_range[:, None] * cos_theta[None, :]).ravel()
 
-        panels = np.zeros((ntheta*nr, 4), dtype=int)
-
-        for k, (i, j) in enumerate(product(range(0, nr), range(0, ntheta))):
-            panels[k, :] = (
-                j+i*(ntheta+1),
-                j+1+i*(ntheta+1),
-                j+1+(i+1)*(ntheta+1),
-                j+(i+1)*(ntheta+1)
-            )
+        first_nodes = (np.arange(nr)[:, None]*(ntheta+1) + np.arange(ntheta)[None, :]).ravel()
+        panels = first_nodes[:, None] + np.array([0, 1, ntheta+2, ntheta+1])
 
         mesh = Mesh(nodes, panels, name=name)
         mesh.merge_duplicates()
@@ -196,19 +187,15 @@ class HorizontalCylinder(FloatingBody):
         X = np.array([0, self.length/nx])
 
         # Nodes
+        sin_theta, cos_theta = sin_cos(theta)
         nodes = np.zeros(((ntheta//2+1)*2, 3), dtype=float)
-
-        for i, (t, x) in enumerate(product(theta, X)):
-            y = + self.radius * np.sin(t)
-            z = - self.radius * np.cos(t)
-            nodes[i, :] = (x, y, z)
+        nodes[:, 0] = np.tile(X, ntheta//2+1)
+        nodes[:, 1] = np.repeat(+ self.radius * sin_theta, 2)
+        nodes[:, 2] = np.repeat(- self.radius * cos_theta, 2)
         nodes += -np.array([self.length/2, 0, 0])
 
         # Connectivities
-        panels = np.zeros((ntheta//2, 4), dtype=int)
-
-        for k, i in enumerate(range(0, ntheta//2)):
-            panels[k, :] = (2*i, 2*i+2, 2*i+3, 2*i+1)
+        panels = 2*np.arange(ntheta//2)[:, None] + np.array([0, 2, 3, 1])
         half_ring = Mesh(nodes, panels, name=f"half_ring_of_{name}_mesh")
 
         ring = ReflectionSymmetricMesh(half_ring, plane=xOz_Plane, name=f"ring_of_{name}_mesh")
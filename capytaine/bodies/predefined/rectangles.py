@@ -5,7 +5,6 @@
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
 import logging
-from itertools import product
 
 import numpy as np
 
@@ -109,13 +108,10 @@ class Rectangle(FloatingBody):
         Z = np.linspace(-height/2, height/2, nh+1)
 
         nodes = np.zeros(((nw+1)*(nh+1), 3), dtype=float)
-        panels = np.zeros((nw*nh, 4), dtype=int)
+        nodes[:, 1], nodes[:, 2] = (coord.ravel() for coord in np.meshgrid(Y, Z, indexing='ij'))
 
-        for i, (x, y, z) in enumerate(product([0.0], Y, Z)):
-            nodes[i, :] = x, y, z
-
-        for k, (i, j) in enumerate(product(range(0, nw), range(0, nh))):
-            panels[k, :] = (j+i*(nh+1), j+1+i*(nh+1), j+1+(i+1)*(nh+1), j+(i+1)*(nh+1))
+        first_nodes = (np.arange(nw)[:, None]*(nh+1) + np.arange(nh)[None, :]).ravel()
+        panels = first_nodes[:, None] + np.array([0, 1, nh+2, nh+1])
 
         if name is None:
             name = f"rectangle_{next(Mesh._ids)}"
@@ -5,10 +5,10 @@
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
 import logging
-from itertools import product
 
 import numpy as np
 
+from capytaine.meshes.geometry import sin_cos
 from capytaine.meshes.meshes import Mesh
 from capytaine.meshes.symmetric import AxialSymmetricMesh
 from capytaine.bodies.bodies import FloatingBody
@@ -71,21 +71,23 @@ class Sphere(FloatingBody):
         phi = np.linspace(-np.pi, np.pi, nphi+1)
 
         # Nodes
-        nodes = np.zeros(((ntheta+1)*(nphi+1), 3), dtype=float)
+        sin_theta, cos_theta = sin_cos(theta)
+        # The sign of theta below is a trick to get the correct orientation of the normal vectors...
+        # It takes at most two values, hence at most two distinct rows of angles.
+        sin_phi, cos_phi = np.empty((ntheta+1, nphi+1)), np.empty((ntheta+1, nphi+1))
+        for sign in np.unique(np.sign(theta)):
+            rows = np.sign(theta) == sign
+            sin_phi[rows, :], cos_phi[rows, :] = sin_cos(sign*phi)
 
-        for i, (t, p) in enumerate(product(theta, phi)):
-            # The sign of theta below is a trick to get the correct orientation of the normal vectors...
-            x = + np.sin(t) * np.sin(np.sign(t)*p)
-            y = + np.sin(t) * np.cos(np.sign(t)*p)
-            z = - np.cos(t)
-            nodes[i, :] = (x, y, z)
+        nodes = np.zeros(((ntheta+1)*(nphi+1), 3), dtype=float)
+        nodes[:, 0] = (+ sin_theta[:, None] * sin_phi).ravel()
+        nodes[:, 1] = (+ sin_theta[:, None] * cos_phi).ravel()
+        nodes[:, 2] = np.repeat(- cos_theta, nphi+1)
         nodes *= self.radius
 
         # Connectivity
-        panels = np.zeros((ntheta*nphi, 4), dtype=int)
-
-        for k, (i, j) in enumerate(product(range(0, ntheta), range(0, nphi))):
-            panels[k, :] = (j+i*(nphi+1), j+(i+1)*(nphi+1), j+1+(i+1)*(nphi+1), j+1+i*(nphi+1))
+        first_nodes = (np.arange(ntheta)[:, None]*(nphi+1) + np.arange(nphi)[None, :]).ravel()
+        panels = first_nodes[:, None] + np.array([0, nphi+1, nphi+2, 1])
 
         mesh = Mesh(nodes, panels, name=f"{name}_mesh")
         mesh.merge_duplicates()
@@ -11,15 +11,19 @@ MODULE GREEN_WAVE
   ! Dependancies between the functions of this module:
   ! (from top to bottom: "is called by")
   !
-  !            LAGRANGE_POLYNOMIAL_INTERPOLATION
-  !                          |
-  !              COMPUTE_INTEGRALS_WRT_THETA       (COMPUTE_ASYMPTOTIC_RANKINE_SOURCE)
-  !                        /   \                    /
-  ! WAVE_PART_INFINITE_DEPTH   WAVE_PART_FINITE_DEPTH
-  !                        \   /
-  !                  (build_matrices.f90)
-  !                          |
-  !                    (python code)
+  !                LAGRANGE_POLYNOMIAL_INTERPOLATION
+  !                              |
+  !          COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY
+  !                     /                  \
+  !    COMPUTE_INTEGRALS_WRT_THETA          \
+  !                /   \                     \
+  !               /     \  (COMPUTE_ASYMPTOTIC_RANKINE_SOURCE)
+  !              /       \  /                   \
+  ! WAVE_PART_INFINITE_DEPTH   WAVE_PART_FINITE_DEPTH   WAVE_PART_INFINITE_DEPTH_FROM_GEOMETRY
+  !                      \            |            /
+  !                             (matrices.f90)
+  !                                   |
+  !                             (python code)
 
 CONTAINS
 
@@ -71,6 +75,49 @@ CONTAINS
       (XI, XJ, wavenumber,                                       &
       tabulated_r_range, tabulated_Z_range, tabulated_integrals, &
       FS, VS)
+    ! Compute the geometric quantities r, Z and the horizontal direction between XI and XJ,
+    ! then call the subroutine below to evaluate the integrals.
+
+    ! Inputs
+    REAL(KIND=PRE), DIMENSION(3),             INTENT(IN) :: XI, XJ
+    REAL(KIND=PRE),                           INTENT(IN) :: wavenumber
+
+    ! Tabulated data
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: tabulated_r_range
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: tabulated_Z_range
+    REAL(KIND=PRE), DIMENSION(:, :, :, :),    INTENT(IN) :: tabulated_integrals
+
+    ! Outputs
+    COMPLEX(KIND=PRE),                        INTENT(OUT) :: FS  ! the integral
+    COMPLEX(KIND=PRE), DIMENSION(3),          INTENT(OUT) :: VS  ! its gradient
+
+    ! Local variables
+    REAL(KIND=PRE)               :: r, Z
+    REAL(KIND=PRE), DIMENSION(2) :: direction
+
+    r = NORM2(XI(1:2) - XJ(1:2))
+    Z = XI(3) + XJ(3)
+
+    IF (r < REAL(1e-5, KIND=PRE)) THEN
+      direction(1:2) = ZERO
+    ELSE
+      direction(1:2) = (XJ(1:2) - XI(1:2))/r
+    END IF
+
+    CALL COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY               &
+      (r, Z, direction, wavenumber,                              &
+      tabulated_r_range, tabulated_Z_range, tabulated_integrals, &
+      FS, VS)
+
+    RETURN
+  END SUBROUTINE COMPUTE_INTEGRALS_WRT_THETA
+
+  ! =====================================================================
+
+  SUBROUTINE COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY           &
+      (r, Z, direction, wavenumber,                              &
+      tabulated_r_range, tabulated_Z_range, tabulated_integrals, &
+      FS, VS)
     ! Compute the expression FS = 1/π Re[ ∫(J(ζ) - 1/ζ)dθ ] + i Re[ ∫(e^ζ)dθ ] and the integrals appearing in its gradient.
     ! For this, this function uses tabulated values of the following integrals:
     ! D1 = Re[ ∫(-i cosθ)(J(ζ) - 1/ζ)dθ ]
@@ -83,29 +130,32 @@ CONTAINS
     ! Z2 = Re[ ∫(e^ζ)dθ ]
     ! (See theory manual for the definition of the symbols above.)
 
+    ! The geometry of the pair of points is given by the horizontal distance r = |XI(1:2) - XJ(1:2)|,
+    ! the sum of the vertical coordinates Z = XI(3) + XJ(3) and the horizontal unit vector
+    ! direction = (XJ(1:2) - XI(1:2))/r (or zero if r ~ 0).
+    ! These quantities do not depend on the wavenumber and can be precomputed once for all frequencies.
+
     ! Inputs
-    REAL(KIND=PRE), DIMENSION(3),             INTENT(IN) :: XI, XJ
+    REAL(KIND=PRE),                           INTENT(IN) :: r, Z
+    REAL(KIND=PRE), DIMENSION(2),             INTENT(IN) :: direction
     REAL(KIND=PRE),                           INTENT(IN) :: wavenumber
 
     ! Tabulated data
-    REAL(KIND=PRE), DIMENSION(328),           INTENT(IN) :: tabulated_r_range
-    REAL(KIND=PRE), DIMENSION(46),            INTENT(IN) :: tabulated_Z_range
-    REAL(KIND=PRE), DIMENSION(328, 46, 2, 2), INTENT(IN) :: tabulated_integrals
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: tabulated_r_range
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: tabulated_Z_range
+    REAL(KIND=PRE), DIMENSION(:, :, :, :),    INTENT(IN) :: tabulated_integrals
 
     ! Outputs
     COMPLEX(KIND=PRE),                        INTENT(OUT) :: FS  ! the integral
     COMPLEX(KIND=PRE), DIMENSION(3),          INTENT(OUT) :: VS  ! its gradient
 
     ! Local variables
-    INTEGER        :: KI, KJ
-    REAL(KIND=PRE) :: r, dimless_r, Z, dimless_Z, R1, dimless_R1
+    INTEGER        :: KI, KJ, nb_r
+    REAL(KIND=PRE) :: dimless_r, dimless_Z, R1, dimless_R1
     REAL(KIND=PRE) :: sin_kr, cos_kr, expz_sqr
     REAL(KIND=PRE) :: D1, D2, Z1, Z2
 
-    r = NORM2(XI(1:2) - XJ(1:2))
     dimless_r = wavenumber*r
-
-    Z = XI(3) + XJ(3)
     dimless_Z = wavenumber*Z
 
     R1 = SQRT(r**2 + Z**2)
@@ -119,25 +169,29 @@ CONTAINS
     !=====================================================================================
     ! Evaluate the elementary integrals PDnX and PDnZ depending on dimless_Z and dimless_r
     !=====================================================================================
-    IF ((MINVAL(tabulated_Z_range) < dimless_Z) .AND. (dimless_Z < MAXVAL(tabulated_Z_range))) THEN
-      IF ((MINVAL(tabulated_r_range) <= dimless_r) .AND. (dimless_r < MAXVAL(tabulated_r_range))) THEN
+    ! The r axis is increasing and the Z axis is decreasing (see INITIALIZE_TABULATED_INTEGRALS),
+    ! hence their extremal values are their first and last values.
+    IF ((tabulated_Z_range(SIZE(tabulated_Z_range)) < dimless_Z) .AND. (dimless_Z < tabulated_Z_range(1))) THEN
+      IF (dimless_r < tabulated_r_range(SIZE(tabulated_r_range))) THEN
         ! Within the range of tabulated data
-        ! Note that MINVAL(tabulated_r_range) == 0, so one of the conditions is not actually useful.
 
         ! Get the nearest point in the tabulation
+        ! (see INITIALIZE_TABULATED_INTEGRALS for the definition of the axes)
         IF (dimless_r < 1) THEN
           KI = INT(5*(LOG10(dimless_r+1e-20)+6)+1)
         ELSE
-          KI = INT(3*dimless_r+28)
+          ! Regularly spaced points from the 32nd one (with default parameters: KI = INT(3*dimless_r+28))
+          nb_r = SIZE(tabulated_r_range)
+          KI = INT((dimless_r - tabulated_r_range(32))/(tabulated_r_range(nb_r) - tabulated_r_range(nb_r-1)) + 32)
         ENDIF
-        KI = MAX(MIN(KI, 327), 2)
+        KI = MAX(MIN(KI, SIZE(tabulated_r_range)-1), 2)
 
         IF (dimless_Z < -1e-2) THEN
           KJ = INT(8*(LOG10(-dimless_Z)+4.5))
         ELSE
           KJ = INT(5*(LOG10(-dimless_Z)+6))
         ENDIF
-        KJ = MAX(MIN(KJ, 45), 2)
+        KJ = MAX(MIN(KJ, SIZE(tabulated_Z_range)-1), 2)
 
         ! Interpolate near this point to get the actual value
         CALL LAGRANGE_POLYNOMIAL_INTERPOLATION                           &
@@ -146,8 +200,9 @@ CONTAINS
              tabulated_integrals(KI-1:KI+1, KJ-1:KJ+1, :, :),            &
              D1, D2, Z1, Z2)
 
-      ELSE  ! MAXVAL(tabulated_r_range) < dimless_r
+      ELSE  ! MAXVAL(tabulated_r_range) <= dimless_r
         ! Asymptotic expression for (horizontally) distant panels
+        ! (also used as a cheaper far-field approximation when the tabulation has been truncated, see delhommeau.py)
 
         expz_sqr = EXP(dimless_Z) * SQRT(2*PI/dimless_r)
         cos_kr  = COS(dimless_r - PI/4)
@@ -174,13 +229,8 @@ CONTAINS
       FS    = CMPLX(Z1/PI, Z2, KIND=PRE)
       VS(3) = CMPLX(Z1/PI, Z2, KIND=PRE)
 #endif
-      VS(1) = (XJ(1) - XI(1))/r * CMPLX(D1/PI, D2, KIND=PRE)
-      VS(2) = (XJ(2) - XI(2))/r * CMPLX(D1/PI, D2, KIND=PRE)
-
-      IF (r < REAL(1e-5, KIND=PRE)) THEN
-        ! Limit case r ~ 0 ?
-        VS(1:2) = CMPLX(0.0, 0.0, KIND=PRE)
-      END IF
+      VS(1) = direction(1) * CMPLX(D1/PI, D2, KIND=PRE)
+      VS(2) = direction(2) * CMPLX(D1/PI, D2, KIND=PRE)
 
     ELSE  ! dimless_Z < MINVAL(tabulated_Z_range) or MAXVAL(tabulated_Z_range) < dimless_Z
       FS      = CMPLX(dimless_Z/dimless_R1**3, 0.0, KIND=PRE)
@@ -188,7 +238,7 @@ CONTAINS
     ENDIF
 
     RETURN
-  END SUBROUTINE COMPUTE_INTEGRALS_WRT_THETA
+  END SUBROUTINE COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY
 
   ! =========================
 
@@ -205,9 +255,9 @@ CONTAINS
     REAL(KIND=PRE), DIMENSION(3),             INTENT(IN)  :: X0J   ! Coordinates of the center of the integration panel
 
     ! Tabulated data
-    REAL(KIND=PRE), DIMENSION(328),           INTENT(IN) :: X_AXIS
-    REAL(KIND=PRE), DIMENSION(46),            INTENT(IN) :: Z_AXIS
-    REAL(KIND=PRE), DIMENSION(328, 46, 2, 2), INTENT(IN) :: TABULATION
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: X_AXIS
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: Z_AXIS
+    REAL(KIND=PRE), DIMENSION(:, :, :, :),    INTENT(IN) :: TABULATION
 
     ! Outputs
     COMPLEX(KIND=PRE),               INTENT(OUT) :: SP  ! Integral of the Green function over the panel.
@@ -229,6 +279,45 @@ CONTAINS
     RETURN
   END SUBROUTINE WAVE_PART_INFINITE_DEPTH
 
+  ! =========================
+
+  SUBROUTINE WAVE_PART_INFINITE_DEPTH_FROM_GEOMETRY &
+      (wavenumber, r, Z, direction,                 &
+      X_AXIS, Z_AXIS, TABULATION,                   &
+      SP, VSP)
+    ! Same as above, but the geometry of the pair of points (see COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY)
+    ! is given as input instead of the coordinates of the points.
+
+    ! Inputs
+    REAL(KIND=PRE),                           INTENT(IN)  :: wavenumber
+    REAL(KIND=PRE),                           INTENT(IN)  :: r, Z
+    REAL(KIND=PRE), DIMENSION(2),             INTENT(IN)  :: direction
+
+    ! Tabulated data
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: X_AXIS
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: Z_AXIS
+    REAL(KIND=PRE), DIMENSION(:, :, :, :),    INTENT(IN) :: TABULATION
+
+    ! Outputs
+    COMPLEX(KIND=PRE),               INTENT(OUT) :: SP  ! Integral of the Green function over the panel.
+    COMPLEX(KIND=PRE), DIMENSION(3), INTENT(OUT) :: VSP ! Gradient of the integral of the Green function with respect to X0I.
+
+    ! Local variables
+    REAL(KIND=PRE), DIMENSION(3) :: XI_MINUS_XJ_REFLECTION
+
+    ! The integrals
+    CALL COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY(r, Z, direction, wavenumber, X_AXIS, Z_AXIS, TABULATION, SP, VSP(:))
+    SP  = 2*wavenumber*SP
+    VSP = 2*wavenumber**2*VSP
+
+    ! Only one singularity is missing in the derivative
+    XI_MINUS_XJ_REFLECTION(1:2) = -r*direction(1:2)
+    XI_MINUS_XJ_REFLECTION(3) = Z
+    VSP = VSP - 2*XI_MINUS_XJ_REFLECTION/(NORM2(XI_MINUS_XJ_REFLECTION)**3)
+
+    RETURN
+  END SUBROUTINE WAVE_PART_INFINITE_DEPTH_FROM_GEOMETRY
+
   ! ======================
 
   SUBROUTINE WAVE_PART_FINITE_DEPTH &
@@ -243,9 +332,9 @@ CONTAINS
     REAL(KIND=PRE), DIMENSION(3),             INTENT(IN) :: X0I  ! Coordinates of the source point
     REAL(KIND=PRE), DIMENSION(3),             INTENT(IN) :: X0J  ! Coordinates of the center of the integration panel
 
-    REAL(KIND=PRE), DIMENSION(328),           INTENT(IN) :: X_AXIS
-    REAL(KIND=PRE), DIMENSION(46),            INTENT(IN) :: Z_AXIS
-    REAL(KIND=PRE), DIMENSION(328, 46, 2, 2), INTENT(IN) :: TABULATION
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: X_AXIS
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: Z_AXIS
+    REAL(KIND=PRE), DIMENSION(:, :, :, :),    INTENT(IN) :: TABULATION
 
     INTEGER,                                  INTENT(IN) :: NEXP
     REAL(KIND=PRE), DIMENSION(NEXP),          INTENT(IN) :: AMBDA, AR
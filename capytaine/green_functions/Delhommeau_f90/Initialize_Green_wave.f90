@@ -68,11 +68,18 @@ CONTAINS
 
 !------------------------------------------------------------------------------
 
-  SUBROUTINE INITIALIZE_TABULATED_INTEGRALS(NB_POINTS_X, NB_POINTS_Z, NB_INTEGRATION_POINTS, X, Z, TABULATION)
+  SUBROUTINE INITIALIZE_TABULATED_INTEGRALS(NB_POINTS_X, NB_POINTS_Z, X_MAX, Z_MIN, NB_INTEGRATION_POINTS, X, Z, TABULATION)
     ! Compute the tabulated integrals for the wave part of the Green function.
     ! These tables are independant of the mesh and of the frequency.
     ! They are only initialised once at the beginning of the program.
 
+    ! The X axis is logarithmically spaced from 1e-6 to 1 (points 2 to 31, after X(1) = 0),
+    ! then regularly spaced from 4/3 to X_MAX (points 32 to NB_POINTS_X).
+    ! The Z axis is logarithmically spaced from -1e-6 (points 1 to NB_POINTS_Z-1), and its last point is Z_MIN.
+    ! The indices of the points are retrieved from these formulas in COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY,
+    ! so that NB_POINTS_X should be larger than 33 and Z_MIN should be lower than Z(NB_POINTS_Z-1).
+    ! Nemoh's original tabulation is NB_POINTS_X = 328, X_MAX = 100, NB_POINTS_Z = 46 and Z_MIN = -16.
+
     ! References:
     ! [1] Delhommeau, Amélioration des codes de calcul de diffraction-radiation, 2èmes journées de l'hydrodynamique, 1989
     ! [2] Babarit and Delhommeau, Theoretical and numerical aspects of the open source BEM solver NEMOH, EWTEC 2015
@@ -80,9 +87,11 @@ CONTAINS
     !                 function for the wave-structure interaction problem, Applied Ocean Research, 2018
 
     ! Inputs
-    INTEGER, INTENT(IN) :: NB_POINTS_X     != 328
-    INTEGER, INTENT(IN) :: NB_POINTS_Z     != 46
-    INTEGER, INTENT(IN) :: NB_INTEGRATION_POINTS
+    INTEGER,        INTENT(IN) :: NB_POINTS_X     != 328
+    INTEGER,        INTENT(IN) :: NB_POINTS_Z     != 46
+    REAL(KIND=PRE), INTENT(IN) :: X_MAX           != 100.0
+    REAL(KIND=PRE), INTENT(IN) :: Z_MIN           != -16.0
+    INTEGER,        INTENT(IN) :: NB_INTEGRATION_POINTS
 
     ! Outputs
     REAL(KIND=PRE), DIMENSION(NB_POINTS_X),                    INTENT(OUT) :: X
@@ -96,17 +105,18 @@ CONTAINS
     COMPLEX(KIND=PRE) :: JZETA, ZETA, EXPZETA
 
     ! Initialize Z axis
-    DO J = 1, NB_POINTS_Z
-      Z(J) = -AMIN1(10**(J/5.0-6), 10**(J/8.0-4.5), 16.)
+    DO J = 1, NB_POINTS_Z-1
+      Z(J) = -AMIN1(10**(J/5.0-6), 10**(J/8.0-4.5))
     END DO
+    Z(NB_POINTS_Z) = Z_MIN
 
     ! Initialize X axis
     X(1) = 0.0
     DO I = 2, NB_POINTS_X
-      IF (I < 40) THEN
-        X(I) = AMIN1(10**((I-1.0)/5-6), 4.0/3.0 + ABS(I-32)/3.0)
+      IF (I < 32) THEN
+        X(I) = 10**((I-1.0)/5-6)
       ELSE
-        X(I) = 4.0/3.0 + ABS(I-32)/3.0
+        X(I) = 4.0/3.0 + (I-32)*(X_MAX - 4.0/3.0)/(NB_POINTS_X - 32)
       ENDIF
     END DO
 
@@ -67,6 +67,10 @@ CONTAINS
       wavenumber, depth,                 &
       XR, XZ, APD,                       &
       NEXP, AMBDA, AR,                   &
+      use_pairs_geometry,                &
+      geom_nb_faces_1, geom_nb_faces_2,  &
+      geom_nb_quad_points,               &
+      pairs_geometry,                    &
       coeff,                             &
       same_body,                         &
       S, K)
@@ -82,14 +86,21 @@ CONTAINS
     REAL(KIND=PRE),                           INTENT(IN) :: wavenumber, depth
 
     ! Tabulated integrals
-    REAL(KIND=PRE), DIMENSION(328),           INTENT(IN) :: XR
-    REAL(KIND=PRE), DIMENSION(46),            INTENT(IN) :: XZ
-    REAL(KIND=PRE), DIMENSION(328, 46, 2, 2), INTENT(IN) :: APD
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: XR
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: XZ
+    REAL(KIND=PRE), DIMENSION(:, :, :, :),    INTENT(IN) :: APD
 
     ! Prony decomposition for finite depth
     INTEGER,                                  INTENT(IN) :: NEXP
     REAL(KIND=PRE), DIMENSION(NEXP),          INTENT(IN) :: AMBDA, AR
 
+    ! Precomputed geometry of the pairs of points (see COMPUTE_INTEGRALS_WRT_THETA_FROM_GEOMETRY)
+    ! Only used in infinite depth, and only if use_pairs_geometry is true.
+    ! Otherwise, the array is a dummy that won't be read.
+    LOGICAL,                                  INTENT(IN) :: use_pairs_geometry
+    INTEGER,                                  INTENT(IN) :: geom_nb_faces_1, geom_nb_faces_2, geom_nb_quad_points
+    REAL(KIND=PRE), DIMENSION(4, geom_nb_quad_points, geom_nb_faces_2, geom_nb_faces_1), INTENT(IN) :: pairs_geometry
+
     REAL(KIND=PRE), INTENT(IN) :: coeff
 
     ! Trick to save some time
@@ -114,7 +125,17 @@ CONTAINS
         !$OMP PARALLEL DO PRIVATE(J, SP2, VSP2_SYM, VSP2_ANTISYM)
         DO J = I, nb_faces_2
 
-          IF (depth == INFINITE_DEPTH) THEN
+          IF ((depth == INFINITE_DEPTH) .AND. use_pairs_geometry) THEN
+            CALL WAVE_PART_INFINITE_DEPTH_FROM_GEOMETRY &
+              (wavenumber,                              &
+              pairs_geometry(1, 1, J, I),               &
+              pairs_geometry(2, 1, J, I),               &
+              pairs_geometry(3:4, 1, J, I),             &
+              XR, XZ, APD,                              &
+              SP2, VSP2_SYM                             &
+              )
+            VSP2_ANTISYM(:) = ZERO
+          ELSE IF (depth == INFINITE_DEPTH) THEN
             CALL WAVE_PART_INFINITE_DEPTH &
               (wavenumber,                &
               centers_1(I, :),            &
@@ -157,7 +178,17 @@ CONTAINS
         !$OMP PARALLEL DO PRIVATE(J, SP2, VSP2_SYM, VSP2_ANTISYM)
         DO J = 1, nb_faces_2
           DO Q = 1, nb_quad_points
-            IF (depth == INFINITE_DEPTH) THEN
+            IF ((depth == INFINITE_DEPTH) .AND. use_pairs_geometry) THEN
+              CALL WAVE_PART_INFINITE_DEPTH_FROM_GEOMETRY &
+                (wavenumber,                              &
+                pairs_geometry(1, Q, J, I),               &
+                pairs_geometry(2, Q, J, I),               &
+                pairs_geometry(3:4, Q, J, I),             &
+                XR, XZ, APD,                              &
+                SP2, VSP2_SYM                             &
+                )
+              VSP2_ANTISYM(:) = ZERO
+            ELSE IF (depth == INFINITE_DEPTH) THEN
               CALL WAVE_PART_INFINITE_DEPTH &
                 (wavenumber,                &
                 centers_1(I, :),            &
@@ -201,6 +232,9 @@ CONTAINS
       coeffs,                                         &
       XR, XZ, APD,                                    &
       NEXP, AMBDA, AR,                                &
+      use_pairs_geometry,                             &
+      geom_nb_faces_1, geom_nb_faces_2,               &
+      geom_nb_quad_points, pairs_geometry,            &
       same_body,                                      &
       S, K)
 
@@ -223,14 +257,19 @@ CONTAINS
     REAL(KIND=PRE), DIMENSION(3) :: coeffs
 
     ! Tabulated integrals
-    REAL(KIND=PRE), DIMENSION(328),           INTENT(IN) :: XR
-    REAL(KIND=PRE), DIMENSION(46),            INTENT(IN) :: XZ
-    REAL(KIND=PRE), DIMENSION(328, 46, 2, 2), INTENT(IN) :: APD
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: XR
+    REAL(KIND=PRE), DIMENSION(:),             INTENT(IN) :: XZ
+    REAL(KIND=PRE), DIMENSION(:, :, :, :),    INTENT(IN) :: APD
 
     ! Prony decomposition for finite depth
     INTEGER,                                  INTENT(IN) :: NEXP
     REAL(KIND=PRE), DIMENSION(NEXP),          INTENT(IN) :: AMBDA, AR
 
+    ! Precomputed geometry of the pairs of points for the wave part (optional)
+    LOGICAL,                                  INTENT(IN) :: use_pairs_geometry
+    INTEGER,                                  INTENT(IN) :: geom_nb_faces_1, geom_nb_faces_2, geom_nb_quad_points
+    REAL(KIND=PRE), DIMENSION(4, geom_nb_quad_points, geom_nb_faces_2, geom_nb_faces_1), INTENT(IN) :: pairs_geometry
+
     ! Output
     COMPLEX(KIND=PRE), DIMENSION(nb_faces_1, nb_faces_2), INTENT(OUT) :: S
     COMPLEX(KIND=PRE), DIMENSION(nb_faces_1, nb_faces_2), INTENT(OUT) :: K
@@ -305,6 +344,10 @@ CONTAINS
         wavenumber, depth,                 &
         XR, XZ, APD,                       &
         NEXP, AMBDA, AR,                   &
+        use_pairs_geometry,                &
+        geom_nb_faces_1, geom_nb_faces_2,  &
+        geom_nb_quad_points,               &
+        pairs_geometry,                    &
         coeffs(3),                         &
         same_body,                         &
         S, K)
@@ -10,7 +10,11 @@ from functools import lru_cache
 import numpy as np
 
 from capytaine.tools.prony_decomposition import exponential_decomposition, error_exponential_decomposition
+from capytaine.tools.lru_cache import delete_first_lru_cache
+from capytaine.tools.disk_cache import cache_directory, load_arrays, save_arrays
 
+from capytaine.meshes.meshes import FacesView
+from capytaine.meshes.collections import CollectionOfMeshes
 from capytaine.green_functions.abstract_green_function import AbstractGreenFunction
 import capytaine.green_functions.Delhommeau_f90 as Delhommeau_f90
 import capytaine.green_functions.XieDelhommeau_f90 as XieDelhommeau_f90
@@ -23,13 +27,48 @@ class Delhommeau(AbstractGreenFunction):
 
     Parameters
     ----------
+    tabulation_nr: int, optional
+        Number of points of the tabulation along the dimensionless horizontal distance :math:`kr`.
+        The first 32 points are logarithmically spaced in :math:`[0, 1]`, the others are regularly spaced
+        up to :code:`tabulation_rmax`. Should be larger than 33. (default: 328)
+    tabulation_rmax: float, optional
+        Largest value of :math:`kr` in the tabulation.
+        Beyond this value, an asymptotic approximation is used. (default: 100.0)
+    tabulation_nz: int, optional
+        Number of points of the tabulation along the dimensionless vertical coordinate :math:`kz`.
+        The points are logarithmically spaced, except for the last one which is :code:`tabulation_zmin`. (default: 46)
+    tabulation_zmin: float, optional
+        Lowest value of :math:`kz` in the tabulation.
+        Below this value, an asymptotic approximation is used. (default: -16.0)
+    far_field_kr: float, optional
+        Dimensionless horizontal distance :math:`kr` beyond which the wave part of the Green function
+        is computed with its asymptotic expression for distant panels instead of the interpolation of the tabulation.
+        Lower values are faster (typically for arrays of distant bodies) but less accurate:
+        the relative error of the asymptotic expression on the oscillating part of the Green function
+        is of the order of :math:`1/(8 kr)`, that is about 1% for :code:`far_field_kr=10`.
+        Should be at least the 34th tabulated value of :math:`kr`, that is 2 with the default tabulation.
+        (default: None, that is :code:`tabulation_rmax`)
     tabulation_nb_integration_points: int, optional
         Number of points for the evaluation of the tabulated elementary integrals w.r.t. :math:`theta`
         used for the computation of the Green function (default: 251)
+    cache_dir: string, optional
+        Directory in which the tabulated integrals and the Prony decompositions are stored,
+        such that they are computed only once for all Python processes.
+        If None (default), the environment variable :code:`CAPYTAINE_CACHE_DIR` is used if it is defined,
+        otherwise these data are only kept in memory.
+        See :func:`capytaine.tools.disk_cache.cache_directory`.
     finite_depth_prony_decomposition_method: string, optional
         The implementation of the Prony decomposition used to compute the finite depth Green function.
-        Accepted values: :code:`'fortran'` for Nemoh's implementation (by default), :code:`'python'` for an experimental Python implementation.
+        Accepted values: :code:`'fortran'` for Nemoh's implementation (by default), :code:`'python'` for an experimental Python implementation,
+        :code:`'table'` for a linear fit with fixed growth rates, computed from a precomputed least-squares operator.
         See :func:`find_best_exponential_decomposition`.
+    pairs_geometry_cache_size: int, optional
+        If strictly positive, the wavenumber-independent data of the infinite depth Green function
+        (geometry of the pairs of panels and Rankine part of the matrices) are computed once for each pair of meshes
+        and reused for all the wavenumbers. This value is the number of pairs of meshes kept in cache.
+        The cache uses memory of the order of 6 times the size of a real-valued influence matrix.
+        (default: 0, that is no cache)
+        See :func:`compute_pairs_geometry`.
 
     Attributes
     ----------
@@ -39,21 +78,60 @@ class Delhommeau(AbstractGreenFunction):
 
     fortran_core = Delhommeau_f90
 
-    build_tabulated_integrals = lru_cache(maxsize=1)(Delhommeau_f90.initialize_green_wave.initialize_tabulated_integrals)
-
     def __init__(self, *,
+                 tabulation_nr=328,
+                 tabulation_rmax=100.0,
+                 tabulation_nz=46,
+                 tabulation_zmin=-16.0,
+                 far_field_kr=None,
                  tabulation_nb_integration_points=251,
+                 cache_dir=None,
                  finite_depth_prony_decomposition_method='fortran',
+                 pairs_geometry_cache_size=0,
                  ):
 
-        self.tabulated_integrals = self.__class__.build_tabulated_integrals(328, 46, tabulation_nb_integration_points)
+        self.cache_dir = cache_directory(cache_dir)
+
+        if tabulation_nr < 34:
+            raise ValueError(f"The tabulation should have at least 34 points along r (got {tabulation_nr}).")
+        if tabulation_rmax <= 4/3:
+            raise ValueError(f"The tabulation should extend beyond r=4/3 (got tabulation_rmax={tabulation_rmax}).")
+        if tabulation_nz < 4 or tabulation_zmin >= -min(10**((tabulation_nz-1)/5-6), 10**((tabulation_nz-1)/8-4.5)):
+            raise ValueError(f"The tabulation parameters tabulation_nz={tabulation_nz} and tabulation_zmin={tabulation_zmin} are not compatible.")
+
+        self.tabulated_integrals = self.__class__.build_tabulated_integrals(
+            tabulation_nr, float(tabulation_rmax), tabulation_nz, float(tabulation_zmin),
+            tabulation_nb_integration_points, self.cache_dir)
+
+        if far_field_kr is not None:
+            # The Fortran code uses the asymptotic expression beyond the last tabulated value of kr,
+            # so the tabulation is truncated at the requested distance.
+            r_range, z_range, integrals = self.tabulated_integrals
+            nb_r = np.searchsorted(r_range, far_field_kr, side='right')
+            if nb_r < 34:
+                raise ValueError(f"The far field approximation can not be used for kr < {r_range[33]:.4g} "
+                                 f"with this tabulation (got far_field_kr={far_field_kr}).")
+            self.tabulated_integrals = (r_range[:nb_r].copy(), z_range, np.asfortranarray(integrals[:nb_r, ...]))
 
         self.finite_depth_prony_decomposition_method = finite_depth_prony_decomposition_method
 
+        self.pairs_geometry_cache_size = pairs_geometry_cache_size
+        if pairs_geometry_cache_size > 0:
+            # The quadrature of the source mesh is part of the key of the cache,
+            # since it is ignored by the hash and the equality of the meshes.
+            self._cached_pairs_geometry = delete_first_lru_cache(maxsize=pairs_geometry_cache_size)(
+                lambda mesh1, mesh2, quadrature: self.compute_pairs_geometry(mesh1, mesh2))
+
         self.exportable_settings = {
             'green_function': self.__class__.__name__,
+            'tabulation_nr': tabulation_nr,
+            'tabulation_rmax': tabulation_rmax,
+            'tabulation_nz': tabulation_nz,
+            'tabulation_zmin': tabulation_zmin,
+            'far_field_kr': tabulation_rmax if far_field_kr is None else far_field_kr,
             'tabulation_nb_integration_points': tabulation_nb_integration_points,
             'finite_depth_prony_decomposition_method': finite_depth_prony_decomposition_method,
+            'pairs_geometry_cache_size': pairs_geometry_cache_size,
         }
 
         self._hash = hash(self.exportable_settings.values())
@@ -61,7 +139,36 @@ class Delhommeau(AbstractGreenFunction):
     def __hash__(self):
         return self._hash
 
-    @lru_cache(maxsize=128)
+    @classmethod
+    @lru_cache(maxsize=2)
+    def build_tabulated_integrals(cls, nr, rmax, nz, zmin, nb_integration_points, cache_dir=None):
+        """Compute the tabulated integrals, or load them from the cache directory if they have already been computed.
+        Results are also cached in memory.
+
+        Parameters
+        ----------
+        nr, rmax, nz, zmin, nb_integration_points:
+            parameters of the tabulation (see the documentation of the class)
+        cache_dir: string, optional
+            directory where the tabulation is stored (if None, the tabulation is not stored on disk)
+
+        Returns
+        -------
+        3-ple of arrays
+            the tabulated values of :math:`kr` and :math:`kz`, and the tabulated integrals
+        """
+        filename = f"{cls.fortran_core.__name__.split('.')[-1]}_tabulation_{nr}_{rmax!r}_{nz}_{zmin!r}_{nb_integration_points}.npz"
+        cached = load_arrays(cache_dir, filename)
+        if cached is not None:
+            return cached["r_range"], cached["z_range"], np.asfortranarray(cached["integrals"])
+
+        LOG.debug("\tCompute tabulated integrals for the Green function with nr=%d, rmax=%.1f, nz=%d, zmin=%.1f",
+                  nr, rmax, nz, zmin)
+        r_range, z_range, integrals = cls.fortran_core.initialize_green_wave.initialize_tabulated_integrals(
+            nr, nz, rmax, zmin, nb_integration_points)
+        save_arrays(cache_dir, filename, r_range=r_range, z_range=z_range, integrals=integrals)
+        return r_range, z_range, integrals
+
     def find_best_exponential_decomposition(self, dimensionless_omega, dimensionless_wavenumber):
         """Compute the decomposition of a part of the finite depth Green function as a sum of exponential functions.
 
@@ -70,7 +177,14 @@ class Delhommeau(AbstractGreenFunction):
         Until the problem is better understood, the Fortran implementation is the default one, to ensure consistency with Nemoh.
         The Fortran version is also significantly faster...
 
-        Results are cached.
+        A third method, :code:`'table'`, does not perform any nonlinear fit: the growth rates of the exponentials are fixed
+        (see :data:`PRONY_TABLE_LAMDA`) and the amplitudes are the least-squares fit of the function sampled on a fixed grid,
+        that is a single matrix-vector product with a precomputed pseudo-inverse.
+        The amplitudes then vary smoothly with the frequency and the depth.
+        For :math:`kh < 0.2`, where the fit with fixed growth rates is not accurate enough, the Fortran implementation is used instead.
+
+        Results are cached in memory (for all the instances of the class) and,
+        if a cache directory has been set, on disk (for all Python processes).
 
         Parameters
         ----------
@@ -78,56 +192,21 @@ class Delhommeau(AbstractGreenFunction):
             dimensionless angular frequency: :math:`kh \\tanh (kh) = \\omega^2 h/g`
         dimensionless_wavenumber: float
             dimensionless wavenumber: :math:`kh`
-        method: string, optional
-            the implementation that should be used to compute the Prony decomposition
 
         Returns
         -------
         Tuple[np.ndarray, np.ndarray]
             the amplitude and growth rates of the exponentials
         """
-
-        LOG.debug(f"\tCompute Prony decomposition in finite depth Green function "
-                  f"for dimless_omega=%.2e and dimless_wavenumber=%.2e",
-                  dimensionless_omega, dimensionless_wavenumber)
-
-        if self.finite_depth_prony_decomposition_method.lower() == 'python':
-            # The function that will be approximated.
-            @np.vectorize
-            def f(x):
-                return Delhommeau_f90.initialize_green_wave.ff(x, dimensionless_omega, dimensionless_wavenumber)
-
-            # Try different increasing number of exponentials
-            for n_exp in range(4, 31, 2):
-
-                # The coefficients are computed on a resolution of 4*n_exp+1 ...
-                X = np.linspace(-0.1, 20.0, 4*n_exp+1)
-                a, lamda = exponential_decomposition(X, f(X), n_exp)
-
-                # ... and they are evaluated on a finer discretization.
-                X = np.linspace(-0.1, 20.0, 8*n_exp+1)
-                if error_exponential_decomposition(X, f(X), a, lamda) < 1e-4:
-                    break
-
-            else:
-                LOG.warning("No suitable exponential decomposition has been found"
-                            "for dimless_omega=%.2e and dimless_wavenumber=%.2e",
-                            dimensionless_omega, dimensionless_wavenumber)
-
-        elif self.finite_depth_prony_decomposition_method.lower() == 'fortran':
-            lamda, a, nexp = Delhommeau_f90.old_prony_decomposition.lisc(dimensionless_omega, dimensionless_wavenumber)
-            lamda = lamda[:nexp]
-            a = a[:nexp]
-
-        else:
+        method = self.finite_depth_prony_decomposition_method.lower()
+        if method not in ('python', 'fortran', 'table'):
             raise ValueError("Unrecognized method name for the Prony decomposition.")
-
-        # Add one more exponential function (actually a constant).
-        # It is not clear where it comes from exactly in the theory...
-        a = np.concatenate([a, np.array([2])])
-        lamda = np.concatenate([lamda, np.array([0.0])])
-
-        return a, lamda
+        if method == 'table':
+            # Cheaper to recompute than to read from the disk.
+            cache_dir = None
+        else:
+            cache_dir = self.cache_dir
+        return _cached_exponential_decomposition(method, float(dimensionless_omega), float(dimensionless_wavenumber), cache_dir)
 
     def evaluate(self, mesh1, mesh2, free_surface=0.0, sea_bottom=-np.infty, wavenumber=1.0):
         r"""The main method of the class, called by the engine to assemble the influence matrices.
@@ -169,6 +248,14 @@ class Delhommeau(AbstractGreenFunction):
             else:
                 coeffs = np.array((1.0, -1.0, 1.0))
 
+                if self.pairs_geometry_cache_size > 0 and _is_full_mesh(mesh1) and _is_full_mesh(mesh2):
+                    pairs_geometry, rankine_S, rankine_K = self._cached_pairs_geometry(mesh1, mesh2, _quadrature_key(mesh2))
+                    S, K = self._build_matrices(mesh1, mesh2, wavenumber, depth, np.array((0.0, 0.0, 1.0)),
+                                                a_exp, lamda_exp, pairs_geometry=pairs_geometry)
+                    S += rankine_S
+                    K += rankine_K
+                    return S, K
+
         else:  # Finite depth
             a_exp, lamda_exp = self.find_best_exponential_decomposition(
                 wavenumber*depth*np.tanh(wavenumber*depth),
@@ -181,7 +268,67 @@ class Delhommeau(AbstractGreenFunction):
             else:
                 coeffs = np.array((1.0, 1.0, 1.0))
 
-        # Main call to Fortran code
+        return self._build_matrices(mesh1, mesh2, wavenumber, depth, coeffs, a_exp, lamda_exp)
+
+    def compute_pairs_geometry(self, mesh1, mesh2):
+        """Compute the data of the infinite depth Green function that depend on the meshes but not on the wavenumber.
+        When :code:`pairs_geometry_cache_size` is strictly positive, the result is cached by :meth:`evaluate`
+        for each pair of meshes and quadrature of the source mesh, and reused for all the wavenumbers.
+        The cache is not used for the views on a few faces of a mesh (such as the rows and columns of the ACA),
+        which would evict the full blocks from the cache.
+
+        Parameters
+        ----------
+        mesh1: Mesh or CollectionOfMeshes
+            mesh of the receiving body (where the potential is measured)
+        mesh2: Mesh or CollectionOfMeshes
+            mesh of the source body (over which the source distribution is integrated)
+
+        Returns
+        -------
+        pairs_geometry: array of shape (mesh1.nb_faces, mesh2.nb_faces, nb_quadrature_points, 4)
+            for each pair of a collocation point of mesh1 and a quadrature point of mesh2,
+            the horizontal distance, the sum of the vertical coordinates and the horizontal unit vector between the two points
+        rankine_S, rankine_K: arrays of shape (mesh1.nb_faces, mesh2.nb_faces)
+            the Rankine and reflected Rankine parts of the matrices :math:`S` and :math:`K`
+        """
+        LOG.debug("\tPrecompute the geometry of the pairs of faces of %s and %s", mesh1.name, mesh2.name)
+
+        centers = mesh1.faces_centers
+        quad_points, _ = mesh2.quadrature_points
+
+        horizontal_vectors = quad_points[np.newaxis, :, :, 0:2] - centers[:, np.newaxis, np.newaxis, 0:2]
+        r = np.linalg.norm(horizontal_vectors, axis=-1)
+
+        pairs_geometry = np.empty(r.shape + (4,))
+        pairs_geometry[..., 0] = r
+        pairs_geometry[..., 1] = centers[:, np.newaxis, np.newaxis, 2] + quad_points[np.newaxis, :, :, 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pairs_geometry[..., 2:4] = horizontal_vectors / r[..., np.newaxis]
+        pairs_geometry[r < 1e-5, 2:4] = 0.0
+
+        dummy = np.empty(1)
+        rankine_S, rankine_K = self._build_matrices(mesh1, mesh2, 1.0, np.infty, np.array((1.0, -1.0, 0.0)),
+                                                    dummy, dummy, same_body=False)
+
+        return pairs_geometry, rankine_S.real, rankine_K.real
+
+    def _build_matrices(self, mesh1, mesh2, wavenumber, depth, coeffs, a_exp, lamda_exp,
+                        pairs_geometry=None, same_body=None):
+        """Main call to the Fortran code."""
+        if same_body is None:
+            same_body = mesh1 is mesh2
+
+        if pairs_geometry is None:
+            use_pairs_geometry = False
+            pairs_geometry = np.empty((1, 1, 1, 4))  # Dummy array that won't be used by the fortran code.
+        else:
+            use_pairs_geometry = True
+            nb_quadrature_points = mesh2.quadrature_points[0].shape[1]
+            if pairs_geometry.shape[:3] != (mesh1.nb_faces, mesh2.nb_faces, nb_quadrature_points):
+                raise ValueError(f"The geometry of the pairs of faces of shape {pairs_geometry.shape[:3]} does not match "
+                                 f"the meshes and their quadrature {(mesh1.nb_faces, mesh2.nb_faces, nb_quadrature_points)}.")
+
         return self.fortran_core.matrices.build_matrices(
             mesh1.faces_centers, mesh1.faces_normals,
             mesh2.vertices,      mesh2.faces + 1,
@@ -192,9 +339,21 @@ class Delhommeau(AbstractGreenFunction):
             coeffs,
             *self.tabulated_integrals,
             lamda_exp, a_exp,
-            mesh1 is mesh2
+            use_pairs_geometry, pairs_geometry.T,  # Transposed to be a Fortran-ordered array without copy.
+            same_body
         )
 
+def _is_full_mesh(mesh):
+    """Whether the mesh is worth caching the geometry of its pairs of faces, that is, not a view on some faces of a mesh."""
+    return not isinstance(mesh, FacesView)
+
+def _quadrature_key(mesh):
+    """The quadrature methods of the mesh, on which the geometry of the pairs of faces depends."""
+    if isinstance(mesh, CollectionOfMeshes):
+        return tuple(_quadrature_key(submesh) for submesh in mesh)
+    else:
+        return mesh.quadrature_method
+
 ################################
 
 class XieDelhommeau(Delhommeau):
@@ -204,4 +363,120 @@ class XieDelhommeau(Delhommeau):
     """
 
     fortran_core = XieDelhommeau_f90
-    build_tabulated_integrals = lru_cache(maxsize=1)(XieDelhommeau_f90.initialize_green_wave.initialize_tabulated_integrals)
+
+################################
+
+def ff(x, dimensionless_omega, dimensionless_wavenumber):
+    """The function that is approximated by a sum of exponentials in the finite depth Green function.
+
+    Vectorized Python port of the function FF from the Fortran module Initialize_Green_wave.f90.
+
+    Parameters
+    ----------
+    x: float or array of floats
+        points at which the function is evaluated
+    dimensionless_omega: float
+        dimensionless angular frequency: :math:`kh \\tanh (kh) = \\omega^2 h/g`
+    dimensionless_wavenumber: float
+        dimensionless wavenumber: :math:`kh`
+
+    Returns
+    -------
+    float or array of floats
+    """
+    ak, am = dimensionless_omega, dimensionless_wavenumber
+    x = np.asarray(x, dtype=np.float64)
+
+    coef = (am + ak)**2/(am**2 - ak**2 + ak)
+
+    def g(t):
+        return (t + ak)*np.exp(t)/(t*np.sinh(t) - ak*np.cosh(t)) - coef/(t - am) - 2
+
+    # Near the singularity in x = am, the function is approximated by a quadratic interpolation.
+    tol = max(0.1, 0.1*am)
+    a, b, c = am - tol, am, am + tol
+    d = g(a)
+    e = coef/(am + ak)*(am + ak + 1) - (coef/(am + ak))**2*am - 2
+    f = g(c)
+    near_singularity = d*(x - b)*(x - c)/((a - b)*(a - c)) \
+                     + e*(x - c)*(x - a)/((b - c)*(b - a)) \
+                     + f*(x - a)*(x - b)/((c - a)*(c - b))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        far_from_singularity = g(x)
+
+    return np.where(np.abs(x - am) > tol, far_from_singularity, near_singularity)
+
+
+# Growth rates of the exponentials and sampling points of the 'table' Prony decomposition method.
+PRONY_TABLE_LAMDA = -np.geomspace(0.1, 20.0, 10)
+PRONY_TABLE_X = np.linspace(-0.1, 20.0, 401)
+PRONY_TABLE_MIN_DIMENSIONLESS_WAVENUMBER = 0.2
+
+
+@lru_cache(maxsize=1)
+def _prony_table_least_squares_operator():
+    """Pseudo-inverse of the matrix of the exponentials with fixed growth rates at the sampling points."""
+    return np.linalg.pinv(np.exp(np.outer(PRONY_TABLE_X, PRONY_TABLE_LAMDA)), rcond=1e-10)
+
+
+@lru_cache(maxsize=1024)
+def _cached_exponential_decomposition(method, dimensionless_omega, dimensionless_wavenumber, cache_dir):
+    """Load the Prony decomposition from the cache directory or compute it and store it there.
+    See :meth:`Delhommeau.find_best_exponential_decomposition`."""
+    filename = f"prony_{method}_{dimensionless_omega!r}_{dimensionless_wavenumber!r}.npz"
+    cached = load_arrays(cache_dir, filename)
+    if cached is not None:
+        return cached["a"], cached["lamda"]
+
+    a, lamda = _compute_exponential_decomposition(method, dimensionless_omega, dimensionless_wavenumber)
+    save_arrays(cache_dir, filename, a=a, lamda=lamda)
+    return a, lamda
+
+
+def _compute_exponential_decomposition(method, dimensionless_omega, dimensionless_wavenumber):
+    """See :meth:`Delhommeau.find_best_exponential_decomposition`."""
+    LOG.debug(f"\tCompute Prony decomposition in finite depth Green function "
+              f"for dimless_omega=%.2e and dimless_wavenumber=%.2e",
+              dimensionless_omega, dimensionless_wavenumber)
+
+    if method == 'python':
+        # The function that will be approximated.
+        def f(x):
+            return ff(x, dimensionless_omega, dimensionless_wavenumber)
+
+        # Try different increasing number of exponentials
+        for n_exp in range(4, 31, 2):
+
+            # The coefficients are computed on a resolution of 4*n_exp+1 ...
+            X = np.linspace(-0.1, 20.0, 4*n_exp+1)
+            a, lamda = exponential_decomposition(X, f(X), n_exp)
+
+            # ... and they are evaluated on a finer discretization.
+            X = np.linspace(-0.1, 20.0, 8*n_exp+1)
+            if error_exponential_decomposition(X, f(X), a, lamda) < 1e-4:
+                break
+
+        else:
+            LOG.warning("No suitable exponential decomposition has been found"
+                        "for dimless_omega=%.2e and dimless_wavenumber=%.2e",
+                        dimensionless_omega, dimensionless_wavenumber)
+
+    elif method == 'table' and dimensionless_wavenumber >= PRONY_TABLE_MIN_DIMENSIONLESS_WAVENUMBER:
+        a = _prony_table_least_squares_operator() @ ff(PRONY_TABLE_X, dimensionless_omega, dimensionless_wavenumber)
+        lamda = PRONY_TABLE_LAMDA.copy()
+
+    elif method in ('fortran', 'table'):
+        lamda, a, nexp = Delhommeau_f90.old_prony_decomposition.lisc(dimensionless_omega, dimensionless_wavenumber)
+        lamda = lamda[:nexp]
+        a = a[:nexp]
+
+    else:
+        raise ValueError("Unrecognized method name for the Prony decomposition.")
+
+    # Add one more exponential function (actually a constant).
+    # It is not clear where it comes from exactly in the theory...
+    a = np.concatenate([a, np.array([2])])
+    lamda = np.concatenate([lamda, np.array([0.0])])
+
+    return a, lamda
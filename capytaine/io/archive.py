@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""Save and load meshes and floating bodies in a binary archive.
+
+The archive is a standard uncompressed numpy :code:`.npz` file.
+The structure of the mesh (collections of meshes and symmetries), the name of the objects and the other metadata are
+stored as a JSON string in the entry :code:`structure`.
+The arrays (vertices, faces, cached properties of the faces, dofs) are stored as separate entries,
+which can be memory-mapped when the archive is loaded, such that only the parts of the arrays that are actually used
+are read from the disk.
+
+Only the first half or the first slice of the symmetric meshes is stored.
+The other parts are rebuilt by the constructor of the symmetric mesh when loading the archive.
+"""
+# Copyright (C) 2017-2019 Matthieu Ancellin
+# See LICENSE file at <https://github.com/mancellin/capytaine>
+
+import json
+import struct
+import logging
+import zipfile
+
+import numpy as np
+
+from capytaine.meshes.geometry import Axis, Plane
+from capytaine.meshes.meshes import Mesh
+from capytaine.meshes.collections import CollectionOfMeshes
+from capytaine.meshes.symmetric import ReflectionSymmetricMesh, TranslationalSymmetricMesh, AxialSymmetricMesh
+from capytaine.bodies.bodies import FloatingBody
+
+LOG = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT_VERSION = 1
+
+# Properties of the faces that are stored in the archive when they have been computed.
+_FACES_PROPERTIES = ('faces_areas', 'faces_centers', 'faces_normals', 'faces_radiuses')
+
+# Attributes of the floating bodies that are stored in the archive when they are defined.
+_BODY_POINTS_ATTRIBUTES = ('center_of_mass', 'rotation_center', 'geometric_center')
+
+
+def save_archive(filename, obj):
+    """Save a mesh or a floating body in a binary archive.
+
+    Parameters
+    ----------
+    filename: str
+        path of the archive (conventionally with the extension :code:`.npz`)
+    obj: Mesh or CollectionOfMeshes or FloatingBody
+        the object to be saved
+    """
+    arrays = {}
+    if isinstance(obj, FloatingBody):
+        content = {'type': 'FloatingBody', 'name': obj.name,
+                   'mesh': _save_mesh(obj.mesh, 'mesh', arrays),
+                   'dofs': list(obj.dofs)}
+        for i, dof in enumerate(obj.dofs.values()):
+            arrays[f'dofs/{i}'] = np.asarray(dof)
+        for attribute in _BODY_POINTS_ATTRIBUTES:
+            if hasattr(obj, attribute):
+                content[attribute] = np.asarray(getattr(obj, attribute), dtype=float).tolist()
+    elif isinstance(obj, (Mesh, CollectionOfMeshes)):
+        content = _save_mesh(obj, 'mesh', arrays)
+    else:
+        raise TypeError(f"Can not save an object of type {type(obj)} in an archive.")
+
+    arrays['structure'] = np.array(json.dumps({'version': ARCHIVE_FORMAT_VERSION, 'content': content}))
+
+    with open(filename, 'wb') as f:  # Opened here such that numpy does not append ".npz" to the filename.
+        np.savez(f, **arrays)
+
+    LOG.debug(f"Saved {obj.name} in {filename}.")
+
+
+def load_archive(filename, mmap_mode='c'):
+    """Load a mesh or a floating body from an archive written by :func:`save_archive`.
+
+    Parameters
+    ----------
+    filename: str
+        path of the archive
+    mmap_mode: str or None, optional
+        If not None, the arrays are memory-mapped with this mode (see :class:`numpy.memmap`).
+        The default :code:`'c'` (copy-on-write) never modifies the file.
+        If None, the arrays are read in memory.
+
+    Returns
+    -------
+    Mesh or CollectionOfMeshes or FloatingBody
+        the saved object
+    """
+    with np.load(filename, allow_pickle=False) as data:
+        structure = json.loads(str(data['structure']))
+        if mmap_mode is None:
+            arrays = {name: data[name] for name in data.files if name != 'structure'}
+        else:
+            arrays = _memory_mapped_arrays(filename, mmap_mode)
+
+    if structure['version'] > ARCHIVE_FORMAT_VERSION:
+        raise IOError(f"The archive {filename} has been written by a more recent version of Capytaine.")
+
+    content = structure['content']
+    if content['type'] == 'FloatingBody':
+        dofs = {name: arrays[f'dofs/{i}'] for i, name in enumerate(content['dofs'])}
+        body = FloatingBody(mesh=_load_mesh(content['mesh'], arrays), dofs=dofs, name=content['name'])
+        for attribute in _BODY_POINTS_ATTRIBUTES:
+            if attribute in content:
+                setattr(body, attribute, np.array(content[attribute]))
+        return body
+    else:
+        return _load_mesh(content, arrays)
+
+
+def _save_mesh(mesh, path, arrays):
+    """Return the description of the mesh and add its arrays to the dict :code:`arrays`, with keys starting with :code:`path`."""
+    if isinstance(mesh, ReflectionSymmetricMesh):
+        return {'type': 'ReflectionSymmetricMesh', 'name': mesh.name,
+                'plane': {'normal': mesh.plane.normal.tolist(), 'point': mesh.plane.point.tolist()},
+                'half': _save_mesh(mesh.half, f'{path}/0', arrays)}
+
+    elif isinstance(mesh, TranslationalSymmetricMesh):
+        return {'type': 'TranslationalSymmetricMesh', 'name': mesh.name,
+                'translation': mesh.translation.tolist(), 'nb_repetitions': len(mesh) - 1,
+                'first_slice': _save_mesh(mesh.first_slice, f'{path}/0', arrays)}
+
+    elif isinstance(mesh, AxialSymmetricMesh):
+        return {'type': 'AxialSymmetricMesh', 'name': mesh.name,
+                'axis': {'vector': mesh.axis.vector.tolist(), 'point': mesh.axis.point.tolist()},
+                'nb_repetitions': len(mesh) - 1,
+                'first_slice': _save_mesh(mesh[0], f'{path}/0', arrays)}
+
+    elif isinstance(mesh, CollectionOfMeshes):
+        return {'type': 'CollectionOfMeshes', 'name': mesh.name,
+                'submeshes': [_save_mesh(submesh, f'{path}/{i}', arrays) for i, submesh in enumerate(mesh)]}
+
+    elif isinstance(mesh, Mesh):
+        arrays[f'{path}/vertices'] = mesh.vertices
+        arrays[f'{path}/faces'] = mesh.faces
+        description = {'type': 'Mesh', 'name': mesh.name, 'path': path,
+                       'faces_properties': [prop for prop in _FACES_PROPERTIES if prop in mesh.__internals__]}
+        for prop in description['faces_properties']:
+            arrays[f'{path}/{prop}'] = mesh.__internals__[prop]
+        if 'quadrature' in mesh.__internals__:
+            arrays[f'{path}/quadrature_points'], arrays[f'{path}/quadrature_weights'] = mesh.__internals__['quadrature']
+            method = mesh.__internals__['quadrature_method']
+            description['quadrature_method'] = method.name if hasattr(method, 'name') else str(method)
+        return description
+
+    else:
+        raise TypeError(f"Can not save an object of type {type(mesh)} in an archive.")
+
+
+def _load_mesh(description, arrays):
+    """Rebuild a mesh from its description returned by :func:`_save_mesh`."""
+    if description['type'] == 'ReflectionSymmetricMesh':
+        plane = Plane(**description['plane'])
+        return ReflectionSymmetricMesh(_load_mesh(description['half'], arrays), plane=plane, name=description['name'])
+
+    elif description['type'] == 'TranslationalSymmetricMesh':
+        return TranslationalSymmetricMesh(_load_mesh(description['first_slice'], arrays),
+                                          translation=description['translation'],
+                                          nb_repetitions=description['nb_repetitions'],
+                                          name=description['name'])
+
+    elif description['type'] == 'AxialSymmetricMesh':
+        return AxialSymmetricMesh(_load_mesh(description['first_slice'], arrays),
+                                  axis=Axis(**description['axis']),
+                                  nb_repetitions=description['nb_repetitions'],
+                                  name=description['name'])
+
+    elif description['type'] == 'CollectionOfMeshes':
+        return CollectionOfMeshes([_load_mesh(submesh, arrays) for submesh in description['submeshes']],
+                                  name=description['name'])
+
+    elif description['type'] == 'Mesh':
+        path = description['path']
+        # The arrays are not passed to the constructor, which would copy them (and thus read the whole file).
+        mesh = Mesh.__new__(Mesh)
+        mesh.name = description['name']
+        mesh._vertices = arrays[f'{path}/vertices']
+        mesh._faces = arrays[f'{path}/faces']
+        mesh.__internals__ = {prop: arrays[f'{path}/{prop}'] for prop in description['faces_properties']}
+        if 'quadrature_method' in description:
+            mesh.__internals__['quadrature'] = (arrays[f'{path}/quadrature_points'], arrays[f'{path}/quadrature_weights'])
+            mesh.__internals__['quadrature_method'] = description['quadrature_method']
+        return mesh
+
+    else:
+        raise IOError(f"Unknown type of mesh in archive: {description['type']}")
+
+
+def _memory_mapped_arrays(filename, mmap_mode):
+    """Memory-map all the arrays stored in an uncompressed :code:`.npz` file (except the structure)."""
+    arrays = {}
+    with zipfile.ZipFile(filename) as archive, open(filename, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            if name == 'structure':
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise IOError(f"Can not memory-map the compressed array {name} in {filename}.")
+
+            # The data of the member starts after its local header in the zip file, of variable length.
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if np.prod(shape) == 0:  # Empty arrays can not be memory-mapped.
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(filename, dtype=dtype, mode=mmap_mode, shape=shape,
+                                         order='F' if fortran_order else 'C', offset=f.tell())
+    return arrays
@@ -214,34 +214,32 @@ def write_dataset_as_tecplot_files(results_directory, data):
     """Write some of the data from a xarray dataset into legacy tecplot file outputs."""
 
     if 'added_mass' in data:
+        # Columns of each line: omega, then the added mass and the radiation damping for each influenced dof.
+        added_mass = data['added_mass'].transpose('radiating_dof', 'omega', 'influenced_dof').values
+        radiation_damping = data['radiation_damping'].transpose('radiating_dof', 'omega', 'influenced_dof').values
+        coefficients = np.stack([added_mass, radiation_damping], axis=-1).reshape(added_mass.shape[:2] + (-1,))
         with open(os.path.join(results_directory, 'RadiationCoefficients.tec'), 'w') as fi:
-            for i in range(len(data['radiating_dof'])+1):
-                fi.write(f'...\n')
-            for dof in data.radiating_dof:
-                fi.write(f'{dof.values}\n')
-                for o in data.omega:
-                    fi.write(f'  {o.values:e}  ')
-                    for dof2 in data.influenced_dof:
-                        fi.write(f"{data['added_mass'].sel(omega=o, radiating_dof=dof, influenced_dof=dof2).values:e}")
-                        fi.write('  ')
-                        fi.write(f"{data['radiation_damping'].sel(omega=o, radiating_dof=dof, influenced_dof=dof2).values:e}")
-                        fi.write('  ')
-                    fi.write('\n')
+            fi.write('...\n' * (len(data['radiating_dof'])+1))
+            for dof, coefficients_of_dof in zip(data.radiating_dof.values, coefficients):
+                fi.write(f'{dof}\n')
+                fi.write(_format_tecplot_lines(data.omega.values, coefficients_of_dof))
 
     if 'diffraction_force' in data:
-        data['excitation_force'] = data['Froude_Krylov_force'] + data['diffraction_force']
+        excitation_force = data['Froude_Krylov_force'] + data['diffraction_force']
+        excitation_force = excitation_force.transpose('wave_direction', 'omega', 'influenced_dof').values
+        # Columns of each line: omega, then the modulus and the phase of the force for each influenced dof.
+        force_coefficients = np.stack([np.abs(excitation_force), np.angle(excitation_force)], axis=-1)
+        force_coefficients = force_coefficients.reshape(excitation_force.shape[:2] + (-1,))
         with open(os.path.join(results_directory, 'ExcitationForce.tec'), 'w') as fi:
-            for i in range(len(data.influenced_dof)+1):
-                fi.write(f'...\n')
-            for wave_direction in data.wave_direction.values:
+            fi.write('...\n' * (len(data.influenced_dof)+1))
+            for wave_direction, coefficients_of_direction in zip(data.wave_direction.values, force_coefficients):
                 fi.write(f'angle={wave_direction}\n')
-                for o in data.omega.values:
-                    fi.write(f'  {o:e}  ')
-                    for dof in data.influenced_dof:
-                        val = data['excitation_force'].sel(omega=o, wave_direction=wave_direction, influenced_dof=dof).values
-                        fi.write(f'{np.abs(val):e}')
-                        fi.write('  ')
-                        fi.write(f'{np.angle(val):e}')
-                        fi.write('  ')
-                    fi.write('\n')
+                fi.write(_format_tecplot_lines(data.omega.values, coefficients_of_direction))
+
+
+def _format_tecplot_lines(omegas, coefficients):
+    """Format at once the lines starting with the frequency followed by the coefficients."""
+    line_format = '  %e  ' + '%e  ' * coefficients.shape[1] + '\n'
+    lines = np.concatenate([np.asarray(omegas, dtype=float)[:, None], coefficients], axis=1)
+    return (line_format * len(lines)) % tuple(lines.ravel().tolist())
 
@@ -7,6 +7,9 @@ Based on meshmagick <https://github.com/LHEEA/meshmagick> by François Rongère.
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
 import os
+import re
+import warnings
+
 import numpy as np
 
 from capytaine.meshes.meshes import Mesh
@@ -23,6 +26,50 @@ def _check_file(filename, name=None):
     return
 
 
+def _parse_numbers(text, dtype=float, nb_columns=None):
+    """Parse at once all the whitespace-separated numbers in a block of text (e.g. a section of a mesh file).
+
+    Parameters
+    ----------
+    text: str or list of str
+        the block of text, or the list of its lines
+    dtype: type, optional
+        type of the numbers (default: float)
+    nb_columns: int, optional
+        if given, the numbers are reshaped into an array with this number of columns
+
+    Returns
+    -------
+    ndarray
+    """
+    if not isinstance(text, str):
+        text = "\n".join(text)
+    nb_numbers = len(text.split())
+    # The integers are parsed as floats, such that a value such as "4.5" is not silently read as 4.
+    parsed_dtype = float if np.issubdtype(np.dtype(dtype), np.integer) else dtype
+    with warnings.catch_warnings():
+        # Depending on its version, numpy silently stops at the first invalid value, emits a warning or raises an error.
+        # The silent case is detected by counting the parsed numbers.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            numbers = np.fromstring(text, dtype=parsed_dtype, sep=" ")
+        except (DeprecationWarning, ValueError):
+            numbers = None
+    if numbers is not None and parsed_dtype is not dtype:
+        numbers, parsed_numbers = numbers.astype(dtype), numbers
+        if np.any(numbers != parsed_numbers):
+            numbers = None
+    if numbers is None or numbers.size != nb_numbers:
+        # Slower, but raises a meaningful error message for the invalid values.
+        numbers = np.array(text.split(), dtype=dtype)
+    if nb_columns is not None:
+        if numbers.size % nb_columns != 0:
+            raise IOError(f"Expected {nb_columns} numbers per line in the section of the mesh file, "
+                          f"but found {numbers.size} numbers in total.")
+        numbers = numbers.reshape((-1, nb_columns))
+    return numbers
+
+
 def load_mesh(filename, file_format=None, name=None):
     """Driver function that loads every mesh file format known by meshmagick.
     Dispatch to one of the other function depending on file_format.
@@ -73,7 +120,6 @@ def load_RAD(filename, name=None):
     RAD files have a 1-indexing
     """
 
-    import re
     _check_file(filename)
     ifile = open(filename, 'r')
     data = ifile.read()
@@ -130,48 +176,21 @@ def load_HST(filename, name=None):
     data = ifile.read()
     ifile.close()
 
-    import re
-
     node_line = r'\s*\d+(?:\s+' + real_str + '){3}'
     node_section = r'((?:' + node_line + ')+)'
 
     elem_line = r'^\s*(?:\d+\s+){3}\d+\s*[\r\n]+'
     elem_section = r'((?:' + elem_line + ')+)'
 
-    pattern_node_line = re.compile(node_line, re.MULTILINE)
-    pattern_elem_line = re.compile(elem_line, re.MULTILINE)
     pattern_node_section = re.compile(node_section, re.MULTILINE)
     pattern_elem_section = re.compile(elem_section, re.MULTILINE)
 
-    vertices_tmp = []
-    vertices = []
-    nv = 0
-    for node_section in pattern_node_section.findall(data):
-        for node in pattern_node_line.findall(node_section):
-            vertices_tmp.append(list(map(float, node.split()[1:])))
-        nv_tmp = len(vertices_tmp)
-        vertices_tmp = np.asarray(vertices_tmp, dtype=float)
-        if nv == 0:
-            vertices = vertices_tmp.copy()
-            nv = nv_tmp
-        else:
-            vertices = np.concatenate((vertices, vertices_tmp))
-            nv += nv_tmp
+    # Each line of a node section is made of the index of the node and its three coordinates.
+    vertices = [_parse_numbers(node_section, nb_columns=4)[:, 1:] for node_section in pattern_node_section.findall(data)]
+    vertices = np.concatenate(vertices) if len(vertices) > 0 else np.zeros((0, 3))
 
-    faces_tmp = []
-    faces = []
-    nf = 0
-    for elem_section in pattern_elem_section.findall(data):
-        for elem in pattern_elem_line.findall(elem_section):
-            faces_tmp.append(list(map(int, elem.split())))
-        nf_tmp = len(faces_tmp)
-        faces_tmp = np.asarray(faces_tmp, dtype=int)
-        if nf == 0:
-            faces = faces_tmp.copy()
-            nf = nf_tmp
-        else:
-            faces = np.concatenate((faces, faces_tmp))
-            nf += nf_tmp
+    faces = [_parse_numbers(elem_section, dtype=int, nb_columns=4) for elem_section in pattern_elem_section.findall(data)]
+    faces = np.concatenate(faces) if len(faces) > 0 else np.zeros((0, 4), dtype=int)
 
     return Mesh(vertices, faces-1, name)
 
@@ -205,7 +224,6 @@ def load_INP(filename, name=None):
     INP/DAT files use a 1-indexing
     """
     _check_file(filename)
-    import re
 
     with open(filename, 'r') as f:
         text = f.read()
@@ -372,8 +390,6 @@ def load_TEC(filename, name=None):
     TEC files have a 1-indexing
     """
 
-    import re
-
     _check_file(filename)
 
     data_pattern = re.compile(
@@ -388,8 +404,8 @@ def load_TEC(filename, name=None):
     nv = int(nv)
     nf = int(nf)
 
-    vertices = np.asarray(list(map(float, vertices.split())), dtype=float).reshape((nv, -1))[:, :3]
-    faces = np.asarray(list(map(int, faces.split())), dtype=int).reshape((nf, 4))-1
+    vertices = _parse_numbers(vertices).reshape((nv, -1))[:, :3]
+    faces = _parse_numbers(faces, dtype=int).reshape((nf, 4))-1
 
     return Mesh(vertices, faces, name)
 
@@ -520,11 +536,14 @@ def _dump_vtk(vtk_mesh):
     return vertices, faces
 
 
+STL_BINARY_DTYPE = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+
 def load_STL(filename, name=None):
-    """Loads STL file format.
+    """Loads STL file format, either binary or ASCII.
 
-    It relies on the reader from the VTK library. As STL file format maintains a redundant set of vertices for each
-    faces of the mesh, it returns a merged list of nodes and connectivity array by using the merge_duplicates function.
+    As STL file format maintains a redundant set of vertices for each faces of the mesh, it returns a merged list of
+    nodes and connectivity array by using the merge_duplicate_rows function.
 
     Parameters
     ----------
@@ -540,38 +559,47 @@ def load_STL(filename, name=None):
     ----
     STL files have a 0-indexing
     """
-    vtk = import_optional_dependency("vtk")
-
     from capytaine.meshes.quality import merge_duplicate_rows
 
     _check_file(filename)
 
-    reader = vtk.vtkSTLReader()
-    reader.SetFileName(filename)
-    reader.Update()
-
-    data = reader.GetOutputDataObject(0)
-
-    nv = data.GetNumberOfPoints()
-    vertices = np.zeros((nv, 3), dtype=float)
-    for k in range(nv):
-        vertices[k] = np.array(data.GetPoint(k))
-    nf = data.GetNumberOfCells()
-    faces = np.zeros((nf, 4), dtype=int)
-    for k in range(nf):
-        cell = data.GetCell(k)
-        if cell is not None:
-            for l in range(3):
-                faces[k][l] = cell.GetPointId(l)
-                faces[k][3] = faces[k][0]  # always repeating the first node as stl is triangle only
+    nb_triangles = _nb_triangles_in_binary_STL(filename)
+    if nb_triangles is not None:
+        triangles = np.fromfile(filename, dtype=STL_BINARY_DTYPE, count=nb_triangles, offset=84)
+        vertices = triangles['vertices'].reshape((-1, 3)).astype(float)
+    else:
+        with open(filename, 'r') as f:
+            data = f.read()
+        vertices = _parse_numbers(re.findall(r'^\s*vertex\s+(.*)$', data, re.MULTILINE), nb_columns=3)
+        if vertices.shape[0] % 3 != 0:
+            raise IOError(f"The number of vertices in {filename} is not a multiple of 3.")
 
     # Merging duplicates nodes
     vertices, new_id = merge_duplicate_rows(vertices)
-    faces = new_id[faces]
+    faces = np.empty((new_id.shape[0]//3, 4), dtype=int)
+    faces[:, :3] = new_id.reshape((-1, 3))
+    faces[:, 3] = faces[:, 0]  # always repeating the first node as stl is triangle only
 
     return Mesh(vertices, faces, name)
 
 
+def _nb_triangles_in_binary_STL(filename):
+    """Number of triangles in a binary STL file, or None if the file is not a binary STL file.
+
+    Binary STL files are made of a 80 bytes header, the number of triangles and 50 bytes per triangle.
+    The size of the file is checked, since the header of a binary file may also start with "solid" like an ASCII file.
+    """
+    file_size = os.path.getsize(filename)
+    if file_size < 84:
+        return None
+    with open(filename, 'rb') as f:
+        f.seek(80)
+        nb_triangles = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+    if file_size != 84 + STL_BINARY_DTYPE.itemsize*nb_triangles:
+        return None
+    return nb_triangles
+
+
 def load_NAT(filename, name=None):
     """This function loads natural file format for meshes.
 
@@ -616,21 +644,13 @@ def load_NAT(filename, name=None):
 
     _check_file(filename)
 
-    ifile = open(filename, 'r')
-    ifile.readline()
-    nv, nf = list(map(int, ifile.readline().split()))
+    with open(filename, 'r') as ifile:
+        lines = ifile.read().splitlines()
 
-    vertices = []
-    for i in range(nv):
-        vertices.append(list(map(float, ifile.readline().split())))
-    vertices = np.array(vertices, dtype=float)
+    nv, nf = list(map(int, lines[1].split()))
+    vertices = _parse_numbers(lines[2:2+nv], nb_columns=3)
+    faces = _parse_numbers(lines[2+nv:2+nv+nf], dtype=int, nb_columns=4)
 
-    faces = []
-    for i in range(nf):
-        faces.append(list(map(int, ifile.readline().split())))
-    faces = np.array(faces, dtype=int)
-
-    ifile.close()
     return Mesh(vertices, faces-1, name)
 
 
@@ -657,32 +677,19 @@ def load_GDF(filename, name=None):
 
     _check_file(filename)
 
-    ifile = open(filename, 'r')
-
-    ifile.readline()  # skip one header line
-    line = ifile.readline().split()
-    ulen = line[0]
-    grav = line[1]
-
-    line = ifile.readline().split()
-    isx = line[0]
-    isy = line[1]
-
-    line = ifile.readline().split()
-    nf = int(line[0])
-
-    vertices = np.zeros((4 * nf, 3), dtype=float)
-    faces = np.zeros((nf, 4), dtype=int)
-
-    iv = -1
-    for icell in range(nf):
+    with open(filename, 'r') as ifile:
+        lines = ifile.read().splitlines()
 
-        for k in range(4):
-            iv += 1
-            vertices[iv, :] = np.array(ifile.readline().split())
-            faces[icell, k] = iv
+    # lines[0] is a header line
+    ulen, grav = lines[1].split()[:2]
+    isx, isy = lines[2].split()[:2]
+    nf = int(lines[3].split()[0])
 
-    ifile.close()
+    # Four vertices per face, one vertex per line
+    vertices = _parse_numbers(lines[4:4+4*nf], nb_columns=3)
+    if vertices.shape[0] != 4*nf:
+        raise IOError(f"Expected {4*nf} vertices in {filename}, but found {vertices.shape[0]}.")
+    faces = np.arange(4*nf).reshape((nf, 4))
 
     return Mesh(vertices, faces, name)
 
@@ -707,31 +714,21 @@ def load_MAR(filename, name=None):
 
     _check_file(filename)
 
-    ifile = open(filename, 'r')
-
-    header = ifile.readline()
+    with open(filename, 'r') as ifile:
+        header = ifile.readline()
+        data = ifile.read()
     _, symmetric_mesh = header.split()
 
-    vertices = []
-    while 1:
-        line = ifile.readline()
-        line = line.split()
-        if line[0] == '0':
-            break
-        vertices.append(list(map(float, line[1:])))
-
-    vertices = np.array(vertices, dtype=float)
-    faces = []
-    while 1:
-        line = ifile.readline()
-        line = line.split()
-        if line[0] == '0':
-            break
-        faces.append(list(map(int, line)))
+    # The sections of vertices and faces both end with a line starting with a 0.
+    sentinel = re.compile(r'^[ \t]*0(?:[ \t\r].*)?$', re.MULTILINE)
+    end_of_vertices = sentinel.search(data)
+    end_of_faces = sentinel.search(data, end_of_vertices.end()) if end_of_vertices is not None else None
+    if end_of_faces is None:
+        raise IOError(f"Could not find the end of the sections of vertices and faces in {filename}.")
 
-    faces = np.array(faces, dtype=int)
-
-    ifile.close()
+    # Each line of the vertices section is made of the index of the vertex and its three coordinates.
+    vertices = _parse_numbers(data[:end_of_vertices.start()], nb_columns=4)[:, 1:]
+    faces = _parse_numbers(data[end_of_vertices.end():end_of_faces.start()], dtype=int, nb_columns=4)
 
     if int(symmetric_mesh) == 1:
         if name is None:
@@ -762,8 +759,6 @@ def load_MSH(filename, name=None):
     MSH files have a 1-indexing
     """
 
-    import re
-
     _check_file(filename)
 
     with open(filename, 'r') as file:
@@ -868,7 +863,6 @@ def load_WRL(filename, name=None):
     Mesh
         the loaded mesh
     """
-    import re
 
     vtk = import_optional_dependency("vtk")
 
@@ -912,20 +906,14 @@ def load_NEM(filename, name=None):
 
     _check_file(filename)
 
-    ifile = open(filename, 'r')
+    with open(filename, 'r') as ifile:
+        lines = ifile.read().splitlines()
 
-    nv = int(ifile.readline())
-    nf = int(ifile.readline())
+    nv = int(lines[0])
+    nf = int(lines[1])
 
-    vertices = []
-    for ivertex in range(nv):
-        vertices.append(list(map(float, ifile.readline().split())))
-    vertices = np.asarray(vertices, dtype=float)
-
-    faces = []
-    for iface in range(nf):
-        faces.append(list(map(int, ifile.readline().split())))
-    faces = np.asarray(faces, dtype=int)
+    vertices = _parse_numbers(lines[2:2+nv], nb_columns=3)
+    faces = _parse_numbers(lines[2+nv:2+nv+nf], dtype=int, nb_columns=4)
     faces -= 1
 
     return Mesh(vertices, faces, name)
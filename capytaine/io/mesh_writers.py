@@ -12,8 +12,10 @@ import numpy as np
 
 from capytaine.tools.optional_imports import import_optional_dependency
 
+CHUNK_SIZE = 100000  # Default number of lines formatted at once by the writers of text files.
 
-def write_mesh(filename, vertices, faces, file_format):
+
+def write_mesh(filename, vertices, faces, file_format, **kwargs):
     """Driver function that writes every mesh file file_format known by meshmagick
 
     Parameters
@@ -26,6 +28,8 @@ def write_mesh(filename, vertices, faces, file_format):
         numpy array of the faces' nodes connectivities
     file_format: str
         file_format of the mesh defined in the extension_dict dictionary
+    **kwargs
+        passed to the writer, such as :code:`chunk_size` for the text formats
     """
 
     if file_format not in extension_dict:
@@ -33,10 +37,34 @@ def write_mesh(filename, vertices, faces, file_format):
 
     writer = extension_dict[file_format]
 
-    writer(filename, vertices, faces)
+    writer(filename, vertices, faces, **kwargs)
+
+
+def _write_rows(ofile, row_format, rows, chunk_size=CHUNK_SIZE):
+    """Write the rows of a 2D array in a text file, formatting whole chunks of rows in a single operation.
+
+    Parameters
+    ----------
+    ofile: file object
+        the opened file
+    row_format: str
+        printf-style format of a single row, including the line break
+    rows: ndarray
+        2D array of the values to be written
+    chunk_size: int, optional
+        number of rows formatted and written at once, to bound the memory used for large meshes
+    """
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start+chunk_size]
+        ofile.write((row_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def _with_indices(array):
+    """Prepend a column with the 1-based indices of the rows."""
+    return np.column_stack((np.arange(1, len(array)+1), array))
 
 
-def write_DAT(filename, vertices, faces):
+def write_DAT(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes .DAT file format for the DIODORE (PRINCIPA (c)) software.
 
     It also displays suggestions for inclusion into the .INP configuration
@@ -50,6 +78,8 @@ def write_DAT(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
     """
 
     root_filename, ext = os.path.splitext(filename)
@@ -60,51 +90,13 @@ def write_DAT(filename, vertices, faces):
     ofile.write('$ GENERATED BY MESHMAGICK ON {0}\n$\n'.format(time.strftime('%c')))
 
     ofile.write('$ NODE\n')
-    vertex_block = \
-        ''.join(
-            (
-                '\n'.join(
-                    ''.join(
-                        (
-                            '{:8d}'.format(idx+1),
-                            ''.join('{:13.5E}'.format(elt) for elt in node)
-                        )
-                    ) for (idx, node) in enumerate(vertices)
-                ),
-
-                '\n*RETURN\n'
-            )
-        )
-    ofile.write(vertex_block)
-
-    quad_block = '$\n$ ELEMENT,TYPE=Q4C000,ELSTRUCTURE={0}'.format(root_filename.upper())
-    tri_block = '$\n$ ELEMENT,TYPE=T3C000,ELSTRUCTURE={0}'.format(root_filename.upper())
-    nq = 0
-    nt = 0
-    for (idx, cell) in enumerate(faces+1):
-        if cell[0] != cell[-1]:
-            # quadrangle
-            nq += 1
-            quad_block = ''.join(
-                (
-                    quad_block,
-                    '\n',
-                    '{:8d}'.format(idx+1),
-                    ''.join('{:8d}'.format(node_id) for node_id in cell)
-                )
-            )
+    _write_rows(ofile, '%8d' + '%13.5E'*3 + '\n', _with_indices(vertices), chunk_size)
+    ofile.write('*RETURN\n')
 
-        else:
-            # Triangle
-            nt += 1
-            tri_block = ''.join(
-                (
-                    tri_block,
-                    '\n',
-                    '{:8d}'.format(idx+1),
-                    ''.join('{:8d}'.format(node_id) for node_id in cell[:3])
-                )
-            )
+    faces_with_ids = _with_indices(np.asarray(faces) + 1)
+    triangles_mask = faces_with_ids[:, 1] == faces_with_ids[:, -1]
+    nq = np.count_nonzero(~triangles_mask)
+    nt = np.count_nonzero(triangles_mask)
 
     print('-------------------------------------------------')
     print('Suggestion for .inp DIODORE input file :')
@@ -112,12 +104,14 @@ def write_DAT(filename, vertices, faces):
     print('*NODE,INPUT={0},FRAME=???'.format(root_filename))
 
     if nq > 0:
-        quad_block = ''.join((quad_block, '\n*RETURN\n'))
-        ofile.write(quad_block)
+        ofile.write('$\n$ ELEMENT,TYPE=Q4C000,ELSTRUCTURE={0}\n'.format(root_filename.upper()))
+        _write_rows(ofile, '%8d'*5 + '\n', faces_with_ids[~triangles_mask], chunk_size)
+        ofile.write('*RETURN\n')
         print('*ELEMENT,TYPE=Q4C000,ELSTRUCTURE={0},INPUT={0}'.format(root_filename))
     if nt > 0:
-        tri_block = ''.join((tri_block, '\n*RETURN\n'))
-        ofile.write(tri_block)
+        ofile.write('$\n$ ELEMENT,TYPE=T3C000,ELSTRUCTURE={0}\n'.format(root_filename.upper()))
+        _write_rows(ofile, '%8d'*4 + '\n', faces_with_ids[triangles_mask, :4], chunk_size)
+        ofile.write('*RETURN\n')
         print('*ELEMENT,TYPE=T3C000,ELSTRUCTURE={0},INPUT={0}'.format(root_filename))
 
     print('')
@@ -125,7 +119,7 @@ def write_DAT(filename, vertices, faces):
     ofile.close()
 
 
-def write_HST(filename, vertices, faces):
+def write_HST(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes .HST file format for the HYDROSTAR (Bureau Veritas (c)) software.
 
     Parameters
@@ -136,6 +130,8 @@ def write_HST(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
     """
     # TODO: allow many bodies
 
@@ -149,39 +145,20 @@ def write_HST(filename, vertices, faces):
         'GRAVITY   9.81\n\n'
     )))
 
-    coordinates_block = ''.join((  # block
-            'COORDINATES\n',
-            '\n'.join(  # line
-                ''.join(
-                    (
-                        '{:10d}'.format(idx+1),  # index
-                        ''.join('{:16.6E}'.format(elt) for elt in node)  # node coordinates
-                    )
-                ) for (idx, node) in enumerate(vertices)
-            ),
-            '\nENDCOORDINATES\n\n'
-    ))
-
-    ofile.write(coordinates_block)
-
-    cells_coordinates = ''.join((  # block
-        'PANEL TYPE 0\n',
-        '\n'.join(  # line
-            ''.join(
-                '{:10d}'.format(node_idx) for node_idx in cell
-            ) for cell in faces + 1
-        ),
-        '\nENDPANEL\n\n'
-    ))
-
-    ofile.write(cells_coordinates)
+    ofile.write('COORDINATES\n')
+    _write_rows(ofile, '%10d' + '%16.6E'*3 + '\n', _with_indices(vertices), chunk_size)
+    ofile.write('ENDCOORDINATES\n\n')
+
+    ofile.write('PANEL TYPE 0\n')
+    _write_rows(ofile, '%10d'*4 + '\n', np.asarray(faces) + 1, chunk_size)
+    ofile.write('ENDPANEL\n\n')
 
     ofile.write('ENDFILE\n')
 
     ofile.close()
 
 
-def write_TEC(filename, vertices, faces):
+def write_TEC(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes .TEC file format for the TECPLOT (Tecplot (c)) visualisation software.
 
     Parameters
@@ -192,6 +169,8 @@ def write_TEC(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
     """
 
     ofile = open(filename, 'w')
@@ -205,19 +184,8 @@ def write_TEC(filename, vertices, faces):
     ofile.write('ZONE T=\"MESH\" \n')
     ofile.write('N={nv:10d} ,E={nf:10d} , F=FEPOINT, ET=QUADRILATERAL\n'.format(nv=nv, nf=nf))
 
-    node_block = '\n'.join( # block
-        ''.join(
-            ''.join('{:16.6E}'.format(elt) for elt in node)
-        ) for node in vertices
-    ) + '\n'
-    ofile.write(node_block)
-
-    cells_block = '\n'.join(  # block
-        ''.join(
-            ''.join('{:10d}'.format(node_id) for node_id in cell)
-        ) for cell in faces + 1
-    ) + '\n'
-    ofile.write(cells_block)
+    _write_rows(ofile, '%16.6E'*3 + '\n', vertices, chunk_size)
+    _write_rows(ofile, '%10d'*4 + '\n', faces + 1, chunk_size)
 
     ofile.close()
 
@@ -276,10 +244,10 @@ def write_VTP(filename, vertices, faces):
     writer.Write()
 
 
-def write_VTK(filename, vertices, faces):
+def write_VTK(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes .vtk file format for the Paraview (Kitware (c)) visualisation software.
 
-    It relies on the VTK library for its writer. VTK files use the legagy ASCII file format of the VTK library.
+    VTK files use the legagy ASCII file format of the VTK library.
 
     Parameters
     ----------
@@ -289,15 +257,16 @@ def write_VTK(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
     """
 
     nv = vertices.shape[0]
     nf = faces.shape[0]
 
     triangle_mask = (faces[:, 0] == faces[:, -1])
-    quadrangles_mask = np.invert(triangle_mask)
-    nb_triangles = len(np.where(triangle_mask)[0])
-    nb_quandrangles = len(np.where(quadrangles_mask)[0])
+    nb_triangles = np.count_nonzero(triangle_mask)
+    nb_quandrangles = nf - nb_triangles
 
     with open(filename, 'w') as f:
 
@@ -307,16 +276,17 @@ def write_VTK(filename, vertices, faces):
         f.write('DATASET POLYDATA\n')
         f.write('POINTS %u float\n' % nv)
 
-        for vertex in vertices:
-            f.write('%f %f %f\n' % (vertex[0], vertex[1], vertex[2]))
+        _write_rows(f, '%f %f %f\n', vertices, chunk_size)
 
         f.write('POLYGONS %u %u\n' % (nf, 4*nb_triangles+5*nb_quandrangles))
 
-        for face in faces:
-            if face[0] == face[-1]:  # Triangle
-                f.write('3 %u %u %u\n' % (face[0], face[1], face[2]))
-            else:  # Quadrangle
-                f.write('4 %u %u %u %u\n' % (face[0], face[1], face[2], face[3]))
+        # Triangles and quadrangles have different formats: the format is built for each chunk.
+        values_mask = np.ones(faces.shape, dtype=bool)
+        values_mask[triangle_mask, 3] = False  # The last vertex of the triangles is not written.
+        for start in range(0, nf, chunk_size):
+            chunk = slice(start, start+chunk_size)
+            chunk_format = ''.join(np.where(triangle_mask[chunk], '3 %u %u %u\n', '4 %u %u %u %u\n'))
+            f.write(chunk_format % tuple(faces[chunk][values_mask[chunk]].tolist()))
 
 
 def _build_vtkUnstructuredGrid(vertices, faces):
@@ -401,7 +371,7 @@ def _build_vtkPolyData(vertices, faces):
     return polydata_mesh
 
 
-def write_NAT(filename, vertices, faces):
+def write_NAT(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes .nat file format as defined into the load_NAT function.
 
     Parameters
@@ -412,6 +382,8 @@ def write_NAT(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
 
     See Also
     --------
@@ -425,15 +397,13 @@ def write_NAT(filename, vertices, faces):
 
     ofile.write('%6u%6u\n' % (0, 0))  # lire les symmetries dans args...
     ofile.write('%6u%6u\n' % (nv, nf))
-    for vertex in vertices:
-        ofile.write('%15.6E%15.6E%15.6E\n' % (vertex[0], vertex[1], vertex[2]))
-    for cell in faces+1:
-        ofile.write('%10u%10u%10u%10u\n' % (cell[0], cell[1], cell[2], cell[3]))
+    _write_rows(ofile, '%15.6E%15.6E%15.6E\n', vertices, chunk_size)
+    _write_rows(ofile, '%10u%10u%10u%10u\n', faces+1, chunk_size)
 
     ofile.close()
 
 
-def write_NEM(filename, vertices, faces):
+def write_NEM(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes mesh files used by the Mesh tool included in Nemoh
 
     Parameters
@@ -444,6 +414,8 @@ def write_NEM(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
 
     Note
     ----
@@ -454,16 +426,13 @@ def write_NEM(filename, vertices, faces):
     ofile.write('%u\n' % vertices.shape[0])
     ofile.write('%u\n' % faces.shape[0])
 
-    for vertex in vertices:
-        ofile.write('%15.6f\t%15.6f\t%15.6f\n' % (vertex[0], vertex[1], vertex[2]))
-
-    for face in faces+1:
-        ofile.write('%10u\t%10u\t%10u\t%10u\n' % (face[0], face[1], face[2], face[3]))
+    _write_rows(ofile, '%15.6f\t%15.6f\t%15.6f\n', vertices, chunk_size)
+    _write_rows(ofile, '%10u\t%10u\t%10u\t%10u\n', faces+1, chunk_size)
 
     ofile.close()
 
 
-def write_GDF(filename, vertices, faces):
+def write_GDF(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes .gdf file format for the WAMIT (Wamit INC. (c)) BEM software.
 
     Parameters
@@ -474,6 +443,8 @@ def write_GDF(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
     """
 
     nf = max(np.shape(faces))
@@ -486,15 +457,13 @@ def write_GDF(filename, vertices, faces):
     ofile.write('%12u%12u\n' % (0, 1))  # TODO : mettre les symetries en argument
     ofile.write('%12u\n' % nf)
 
-    for cell in faces:
-        for k in range(4):
-            cur_vertices = vertices[cell[k], :]
-            ofile.write('%16.6E%16.6E%16.6E\n' % (cur_vertices[0], cur_vertices[1], cur_vertices[2]))
+    # The four vertices of each face
+    _write_rows(ofile, '%16.6E%16.6E%16.6E\n', vertices[np.asarray(faces).ravel()], chunk_size)
 
     ofile.close()
 
 
-def write_MAR(filename, vertices, faces):
+def write_MAR(filename, vertices, faces, chunk_size=CHUNK_SIZE):
     """Writes mesh files to be used with Nemoh BEM software (Ecole Centrale de Nantes)
 
     Parameters
@@ -505,6 +474,8 @@ def write_MAR(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    chunk_size: int, optional
+        number of lines formatted at once
     """
 
     # TODO: detect symmetry in Oxz plane
@@ -513,16 +484,11 @@ def write_MAR(filename, vertices, faces):
 
     ofile.write('{0:6d}{1:6d}\n'.format(2, 0))  # TODO : mettre les symetries en argument
 
-    for (idx, vertex) in enumerate(vertices):
-        ofile.write('{0:6d}{1:16.6f}{2:16.6f}{3:16.6f}\n'.format(idx+1, vertex[0], vertex[1], vertex[2]))
+    _write_rows(ofile, '%6d%16.6f%16.6f%16.6f\n', _with_indices(vertices), chunk_size)
 
     ofile.write('{0:6d}{1:6d}{2:6d}{3:6d}{4:6d}\n'.format(0, 0, 0, 0, 0))
 
-    cell_block = '\n'.join(
-        ''.join('{0:10d}'.format(elt) for elt in cell)
-        for cell in faces + 1
-    ) + '\n'
-    ofile.write(cell_block)
+    _write_rows(ofile, '%10d'*4 + '\n', faces + 1, chunk_size)
     ofile.write('%6u%6u%6u%6u\n' % (0, 0, 0, 0))
 
     ofile.close()
@@ -535,8 +501,8 @@ def write_RAD(filename, vertices, faces):
     raise NotImplementedError
 
 
-def write_STL(filename, vertices, faces):
-    """Writes .stl file format. It relies on the VTK library for its writer.
+def write_STL(filename, vertices, faces, binary=False, chunk_size=CHUNK_SIZE):
+    """Writes .stl file format. Quadrangles are split into two triangles.
 
     Parameters
     ----------
@@ -546,54 +512,49 @@ def write_STL(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    binary: bool, optional
+        if True, write a binary STL file instead of an ASCII one (default: False)
+    chunk_size: int, optional
+        number of facets formatted at once in an ASCII file
     """
+    from capytaine.io.mesh_loaders import STL_BINARY_DTYPE
 
-    # TODO : replace this implementation by using the vtk functionalities
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces, dtype=int)
 
     # Triangulating quads
-    t1 = (0, 1, 2)
-    t2 = (0, 2, 3)
-
     quads_ids = np.where(faces[:, 0] != faces[:, -1])[0]
-
-    new_faces = faces[quads_ids].copy()
-    new_faces[:, :3] = new_faces[:, t1]
-    new_faces[:, -1] = new_faces[:, 0]
-
-    faces[quads_ids, :3] = faces[:, t2][quads_ids]
-    faces[quads_ids, -1] = faces[quads_ids, 0]
-
-    faces = np.concatenate((faces, new_faces))
-
-    # Writing file
-    ofile = open(filename, 'w')
-
-    ofile.write('solid meshmagick\n')
-
-    for face in faces:
-        if face[0] != face[3]:
-            raise RuntimeError("""Only full triangle meshes are accepted in STL files.
-              Please consider using the --triangulate-quadrangles option (-tq) to
-              perform a prior triangulation of the mesh""")
-
-        # Computing normal
-        v0 = vertices[face[0], :]
-        v1 = vertices[face[1], :]
-        v2 = vertices[face[2], :]
-
-        n = np.cross(v1 - v0, v2 - v0)
-        n /= np.linalg.norm(n)
-
-        block_facet = ''.join(['  facet normal ', ''.join('%15.6e' % ni for ni in n) + '\n',
+    triangles = faces[:, :3].copy()
+    triangles[quads_ids] = faces[quads_ids][:, (0, 2, 3)]
+    triangles = np.concatenate((triangles, faces[quads_ids][:, (0, 1, 2)]))
+
+    triangles_vertices = vertices[triangles]  # shape: (nb_triangles, 3, 3)
+    normals = np.cross(triangles_vertices[:, 1] - triangles_vertices[:, 0],
+                       triangles_vertices[:, 2] - triangles_vertices[:, 0])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+
+    if binary:
+        data = np.zeros(len(triangles), dtype=STL_BINARY_DTYPE)
+        data['normal'] = normals
+        data['vertices'] = triangles_vertices
+        with open(filename, 'wb') as ofile:
+            ofile.write(b'binary STL file generated by capytaine'.ljust(80, b' '))
+            ofile.write(np.array(len(triangles), dtype='<u4').tobytes())
+            data.tofile(ofile)
+
+    else:
+        block_facet = ''.join(['  facet normal ', '%15.6e' * 3 + '\n',
                                '    outer loop\n',
-                               '      vertex', ''.join('%15.6e' % Vi for Vi in v0) + '\n',
-                               '      vertex', ''.join('%15.6e' % Vi for Vi in v1) + '\n',
-                               '      vertex', ''.join('%15.6e' % Vi for Vi in v2) + '\n',
+                               '      vertex', '%15.6e' * 3 + '\n',
+                               '      vertex', '%15.6e' * 3 + '\n',
+                               '      vertex', '%15.6e' * 3 + '\n',
                                '    endloop\n',
                                '  endfacet\n'])
-        ofile.write(block_facet)
-    ofile.write('endsolid meshmagick\n')
-    ofile.close()
+        data = np.concatenate((normals, triangles_vertices.reshape((-1, 9))), axis=1)
+        with open(filename, 'w') as ofile:
+            ofile.write('solid meshmagick\n')
+            _write_rows(ofile, block_facet, data, chunk_size)
+            ofile.write('endsolid meshmagick\n')
 
 
 def write_INP(filename, vertices, faces):
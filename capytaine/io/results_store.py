@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""Store the results of a long series of resolutions on disk, as soon as they are computed.
+
+Example
+-------
+
+::
+
+    store = ResultsStore("results_of_my_sweep")
+    dataset = BEMSolver().fill_dataset(test_matrix, [body], store=store)
+
+If the computation is interrupted, running the same lines again only solves the problems that are not in the store yet.
+
+The store is a directory containing an append-only log of the records of the results, one JSON line per problem,
+optionally an append-only binary file with the sources of the results,
+and the fingerprints of the meshes and dofs of the bodies, such that a store is not resumed with modified bodies.
+"""
+# Copyright (C) 2017-2019 Matthieu Ancellin
+# See LICENSE file at <https://github.com/mancellin/capytaine>
+
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+
+from capytaine.meshes.collections import _modifications_state
+from capytaine.bem.problems_and_results import DiffractionProblem, RadiationProblem
+from capytaine.io.xarray import _forces_dataset, _wavenumber_data_array_from_columns, _add_bodies_data
+
+LOG = logging.getLogger(__name__)
+
+RECORDS_FILE = "records.jsonl"
+SOURCES_FILE = "sources.bin"
+BODIES_FILE = "bodies.json"
+
+
+def _to_json(obj):
+    """Conversion of the objects that are not natively supported by the json module."""
+    if isinstance(obj, complex):
+        return {"real": obj.real, "imag": obj.imag}
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    else:
+        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+def _from_json(obj):
+    if obj.keys() == {"real", "imag"}:
+        return complex(obj["real"], obj["imag"])
+    else:
+        return obj
+
+
+def _columns(records):
+    """Transpose a list of records (dicts with the same keys) into a dict of arrays."""
+    if len(records) == 0:
+        return None
+    return {key: np.array([record[key] for record in records]) for key in records[0]}
+
+
+def _problem_key(problem_dict):
+    return json.dumps(problem_dict, sort_keys=True, default=_to_json)
+
+
+def _problem_dict(problem):
+    return {"type": problem.__class__.__name__, **problem._asdict()}
+
+
+def _body_fingerprint(body):
+    """Digest of the mesh and the dofs of a body.
+    Contrary to :code:`hash(body.mesh)`, it does not change from one Python process to the other."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(body.mesh.vertices[body.mesh.faces], dtype=float).tobytes())
+    for name, dof in body.dofs.items():
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(dof, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class ResultsStore:
+    """Append-only store of results on disk.
+
+    Each result appended to the store is immediately written to disk.
+    Only the list of the problems in the store is kept in memory.
+
+    Parameters
+    ----------
+    directory: str
+        path to the directory of the store. It is created if it does not exist.
+        If it already contains a store, the new results will be appended to the existing ones.
+        The bodies should then have the same meshes and dofs as the bodies of the stored results with the same names.
+    keep_sources: bool, optional
+        if True, also store the sources of the results (default: False).
+        They are required to compute the Kochin function of the stored results.
+    """
+
+    def __init__(self, directory, keep_sources=False):
+        self.directory = directory
+        self.keep_sources = keep_sources
+        os.makedirs(directory, exist_ok=True)
+
+        self._records_path = os.path.join(directory, RECORDS_FILE)
+        self._sources_path = os.path.join(directory, SOURCES_FILE)
+        self._bodies_path = os.path.join(directory, BODIES_FILE)
+
+        # Fingerprint of the mesh and dofs of each body of the stored results.
+        if os.path.exists(self._bodies_path):
+            with open(self._bodies_path, 'r') as f:
+                self._bodies_fingerprints = json.load(f)
+        else:
+            self._bodies_fingerprints = {}
+
+        # Fingerprint of the bodies of the current process, by id of the body, with the state of the body when it has
+        # been computed, such that it is only computed again if the mesh has been modified or a dof has been changed.
+        # The body and its dofs are kept in the cache such that their ids are not reused by other objects.
+        self._fingerprints_cache = {}
+
+        # Position in the records file of the line of each stored problem.
+        self._index = {}
+
+        if os.path.exists(self._records_path):
+            position = 0
+            with open(self._records_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self._index[_problem_key(entry["problem"])] = position
+                    position += len(line)
+
+            if position < os.path.getsize(self._records_path):
+                # The last line has only been partially written, e.g. because the computation has been killed.
+                LOG.warning(f"Discarding incomplete last entry of {self._records_path}.")
+                with open(self._records_path, 'rb+') as f:
+                    f.truncate(position)
+
+            LOG.info(f"Found {len(self._index)} results in {directory}.")
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, problem):
+        self._check_body(problem.body)
+        return _problem_key(_problem_dict(problem)) in self._index
+
+    def _check_body(self, body):
+        """Raise an error if the store contains results for another body with the same name.
+        Return the fingerprint of the body."""
+        state = (_modifications_state(body.mesh), [(name, id(dof)) for name, dof in body.dofs.items()])
+        cached_body, _, cached_state, fingerprint = self._fingerprints_cache.get(id(body), (None, None, None, None))
+        if cached_body is not body or cached_state != state:
+            fingerprint = _body_fingerprint(body)
+            self._fingerprints_cache[id(body)] = (body, list(body.dofs.values()), state, fingerprint)
+        if self._bodies_fingerprints.get(body.name, fingerprint) != fingerprint:
+            raise ValueError(f"The mesh or the dofs of the body {body.name} are not the same as the ones of the body "
+                             f"with the same name in the store {self.directory}. Use another store or rename the body.")
+        return fingerprint
+
+    def append(self, result):
+        """Write the records of the result (and its sources if :code:`keep_sources` is True) to the store."""
+        fingerprint = self._check_body(result.body)
+        if result.body.name not in self._bodies_fingerprints:
+            self._bodies_fingerprints[result.body.name] = fingerprint
+            # Written before the records, and replaced atomically, such that it is never incomplete.
+            with open(self._bodies_path + '.tmp', 'w') as f:
+                json.dump(self._bodies_fingerprints, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self._bodies_path + '.tmp', self._bodies_path)
+
+        problem_dict = _problem_dict(result.problem)
+        params = result.problem._asdict()
+        entry = {"problem": problem_dict,
+                 "wavenumber": result.problem.wavenumber,
+                 "records": [{k: v for k, v in record.items() if k not in params} for record in result.records]}
+
+        if self.keep_sources:
+            if result.sources is None:
+                raise ValueError(f"The sources of {result} have not been kept by the solver. "
+                                 f"Solve the problem with keep_details=True.")
+            sources = np.asarray(result.sources)
+            with open(self._sources_path, 'ab') as f:
+                offset = f.tell()
+                f.write(sources.tobytes())
+            entry["sources"] = {"offset": offset, "shape": sources.shape, "dtype": sources.dtype.str}
+
+        # The sources are written before the records, such that the problem is in the store only when all its data are.
+        line = (json.dumps(entry, default=_to_json) + '\n').encode()
+        with open(self._records_path, 'ab') as f:
+            position = f.tell()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._index[_problem_key(problem_dict)] = position
+
+    def _entries(self):
+        if not os.path.exists(self._records_path):
+            return
+        with open(self._records_path, 'rb') as f:
+            for line in f:
+                yield json.loads(line, object_hook=_from_json)
+
+    def result(self, problem):
+        """Rebuild the result of a problem from the store.
+
+        The sources, if they are stored, are memory-mapped and only read from the disk when they are used.
+        """
+        key = _problem_key(_problem_dict(problem))
+        if key not in self._index:
+            raise KeyError(f"{problem} is not in the store {self.directory}.")
+        with open(self._records_path, 'rb') as f:
+            f.seek(self._index[key])
+            entry = json.loads(f.readline(), object_hook=_from_json)
+
+        result = problem.make_results_container()
+        for record in entry["records"]:
+            dof = record["influenced_dof"]
+            if isinstance(problem, RadiationProblem):
+                result.added_masses[dof] = record["added_mass"]
+                result.radiation_dampings[dof] = record["radiation_damping"]
+            elif isinstance(problem, DiffractionProblem):
+                result.forces[dof] = record["diffraction_force"]
+
+        if "sources" in entry:
+            sources = entry["sources"]
+            result.sources = np.memmap(self._sources_path, dtype=np.dtype(sources["dtype"]), mode='r',
+                                       shape=tuple(sources["shape"]), offset=sources["offset"])
+        return result
+
+    def assemble_dataset(self, bodies=(), wavenumber=False, wavelength=False, mesh=False, hydrostatics=True,
+                         attrs=None):
+        """Read the stored records and transform them into a :class:`xarray.Dataset`.
+
+        Parameters
+        ----------
+        bodies: list of FloatingBody, optional
+            The bodies involved in the stored problems.
+            They are only used to add the data of the bodies (mesh and hydrostatics) to the dataset.
+        wavenumber, wavelength, mesh, hydrostatics, attrs:
+            See :func:`~capytaine.io.xarray.assemble_dataset`.
+        """
+        radiation_records, diffraction_records, wavenumbers = [], [], []
+        for entry in self._entries():
+            problem = entry["problem"]
+            params = {k: v for k, v in problem.items() if k != "type"}
+            if problem["type"] == RadiationProblem.__name__:
+                radiation_records.extend(dict(**params, **record) for record in entry["records"])
+            else:
+                diffraction_records.extend(dict(**params, **record) for record in entry["records"])
+            wavenumbers.append(dict(g=problem["g"], water_depth=problem["water_depth"],
+                                    omega=problem["omega"], wavenumber=entry["wavenumber"]))
+
+        all_dofs_in_order = list(dict.fromkeys(record["influenced_dof"]
+                                               for record in radiation_records + diffraction_records))
+        dataset = _forces_dataset(_columns(radiation_records), _columns(diffraction_records), all_dofs_in_order, attrs)
+
+        if wavenumber:
+            dataset.coords['wavenumber'] = _wavenumber_data_array_from_columns(_columns(wavenumbers))
+
+        if wavelength:
+            dataset.coords['wavelength'] = 2*np.pi/_wavenumber_data_array_from_columns(_columns(wavenumbers))
+
+        stored_bodies = {record["body_name"] for record in radiation_records + diffraction_records}
+        bodies = [body for body in bodies if body.name in stored_bodies]
+        return _add_bodies_data(dataset, bodies, mesh=mesh and len(bodies) > 0, hydrostatics=hydrostatics)
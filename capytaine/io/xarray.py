@@ -11,7 +11,7 @@
 import logging
 from datetime import datetime
 from itertools import product
-from typing import Sequence, List, Union
+from typing import Sequence, List, Union, Dict, Optional, Iterable
 
 import numpy as np
 import pandas as pd
@@ -21,8 +21,9 @@ from capytaine import __version__
 from capytaine.bodies.bodies import FloatingBody
 from capytaine.bem.problems_and_results import (
     LinearPotentialFlowProblem, DiffractionProblem, RadiationProblem,
-    LinearPotentialFlowResult, _default_parameters)
-from capytaine.post_pro.kochin import compute_kochin
+    LinearPotentialFlowResult, DiffractionResult, RadiationResult, _default_parameters)
+from capytaine.bem.airy_waves import froude_krylov_forces, solve_dispersion_relation
+from capytaine.post_pro.kochin import compute_kochins
 
 
 LOG = logging.getLogger(__name__)
@@ -32,6 +33,89 @@ LOG = logging.getLogger(__name__)
 #  Reading test matrix  #
 #########################
 
+class ProblemsGrid:
+    """Lazy Cartesian product of the problems defined by the coordinates of a test matrix.
+
+    The problems are not stored: they are built one by one when iterating over the grid,
+    grouped by body, water depth and frequency.
+    The parameters are checked once for the whole grid when it is created, such that an invalid test matrix is
+    detected before any problem is solved.
+
+    Parameters
+    ----------
+    dataset : xarray Dataset
+        Test matrix containing the problems parameters.
+    bodies : list of FloatingBody
+        The bodies on which the computations of the test matrix will be applied.
+        They should all have different names.
+
+    Attributes
+    ----------
+    coords: dict of arrays
+        The values of each parameter of the problems in the grid.
+        The keys :code:`wave_direction` and :code:`radiating_dof` are absent if there is no diffraction problem or
+        no radiation problem in the grid.
+    """
+
+    def __init__(self, dataset: xr.Dataset, bodies: Sequence[FloatingBody]):
+        assert len(list(set(body.name for body in bodies))) == len(bodies), \
+            "All bodies should have different names."
+
+        dataset = _unsqueeze_dimensions(dataset)
+
+        if 'body_name' in dataset:
+            assert set(dataset['body_name'].data) <= {body.name for body in bodies}, \
+                "Some body named in the dataset was not given as argument to `problems_from_dataset`."
+            self.bodies = {body.name: body for body in sorted(bodies) if body.name in dataset['body_name'].data}
+            # Only the bodies listed in the dataset have been kept
+        else:
+            self.bodies = {body.name: body for body in sorted(bodies)}
+
+        # The problems are yielded in the same order as sorted(problems).
+        self.coords = {
+            'body_name': list(self.bodies),
+            'water_depth': sorted(dataset['water_depth'].data if 'water_depth' in dataset else [_default_parameters['water_depth']], reverse=True),
+            'omega': sorted(dataset['omega'].data if 'omega' in dataset else [_default_parameters['omega']]),
+            'rho': sorted(dataset['rho'].data if 'rho' in dataset else [_default_parameters['rho']]),
+        }
+        if 'wave_direction' in dataset:
+            self.coords['wave_direction'] = list(dataset['wave_direction'].data)
+        if 'radiating_dof' in dataset:
+            self.coords['radiating_dof'] = list(dataset['radiating_dof'].data.astype(object))
+            # astype(object) is meant to convert Numpy internal string type numpy.str_ to Python general string type.
+
+        self._check_parameters()
+
+    def _check_parameters(self):
+        """Same checks as the ones done when building each problem, but done once for the whole grid."""
+        for water_depth in self.coords['water_depth']:
+            if water_depth < 0:
+                raise ValueError("Sea bottom is above the free surface.")
+            if water_depth != np.infty and any(omega in {0, np.infty} for omega in self.coords['omega']):
+                raise NotImplementedError("omega=0 and omega=∞ are only implemented for infinite depth.")
+
+        for body in self.bodies.values():
+            for radiating_dof in self.coords.get('radiating_dof', []):
+                if radiating_dof not in body.dofs:
+                    raise ValueError(f"Unrecognized degree of freedom name: {radiating_dof} is not one of the "
+                                     f"degrees of freedom of the body {body.name}: {list(body.dofs.keys())}.")
+
+    def __len__(self):
+        nb_problems_per_case = len(self.coords.get('wave_direction', [])) + len(self.coords.get('radiating_dof', []))
+        return (len(self.bodies) * len(self.coords['water_depth']) * len(self.coords['omega'])
+                * len(self.coords['rho']) * nb_problems_per_case)
+
+    def __iter__(self):
+        for body, water_depth, omega, rho in product(self.bodies.values(), self.coords['water_depth'],
+                                                     self.coords['omega'], self.coords['rho']):
+            for wave_direction in self.coords.get('wave_direction', []):
+                yield DiffractionProblem(body=body, omega=omega, wave_direction=wave_direction,
+                                         sea_bottom=-water_depth, rho=rho)
+            for radiating_dof in self.coords.get('radiating_dof', []):
+                yield RadiationProblem(body=body, omega=omega, radiating_dof=radiating_dof,
+                                       sea_bottom=-water_depth, rho=rho)
+
+
 def problems_from_dataset(dataset: xr.Dataset,
                           bodies: Sequence[FloatingBody],
                           ) -> List[LinearPotentialFlowProblem]:
@@ -48,46 +132,12 @@ def problems_from_dataset(dataset: xr.Dataset,
     Returns
     -------
     list of LinearPotentialFlowProblem
+
+    .. seealso::
+        :class:`ProblemsGrid`
+            The same problems, without building all of them in advance.
     """
-    assert len(list(set(body.name for body in bodies))) == len(bodies), \
-        "All bodies should have different names."
-
-    dataset = _unsqueeze_dimensions(dataset)
-
-    omega_range = dataset['omega'].data if 'omega' in dataset else [_default_parameters['omega']]
-    water_depth_range = dataset['water_depth'].data if 'water_depth' in dataset else [_default_parameters['water_depth']]
-    rho_range = dataset['rho'].data if 'rho' in dataset else [_default_parameters['rho']]
-
-    wave_direction_range = dataset['wave_direction'].data if 'wave_direction' in dataset else None
-    radiating_dofs = dataset['radiating_dof'].data.astype(object) if 'radiating_dof' in dataset else None
-    # astype(object) is meant to convert Numpy internal string type numpy.str_ to Python general string type.
-
-    if 'body_name' in dataset:
-        assert set(dataset['body_name'].data) <= {body.name for body in bodies}, \
-            "Some body named in the dataset was not given as argument to `problems_from_dataset`."
-        body_range = {body.name: body for body in bodies if body.name in dataset['body_name'].data}
-        # Only the bodies listed in the dataset have been kept
-    else:
-        body_range = {body.name: body for body in bodies}
-
-    problems = []
-    if wave_direction_range is not None:
-        for omega, wave_direction, water_depth, body_name, rho \
-                in product(omega_range, wave_direction_range, water_depth_range, body_range, rho_range):
-            problems.append(
-                DiffractionProblem(body=body_range[body_name], omega=omega,
-                                   wave_direction=wave_direction, sea_bottom=-water_depth, rho=rho)
-            )
-
-    if radiating_dofs is not None:
-        for omega, radiating_dof, water_depth, body_name, rho \
-                in product(omega_range, radiating_dofs, water_depth_range, body_range, rho_range):
-            problems.append(
-                RadiationProblem(body=body_range[body_name], omega=omega,
-                                 radiating_dof=radiating_dof, sea_bottom=-water_depth, rho=rho)
-            )
-
-    return sorted(problems)
+    return list(ProblemsGrid(dataset, bodies))
 
 
 def _squeeze_dimensions(data_array, dimensions=None):
@@ -114,20 +164,20 @@ def _unsqueeze_dimensions(data_array, dimensions=None):
 #  Dataset creation  #
 ######################
 
-def _dataset_from_dataframe(df: pd.DataFrame,
-                            variables: Union[str, Sequence[str]],
-                            dimensions: Sequence[str],
-                            optional_dims: Sequence[str],
-                            ) -> Union[xr.DataArray, xr.Dataset]:
-    """Transform a pandas.Dataframe into a xarray.Dataset.
+def _dataset_from_columns(columns: Dict[str, np.ndarray],
+                          variables: Sequence[str],
+                          dimensions: Sequence[str],
+                          optional_dims: Sequence[str],
+                          categories: Optional[Dict[str, Sequence]] = None,
+                          ) -> xr.Dataset:
+    """Build a xarray.Dataset by scattering records in arrays indexed by the dimensions.
 
     Parameters
     ----------
-    df: pandas.DataFrame
-        the input dataframe
-    variables: string or sequence of strings
+    columns: dict of 1D arrays
+        the records, stored column by column, such that the i-th element of each array is a field of the i-th record.
+    variables: sequence of strings
         the variables that will be stored in the output dataset.
-        If a single name is provided, a DataArray of this variable will be provided instead.
     dimensions: sequence of strings
         Names of dimensions the variables depends on.
         They will always appear as dimension in the output dataset.
@@ -135,26 +185,56 @@ def _dataset_from_dataframe(df: pd.DataFrame,
         Names of dimensions the variables depends on.
         They will appears as dimension in the output dataset only if they have
         more than one different values.
+    categories: dict of sequences, optional
+        Possible values of some of the dimensions, in the order in which they should appear in the dataset.
+        The values of the other dimensions are sorted.
     """
-    for variable_name in variables:
-        df = df[df[variable_name].notnull()].dropna(1)  # Keep only records with non null values of all the variables
-    df = df.drop_duplicates()
-    df = df.set_index(optional_dims + dimensions)
-
-    da = df.to_xarray()[variables]
-    da = _squeeze_dimensions(da, dimensions=optional_dims)
-    return da
+    if categories is None:
+        categories = {}
+
+    dims = list(optional_dims) + list(dimensions)
+    coords = {}
+    indices = []
+    for dim in dims:
+        labels, index = np.unique(columns[dim], return_inverse=True)
+        if dim in categories:
+            # Reorder the labels as in the categories (the unused categories are ignored).
+            position = {category: i for i, category in enumerate(categories[dim])}
+            order = np.argsort([position[label] for label in labels])
+            labels = labels[order]
+            index = np.argsort(order)[index]
+        if labels.dtype.kind == 'U':
+            labels = labels.astype(object)
+        coords[dim] = labels
+        indices.append(index)
+    indices = tuple(indices)
+
+    shape = tuple(len(coords[dim]) for dim in dims)
+    data_vars = {}
+    for variable in variables:
+        values = np.asarray(columns[variable])
+        data = np.full(shape, np.nan, dtype=np.result_type(values.dtype, float))  # NaN for missing records
+        data[indices] = values
+        data_vars[variable] = (dims, data)
+
+    dataset = xr.Dataset(data_vars, coords=coords)
+    return _squeeze_dimensions(dataset, dimensions=optional_dims)
 
 
 def wavenumber_data_array(results: Sequence[LinearPotentialFlowResult]) -> xr.DataArray:
     """Read the wavenumbers in a list of :class:`LinearPotentialFlowResult`
     and store them into a :class:`xarray.DataArray`.
     """
-    records = pd.DataFrame(
-        [dict(g=result.g, water_depth=result.depth, omega=result.omega, wavenumber=result.wavenumber)
-         for result in results]
-    )
-    ds = _dataset_from_dataframe(records, variables=['wavenumber'], dimensions=['omega'], optional_dims=['g', 'water_depth'])
+    problems = [result.problem for result in results]
+    columns = dict(g=np.array([pb.g for pb in problems]),
+                   water_depth=np.array([pb.depth for pb in problems]),
+                   omega=np.array([pb.omega for pb in problems]),
+                   wavenumber=np.array([pb.wavenumber for pb in problems]))
+    return _wavenumber_data_array_from_columns(columns)
+
+
+def _wavenumber_data_array_from_columns(columns: Dict[str, np.ndarray]) -> xr.DataArray:
+    ds = _dataset_from_columns(columns, variables=['wavenumber'], dimensions=['omega'], optional_dims=['g', 'water_depth'])
     return ds['wavenumber']
 
 
@@ -179,40 +259,50 @@ def kochin_data_array(results: Sequence[LinearPotentialFlowResult],
     """Compute the Kochin function for a list of results and fills a dataset.
 
     .. seealso::
-        :meth:`~capytaine.post_pro.kochin.compute_kochin`
-            The present function is just a wrapper around :code:`compute_kochin`.
+        :meth:`~capytaine.post_pro.kochin.compute_kochins`
+            The present function is just a wrapper around :code:`compute_kochins`.
     """
-    records = pd.DataFrame([
-        dict(**result._asdict(), theta=theta, kochin=kochin)
-        for result in results
-        for theta, kochin in zip(theta_range.data,
-                                 compute_kochin(result, theta_range, **kwargs))
-    ])
+    theta_range = np.asarray(theta_range)
+    kochin = compute_kochins(results, theta_range, **kwargs)
 
     kochin_data = {}
+    optional_dims = ['g', 'rho', 'body_name', 'water_depth']
 
-    if 'wave_direction' in records.columns:
-        diffraction = _dataset_from_dataframe(
-            records[~records['wave_direction'].isnull()],
-            ['kochin'],
+    diffraction = [i for i, result in enumerate(results) if isinstance(result, DiffractionResult)]
+    if len(diffraction) > 0:
+        columns = _kochin_columns([results[i] for i in diffraction], kochin[diffraction, :], theta_range,
+                                  optional_dims + ['omega', 'wave_direction'])
+        kochin_data['kochin_diffraction'] = _dataset_from_columns(
+            columns,
+            variables=['kochin'],
             dimensions=['omega', 'wave_direction', 'theta'],
-            optional_dims=['g', 'rho', 'body_name', 'water_depth']
-        )
-        kochin_data['kochin_diffraction'] = diffraction['kochin']
-
-    if 'radiating_dof' in records.columns:
-        radiation = _dataset_from_dataframe(
-            records[~records['radiating_dof'].isnull()],
+            optional_dims=optional_dims
+        )['kochin']
+
+    radiation = [i for i, result in enumerate(results) if isinstance(result, RadiationResult)]
+    if len(radiation) > 0:
+        columns = _kochin_columns([results[i] for i in radiation], kochin[radiation, :], theta_range,
+                                  optional_dims + ['omega', 'radiating_dof'])
+        kochin_data['kochin'] = _dataset_from_columns(
+            columns,
             variables=['kochin'],
             dimensions=['omega', 'radiating_dof', 'theta'],
-            optional_dims=['g', 'rho', 'body_name', 'water_depth']
-        )
-        kochin_data['kochin'] = radiation['kochin']
+            optional_dims=optional_dims
+        )['kochin']
 
     return kochin_data
 
 
-def assemble_dataset(results: Sequence[LinearPotentialFlowResult],
+def _kochin_columns(results, kochin, theta_range, parameters):
+    """Columns of records with one record per result and per angle."""
+    columns = {name: np.repeat(np.array([getattr(result.problem, name) for result in results]), len(theta_range))
+               for name in parameters}
+    columns['theta'] = np.tile(theta_range, len(results))
+    columns['kochin'] = kochin.ravel()
+    return columns
+
+
+def assemble_dataset(results: Iterable[LinearPotentialFlowResult],
                      wavenumber=False, wavelength=False, mesh=False, hydrostatics=True,
                      attrs=None) -> xr.Dataset:
     """Transform a list of :class:`LinearPotentialFlowResult` into a :class:`xarray.Dataset`.
@@ -223,8 +313,9 @@ def assemble_dataset(results: Sequence[LinearPotentialFlowResult],
 
     Parameters
     ----------
-    results: list of LinearPotentialFlowResult
+    results: iterable of LinearPotentialFlowResult
         The results that will be read.
+        They are read only once, such that a generator can be used to avoid keeping all of them in memory.
     wavenumber: bool, optional
         If True, the coordinate 'wavenumber' will be added to the ouput dataset.
     wavelength: bool, optional
@@ -236,59 +327,140 @@ def assemble_dataset(results: Sequence[LinearPotentialFlowResult],
     attrs: dict, optional
         Attributes that should be added to the output dataset.
     """
+    # The results are read only once, such that they can be given by a generator and do not need to be all kept in memory.
+    radiation = {name: [] for name in _RADIATION_COLUMNS}
+    diffraction = {name: [] for name in _DIFFRACTION_COLUMNS}
+    froude_krylov_cases = []
+    environments = []
+    bodies = {}
+    for result in results:
+        pb = result.problem
+        bodies[pb.body] = None
+        environments.append((pb.g, pb.depth, pb.omega))
+        dofs = list(pb.influenced_dofs)
+        if isinstance(result, RadiationResult):
+            _extend_columns(radiation, pb, _PROBLEMS_PARAMETERS + ['radiating_dof'], dofs)
+            radiation['added_mass'].extend(result.added_masses[dof] for dof in dofs)
+            radiation['radiation_damping'].extend(result.radiation_dampings[dof] for dof in dofs)
+        elif isinstance(result, DiffractionResult):
+            _extend_columns(diffraction, pb, _PROBLEMS_PARAMETERS + ['wave_direction', 'convention'], dofs)
+            diffraction['diffraction_force'].extend(result.forces[dof] for dof in dofs)
+            froude_krylov_cases.append((pb.body, pb.depth, pb.rho, pb.g, pb.omega, pb.wave_direction))
+
+    if len(froude_krylov_cases) > 0:
+        diffraction['Froude_Krylov_force'] = np.concatenate(_froude_krylov_forces_of_cases(froude_krylov_cases))
+
+    bodies = list(bodies)  # Without duplicates, in order of first appearance
+    all_dofs_in_order = {k: None for body in bodies for k in body.dofs.keys()}
+    dataset = _forces_dataset(_to_arrays(radiation), _to_arrays(diffraction), list(all_dofs_in_order), attrs)
+
+    # WAVENUMBER
+    if wavenumber or wavelength:
+        environments = list(dict.fromkeys(environments))  # Solve the dispersion relation once per environment
+        g, water_depth, omega = (np.array(values) for values in zip(*environments))
+        wavenumbers = _wavenumber_data_array_from_columns(dict(
+            g=g, water_depth=water_depth, omega=omega,
+            wavenumber=np.array([solve_dispersion_relation(omega, depth, g) for g, depth, omega in environments])))
+
+    if wavenumber:
+        dataset.coords['wavenumber'] = wavenumbers
+
+    if wavelength:
+        dataset.coords['wavelength'] = 2*np.pi/wavenumbers
+
+    return _add_bodies_data(dataset, bodies, mesh=mesh, hydrostatics=hydrostatics)
+
+
+_PROBLEMS_PARAMETERS = ['g', 'rho', 'body_name', 'water_depth', 'omega']
+_RADIATION_COLUMNS = _PROBLEMS_PARAMETERS + ['radiating_dof', 'influenced_dof', 'added_mass', 'radiation_damping']
+_DIFFRACTION_COLUMNS = _PROBLEMS_PARAMETERS + ['wave_direction', 'convention', 'influenced_dof', 'diffraction_force']
+
+
+def _extend_columns(columns, problem, parameters, dofs):
+    """Add the parameters of the problem to the columns, once for each of its records (one per influenced dof)."""
+    for name in parameters:
+        columns[name].extend([getattr(problem, name)] * len(dofs))
+    columns['influenced_dof'].extend(dofs)
+
+
+def _to_arrays(columns: Dict[str, list]) -> Optional[Dict[str, np.ndarray]]:
+    if len(columns['influenced_dof']) == 0:
+        return None
+    return {name: np.array(values) for name, values in columns.items()}
+
+
+def _froude_krylov_forces_of_cases(cases) -> List[np.ndarray]:
+    """Froude-Krylov forces on the dofs of the body for each case (body, water_depth, rho, g, omega, wave_direction).
+
+    The forces are computed at once for all the frequencies and wave directions of the cases sharing the same body and
+    environmental conditions.
+    """
+    groups = {}
+    for i, (body, water_depth, rho, g, omega, wave_direction) in enumerate(cases):
+        groups.setdefault((body, water_depth, rho, g), []).append(i)
+
+    forces = [None] * len(cases)
+    for (body, water_depth, rho, g), indices in groups.items():
+        omegas, omegas_index = np.unique([cases[i][4] for i in indices], return_inverse=True)
+        wave_directions, directions_index = np.unique([cases[i][5] for i in indices], return_inverse=True)
+        all_forces = froude_krylov_forces(body, omegas, wave_directions, water_depth=water_depth, rho=rho, g=g)
+        for i, forces_on_body in zip(indices, all_forces[omegas_index, directions_index, :]):
+            forces[i] = forces_on_body
+    return forces
+
+
+def _forces_dataset(radiation_columns: Optional[Dict[str, np.ndarray]],
+                    diffraction_columns: Optional[Dict[str, np.ndarray]],
+                    all_dofs_in_order: Sequence[str],
+                    attrs=None) -> xr.Dataset:
+    """Build the dataset of the radiation and diffraction forces from the columns of the records of the results."""
+    if all(columns is None or len(columns['influenced_dof']) == 0 for columns in (radiation_columns, diffraction_columns)):
+        raise ValueError("No result passed to assemble_dataset.")
+
     dataset = xr.Dataset()
 
     if attrs is None:
         attrs = {}
     attrs['creation_of_dataset'] = datetime.now().isoformat()
 
-    records = pd.DataFrame([record for result in results for record in result.records])
-    if len(records) == 0:
-        raise ValueError("No result passed to assemble_dataset.")
-
-    all_dofs_in_order = {k: None for r in results for k in r.body.dofs.keys()}
-    inf_dof_cat = pd.CategoricalDtype(categories=all_dofs_in_order.keys())
-    records["influenced_dof"] = records["influenced_dof"].astype(inf_dof_cat)
-    rad_dof_cat = pd.CategoricalDtype(categories=all_dofs_in_order.keys())
-    if 'added_mass' in records.columns:
-        records["radiating_dof"] = records["radiating_dof"].astype(rad_dof_cat)
-
     optional_dims = ['g', 'rho', 'body_name', 'water_depth']
+    categories = {'radiating_dof': all_dofs_in_order, 'influenced_dof': all_dofs_in_order}
 
     # RADIATION RESULTS
-    if 'added_mass' in records.columns:
-        radiation_cases = _dataset_from_dataframe(
-            records,
+    if radiation_columns is not None and len(radiation_columns['influenced_dof']) > 0:
+        radiation_cases = _dataset_from_columns(
+            radiation_columns,
             variables=['added_mass', 'radiation_damping'],
             dimensions=['omega', 'radiating_dof', 'influenced_dof'],
-            optional_dims=optional_dims)
+            optional_dims=optional_dims,
+            categories=categories)
         dataset = xr.merge([dataset, radiation_cases])
 
     # DIFFRACTION RESULTS
-    if 'diffraction_force' in records.columns:
-        conventions = set(records['convention'].dropna())
+    if diffraction_columns is not None and len(diffraction_columns['influenced_dof']) > 0:
+        conventions = set(diffraction_columns['convention'])
         if len(conventions) > 1:
             LOG.warning("Assembling a dataset mixing several conventions.")
         else:
-            attrs['incoming_waves_convention'] = conventions.pop()
+            attrs['incoming_waves_convention'] = str(conventions.pop())
 
-        diffraction_cases = _dataset_from_dataframe(
-            records,
+        diffraction_cases = _dataset_from_columns(
+            diffraction_columns,
             variables=['diffraction_force', 'Froude_Krylov_force'],
             dimensions=['omega', 'wave_direction', 'influenced_dof'],
-            optional_dims=optional_dims)
+            optional_dims=optional_dims,
+            categories=categories)
         dataset = xr.merge([dataset, diffraction_cases])
 
-    # WAVENUMBER
-    if wavenumber:
-        dataset.coords['wavenumber'] = wavenumber_data_array(results)
+    dataset.attrs.update(attrs)
+    dataset.attrs['capytaine_version'] = __version__
+    return dataset
 
-    if wavelength:
-        dataset.coords['wavelength'] = 2*np.pi/wavenumber_data_array(results)
 
+def _add_bodies_data(dataset: xr.Dataset, bodies: Sequence[FloatingBody], mesh=False, hydrostatics=True) -> xr.Dataset:
+    """Add to the dataset the data related to the bodies rather than to the problems."""
     if mesh:
         # TODO: Store full mesh...
-        bodies = list({result.body for result in results})  # Filter out duplicate bodies in the list of results
         nb_faces = {body.name: body.mesh.nb_faces for body in bodies}
 
         def name_or_str(c):
@@ -307,11 +479,10 @@ def assemble_dataset(results: Sequence[LinearPotentialFlowResult],
 
     # HYDROSTATICS
     if hydrostatics:
-        bodies = list({result.body for result in results})
+        attrs = dataset.attrs
         dataset = xr.merge([dataset, hydrostatics_dataset(bodies)])
+        dataset.attrs = attrs
 
-    dataset.attrs.update(attrs)
-    dataset.attrs['capytaine_version'] = __version__
     return dataset
 
 
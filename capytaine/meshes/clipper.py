@@ -10,7 +10,7 @@ import logging
 
 import numpy as np
 
-from capytaine.meshes.geometry import Plane
+from capytaine.meshes.geometry import Plane, Ox_axis, Oy_axis
 from capytaine.meshes.meshes import Mesh
 
 LOG = logging.getLogger(__name__)
@@ -50,25 +50,98 @@ def clip(source_mesh: Mesh, plane: Plane, vicinity_tol=1e-3, name=None):
         clipped_mesh._clipping_data = dict(faces_ids=list(range(source_mesh.nb_faces)))
 
     else:
-        upper_mesh, crown_mesh, lower_mesh = _partition_mesh(vertices_data, source_mesh)
-
-        if crown_mesh.nb_faces > 0:
-            clipped_crown_mesh = _clip_crown(crown_mesh, plane)
-            clipped_mesh = lower_mesh + clipped_crown_mesh
-            clipped_mesh._clipping_data = {
-                'faces_ids': np.concatenate((lower_mesh._clipping_data['faces_ids'],
-                                             clipped_crown_mesh._clipping_data['faces_ids']))
-            }
-        else:
-            clipped_mesh = lower_mesh
+        vertices, faces, faces_ids, nb_crown_faces = _clip_faces(source_mesh.vertices, source_mesh.faces, vertices_data)
+        clipped_mesh = Mesh(vertices, faces)
+        clipped_mesh._clipping_data = {'faces_ids': faces_ids}
+        if nb_crown_faces > 0:
+            clipped_mesh.merge_duplicates()
+            clipped_mesh.heal_triangles()
 
     if name is None:
-        clipped_mesh.name = f'{source_mesh.name}_clipped'
+        name = f'{source_mesh.name}_clipped'
+    clipped_mesh.name = name
     clipped_mesh.remove_unused_vertices()
 
     return clipped_mesh
 
 
+def immersed_parts(source_mesh: Mesh, positions, rotation_center=(0, 0, 0), free_surface=0.0, vicinity_tol=1e-3):
+    """Yield the immersed part of the mesh for several positions of the mesh.
+
+    Each position is a triplet :code:`(draft, trim, heel)`. The mesh is rotated by the angle :code:`heel`
+    around the x axis and then by the angle :code:`trim` around the y axis, both passing through
+    :code:`rotation_center`. It is then moved down by :code:`draft` and clipped by the free surface.
+
+    With the default rotation center, the result is the same as::
+
+        source_mesh.rotated_x(heel).rotated_y(trim).translated_z(-draft).keep_immersed_part(free_surface)
+
+    but the mesh is actually never moved: the free surface is moved in the frame of the mesh instead.
+    The distances of the vertices to all the free surfaces are computed at once and the faces that are
+    below all of them are only classified once. Only the other faces are clipped for each position.
+
+    Parameters
+    ----------
+    source_mesh: Mesh
+        The mesh to be clipped.
+    positions: iterable of triplets of floats
+        The draft (in meters), trim and heel (in radians) of each position.
+    rotation_center: 3-ple of floats, optional
+        The point around which the mesh is rotated. Default: (0, 0, 0).
+    free_surface: float, optional
+        The vertical position of the free surface. Default: 0.
+    vicinity_tol : float, optional
+        The absolute tolerance to consider that a vertex is on the free surface. Default is 1e-3.
+
+    Yields
+    ------
+    Mesh
+        The immersed part of the mesh in each position.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    vertices, faces = source_mesh.vertices, source_mesh.faces
+
+    transformations = [_position_transformation(*position, rotation_center=rotation_center) for position in positions]
+
+    # The free surface in the frame of the mesh is the plane {x | (R x + t)[2] = free_surface}.
+    normals = np.array([matrix[2, :] for matrix, _ in transformations])
+    offsets = np.array([free_surface - vector[2] for _, vector in transformations])
+    all_vertices_distances = vertices @ normals.T - offsets  # shape: (nb_vertices, nb_positions)
+
+    always_immersed_faces_mask = np.all(all_vertices_distances[faces] < -vicinity_tol, axis=(1, 2))
+    always_immersed_faces_ids = np.where(always_immersed_faces_mask)[0]
+    other_faces_ids = np.where(~always_immersed_faces_mask)[0]
+    LOG.debug(f"Sweeping {len(positions)} positions of {source_mesh.name}: "
+              f"{len(always_immersed_faces_ids)} faces out of {source_mesh.nb_faces} are always immersed.")
+
+    for i_position, ((draft, trim, heel), (matrix, vector)) in enumerate(zip(positions, transformations)):
+        vertices_distances = all_vertices_distances[:, i_position]
+        vertices_data = {'vertices_distances': vertices_distances,
+                         'vertices_above_mask': vertices_distances > vicinity_tol,
+                         'vertices_below_mask': vertices_distances < -vicinity_tol}
+        clipped_vertices, clipped_faces, clipped_faces_ids, _ = _clip_faces(vertices, faces[other_faces_ids], vertices_data)
+
+        clipped_mesh = Mesh(
+            clipped_vertices @ matrix.T + vector,
+            np.concatenate((faces[always_immersed_faces_ids], clipped_faces)),
+            name=f"{source_mesh.name}_draft_{draft:g}_trim_{trim:g}_heel_{heel:g}"
+        )
+        clipped_mesh._clipping_data = {
+            'faces_ids': np.concatenate((always_immersed_faces_ids, other_faces_ids[clipped_faces_ids]))
+        }
+        clipped_mesh.remove_unused_vertices()
+        yield clipped_mesh
+
+
+def _position_transformation(draft, trim, heel, rotation_center=(0, 0, 0)):
+    """Matrix and vector of the affine transformation x -> matrix @ x + vector
+    moving a mesh in the position (draft, trim, heel) as described in :func:`immersed_parts`."""
+    rotation_center = np.asarray(rotation_center, dtype=float)
+    matrix = Oy_axis.rotation_matrix(trim) @ Ox_axis.rotation_matrix(heel)
+    vector = rotation_center - matrix @ rotation_center - np.array([0.0, 0.0, draft])
+    return matrix, vector
+
+
 def _vertices_positions_wrt_plane(source_mesh, plane, vicinity_tol):
     """Classifies vertices with respect to the clipping plane."""
     vertices_distances = plane.distance_to_point(source_mesh.vertices)
@@ -80,388 +153,104 @@ def _vertices_positions_wrt_plane(source_mesh, plane, vicinity_tol):
     return vertices_data
 
 
-def _partition_mesh(vertices_data, source_mesh):
-    """Partitions the mesh in 3 with respect to the plane:
-    * upper_mesh: part entirely above the clipping plane
-    * crown_mesh: part intersecting the clipping plane
-    * lower_mesh: part entirely under the clipping plane
+def _clip_faces(vertices, faces, vertices_data):
+    """Clip all the faces at once.
+
+    The faces entirely below the plane are kept as they are and the faces entirely above are dropped.
+    The faces crossing the plane (the crown) are clipped following Sutherland-Hodgman algorithm:
+    for each edge of the face, the starting vertex is kept if it is not above the plane
+    and the intersection with the plane is added if the edge crosses the plane.
+    The intersection points are computed once per edge, such that neighboring faces share them.
+
+    Returns
+    -------
+    vertices: ndarray
+        The vertices followed by the new intersection vertices
+    faces: ndarray
+        The clipped faces
+    faces_ids: ndarray
+        The index in the input faces of the face each clipped face is a part of
+    nb_crown_faces: int
+        The number of faces that have been actually clipped
     """
-    nb_vertices_above_per_face = vertices_data['vertices_above_mask'][source_mesh.faces].sum(axis=1)
-    nb_vertices_below_per_face = vertices_data['vertices_below_mask'][source_mesh.faces].sum(axis=1)
+    vertices_distances = vertices_data['vertices_distances']
+    above_vertices_mask = vertices_data['vertices_above_mask']
+    below_vertices_mask = vertices_data['vertices_below_mask']
 
-    # Simple criteria ensuring that _faces are totally above or below the plane (4 _vertices at the same side)
-    # Works for both triangles and quadrangles
-    above_faces_mask = nb_vertices_above_per_face == 4
-    below_faces_mask = nb_vertices_below_per_face == 4
-    crown_faces_mask = np.logical_not(np.logical_or(above_faces_mask, below_faces_mask))
-
-    faces_ids = {
-        'upper_mesh': np.where(above_faces_mask)[0],
-        'crown_mesh': np.where(crown_faces_mask)[0],
-        'lower_mesh': np.where(below_faces_mask)[0]
-    }
-
-    partition = []
-    for name in ['upper_mesh', 'crown_mesh', 'lower_mesh']:
-        new_mesh, vertices_ids = source_mesh.extract_faces(
-            id_faces_to_extract=faces_ids[name], return_index=True, name=name)
-        new_mesh._clipping_data = {
-            'faces_ids': faces_ids[name],
-            'vertices_ids': vertices_ids,
-            'vertices_distances': vertices_data['vertices_distances'][vertices_ids],
-            'above_vertices_mask': vertices_data['vertices_above_mask'][vertices_ids],
-            'on_vertices_mask': vertices_data['vertices_on_mask'][vertices_ids],
-            'below_vertices_mask': vertices_data['vertices_below_mask'][vertices_ids],
-        }
-        partition.append(new_mesh)
+    nb_vertices_above_per_face = above_vertices_mask[faces].sum(axis=1)
+    nb_vertices_below_per_face = below_vertices_mask[faces].sum(axis=1)
 
-    return partition
-
-
-def _clip_crown(crown_mesh, plane):
-    """Performs the clipping operation of the crown_mesh and determines the obtained boundaries.
-    This is the heart method of the class.
-    """
-    vertices = crown_mesh.vertices
-
-    above_vertices_mask = crown_mesh._clipping_data['above_vertices_mask']
-    below_vertices_mask = crown_mesh._clipping_data['below_vertices_mask']
-
-    on_vertices_mask = crown_mesh._clipping_data['on_vertices_mask']
-    # TODO: Vertices pre-projection to be done here
-
-    vertices_distances = crown_mesh._clipping_data['vertices_distances']
-
-    # Init
-    clipped_crown_mesh_faces = list()
-    clipped_crown_mesh_relative_faces_ids = list()
-
-    direct_boundary_edges = dict()
-    inv_boundary_edges = dict()
-    intersections_vertices = list()
-
-    index_new_vertices = crown_mesh.nb_vertices
-
-    for face_id in range(crown_mesh.nb_faces):
-
-        face = crown_mesh.get_face(face_id)
-
-        # # Determining the type of face clipping
-        v_above_face = np.where(above_vertices_mask[face])[0]
-        v_on_face = np.where(on_vertices_mask[face])[0]
-        v_below_face = np.where(below_vertices_mask[face])[0]
-
-        nb_above = len(v_above_face)
-        nb_on = len(v_on_face)
-        nb_below = len(v_below_face)
-
-        face_type = str(nb_above) + str(nb_on) + str(nb_below)
-
-        if face_type == '202':
-            #    0*-----*3
-            #     |     |
-            # ----o-----o----
-            #     |     |
-            #    1*-----*2
-            if v_above_face[1] == v_above_face[0] + 1:
-                face = np.roll(face, -v_above_face[1])
-            p0, p1, p2, p3 = vertices[face]
-            ileft = plane.get_edge_intersection(p0, p1)
-            iright = plane.get_edge_intersection(p2, p3)
-            intersections_vertices += [ileft, iright]
-            boundary_edge = [index_new_vertices, index_new_vertices + 1]
-            clipped_crown_mesh_faces.append([index_new_vertices, face[1], face[2], index_new_vertices + 1])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 2
-
-        elif face_type == '301':
-            #      *2
-            #     / \
-            #    /   \
-            #   /     \
-            # 3*       *1
-            #   \     /
-            # ---o---o---
-            #     \ /
-            #      *0
-            face = np.roll(face, -v_below_face[0])
-            p0, p1, p3 = vertices[face[[0, 1, 3]]]
-            ileft = plane.get_edge_intersection(p0, p3)
-            iright = plane.get_edge_intersection(p0, p1)
-            intersections_vertices += [ileft, iright]
-            boundary_edge = [index_new_vertices, index_new_vertices + 1]
-            clipped_crown_mesh_faces.append([index_new_vertices, face[0], index_new_vertices + 1, index_new_vertices])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 2
-
-        elif face_type == '103':
-            #      *0
-            #     / \
-            # ---o---o---
-            #   /     \
-            # 1* - - - *3
-            #   \     /
-            #    \   /
-            #     \ /
-            #      *2
-            face = np.roll(face, -v_above_face[0])
-            p0, p1, p3 = vertices[face[[0, 1, 3]]]
-            ileft = plane.get_edge_intersection(p0, p1)
-            iright = plane.get_edge_intersection(p0, p3)
-            intersections_vertices += [ileft, iright]
-            boundary_edge = [index_new_vertices, index_new_vertices + 1]
-            clipped_crown_mesh_faces.append([index_new_vertices, face[1], face[3], index_new_vertices + 1])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            clipped_crown_mesh_faces.append([face[1], face[2], face[3], face[1]])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 2
-
-        elif face_type == '102':
-            #      *O
-            #     / \
-            # ---o---o---
-            #   /     \
-            # 1*-------*2
-            face = np.roll(face, -v_above_face[0])
-            p0, p1, p2 = vertices[face]
-            ileft = plane.get_edge_intersection(p0, p1)
-            iright = plane.get_edge_intersection(p0, p2)
-            intersections_vertices += [ileft, iright]
-            boundary_edge = [index_new_vertices, index_new_vertices + 1]
-            clipped_crown_mesh_faces.append([index_new_vertices, face[1], face[2], index_new_vertices + 1])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 2
-
-        elif face_type == '201':  # done
-            #  2*-------*1
-            #    \     /
-            #  ---o---o---
-            #      \ /
-            #       *0
-            face = np.roll(face, -v_below_face[0])
-            p0, p1, p2 = vertices[face]
-            ileft = plane.get_edge_intersection(p0, p2)
-            iright = plane.get_edge_intersection(p0, p1)
-            intersections_vertices += [ileft, iright]
-            boundary_edge = [index_new_vertices, index_new_vertices + 1]
-            clipped_crown_mesh_faces.append([index_new_vertices, face[0], index_new_vertices + 1, index_new_vertices])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 2
-
-        elif face_type == '211':
-            #        *3                   *1
-            #       / \                  / \
-            #      /   *2       or     2*   \
-            #    0/   /                  \   \0
-            # ---*---o---              ---o---*---
-            #     \ /                      \ /
-            #      *1                       *3
-            #
-
-            face = np.roll(face, -v_on_face[0])
-            if vertices_distances[face[1]] < 0.:
-                p1, p2 = vertices[face[[1, 2]]]
-                iright = plane.get_edge_intersection(p1, p2)
-                intersections_vertices.append(iright)
-                boundary_edge = [face[0], index_new_vertices]
-                clipped_crown_mesh_faces.append([face[0], face[1], index_new_vertices, face[0]])
-            else:
-                p2, p3 = vertices[face[[2, 3]]]
-                ileft = plane.get_edge_intersection(p2, p3)
-                intersections_vertices.append(ileft)
-                boundary_edge = [index_new_vertices, face[0]]
-                clipped_crown_mesh_faces.append([index_new_vertices, face[3], face[0], index_new_vertices])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 1
-
-        elif face_type == '112':
-            #       *3                     *1
-            #      / \                    / \
-            #  ---*---o---      or    ---o---*---
-            #     0\   \                /   /0
-            #       \   *2            2*   /
-            #        \ /                \ /
-            #         *1                 *3
-            face = np.roll(face, -v_on_face[0])
-            if vertices_distances[face[1]] < 0.:
-                p2, p3 = vertices[face[[2, 3]]]
-                iright = plane.get_edge_intersection(p2, p3)
-                intersections_vertices.append(iright)
-                boundary_edge = [face[0], index_new_vertices]
-                clipped_crown_mesh_faces.append([face[0], face[1], face[2], index_new_vertices])
-            else:
-                p1, p2 = vertices[face[[1, 2]]]
-                ileft = plane.get_edge_intersection(p1, p2)
-                intersections_vertices.append(ileft)
-                boundary_edge = [index_new_vertices, face[0]]
-                clipped_crown_mesh_faces.append([index_new_vertices, face[2], face[3], face[0]])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 1
-
-        elif face_type == '013':
-            # -----*-----
-            #     / \
-            #    /   \
-            #   *     *
-            #    \   /
-            #     \ /
-            #      *
-            boundary_edge = None
-            clipped_crown_mesh_faces.append(list(face))
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-
-        elif face_type == '210' or face_type == '310':
-            #   *-------*               *
-            #    \ 210 /               / \ 310
-            #     \   /               *   *
-            #      \ /                 \ /
-            #   ----*----           ----*----
-            boundary_edge = None
-
-        elif face_type == '111':
-            #        *2              *1
-            #       /|               |\
-            #      / |               | \
-            #  ---*--o---    or   ---o--*---
-            #     0\ |               | /0
-            #       \|               |/
-            #        *1              *2
-            face = np.roll(face, -v_on_face[0])
-            p1, p2 = vertices[face[[1, 2]]]
-            if vertices_distances[face[1]] < 0.:
-                iright = plane.get_edge_intersection(p1, p2)
-                intersections_vertices.append(iright)
-                boundary_edge = [face[0], index_new_vertices]
-                clipped_crown_mesh_faces.append([face[0], face[1], index_new_vertices, face[0]])
-            else:
-                ileft = plane.get_edge_intersection(p1, p2)
-                intersections_vertices.append(ileft)
-                boundary_edge = [index_new_vertices, face[0]]
-                clipped_crown_mesh_faces.append([index_new_vertices, face[2], face[0], index_new_vertices])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-            index_new_vertices += 1
-
-        elif face_type == '120':
-            #         *O
-            #        / \
-            #       /   \
-            #     1/     \2
-            # ----*-------*----
-            # face = np.roll(face, -v_above_face[0])
-            # boundary_edge = [face[1], face[2]]
-            # FIXME: quick fix here : robust ?
-            boundary_edge = None
-
-        elif face_type == '021':
-            #  ----*-------*----
-            #      2\     /1
-            #        \   /
-            #         \ /
-            #          *0
-            face = np.roll(face, -v_below_face[0])
-            boundary_edge = [face[2], face[1]]
-            face = list(face)
-            face.append(face[0])
-            clipped_crown_mesh_faces.append(face)
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-
-        elif face_type == '022':
-            # ----*-----*----
-            #    0|     |3
-            #     |     |
-            #    1*-----*2
-            if v_on_face[1] == v_on_face[0] + 1:
-                face = np.roll(face, -v_on_face[1])
-            boundary_edge = [face[0], face[3]]
-            clipped_crown_mesh_faces.append(list(face))
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-
-        elif face_type == '012':
-            #   ------*------
-            #        / \
-            #       /   \
-            #      /     \
-            #     *-------*
-            boundary_edge = None
-            face = list(face)
-            face.append(face[0])
-            clipped_crown_mesh_faces.append(face)
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-
-        elif face_type == '220':
-            #    0*-----*3
-            #     |     |
-            #    1|     |2
-            # ----*-----*----
-
-            # if v_above_face[1] == v_above_face[0] + 1:
-            #     face = np.roll(face, -v_above_face[1])
-            # boundary_edge = [face[1], face[2]]
-            # FIXME: quick fix here : robust ?
-            boundary_edge = None
-
-        elif face_type == '121':
-            #       *0
-            #      / \
-            #     /   \
-            # ---*-----*---
-            #    1\   /3
-            #      \ /
-            #       *2
-            face = np.roll(face, -v_above_face[0])
-            boundary_edge = [face[1], face[3]]
-            clipped_crown_mesh_faces.append([face[1], face[2], face[3], face[1]])
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-
-        elif face_type == '300' or face_type == '400':
-            #       *               *-----*
-            #      / \              |     |
-            #     /300\      or     | 400 |
-            #    *-----*            *-----*
-            # ____________       ______________
-            boundary_edge = None
-
-        elif face_type == '003':
-            #  -----------
-            #       *
-            #      / \
-            #     /   \
-            #    *-----*
-            boundary_edge = None
-            face = list(face)
-            face.append(face[0])
-            clipped_crown_mesh_faces.append(face)
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-
-        elif face_type == '004':
-            #  ---------------
-            #      *-----*
-            #      |     |
-            #      |     |
-            #      *-----*
-            boundary_edge = None
-            clipped_crown_mesh_faces.append(list(face))
-            clipped_crown_mesh_relative_faces_ids.append(face_id)
-
-        elif face_type == '030' or face_type == '040':
-            # Face is totally on the plane --> rare case...
-            boundary_edge = None
-
-        else:
-            raise Exception("Face %u clipping case %s not known." % (face_id, face_type))
-
-        # Building boundary connectivity
-        if boundary_edge is not None:
-            direct_boundary_edges[boundary_edge[0]] = boundary_edge[1]
-            inv_boundary_edges[boundary_edge[1]] = boundary_edge[0]
-
-    if len(intersections_vertices) > 0:
-        vertices = np.concatenate((vertices, intersections_vertices))
-
-    clipped_crown_mesh = Mesh(vertices, clipped_crown_mesh_faces)
-    clipped_crown_mesh._clipping_data = {
-        'faces_ids': crown_mesh._clipping_data['faces_ids'][clipped_crown_mesh_relative_faces_ids]
+    # Simple criteria ensuring that faces are totally above or below the plane (4 vertices at the same side)
+    # Works for both triangles and quadrangles
+    lower_faces_ids = np.where(nb_vertices_below_per_face == 4)[0]
+    crown_faces_ids = np.where((nb_vertices_below_per_face > 0)
+                               & (nb_vertices_below_per_face < 4)
+                               & (nb_vertices_above_per_face < 4))[0]
+    # The other faces have no vertex below the plane and are removed.
+
+    # Edges of the crown faces
+    crown_faces = faces[crown_faces_ids]
+    edges_ends = np.roll(crown_faces, -1, axis=1)
+    crown_is_triangle = crown_faces[:, 0] == crown_faces[:, 3]
+
+    kept_vertices_mask = ~above_vertices_mask[crown_faces]
+    kept_vertices_mask[crown_is_triangle, 3] = False  # Repeated vertex of the triangles
+    crossing_edges_mask = ((above_vertices_mask[crown_faces] & below_vertices_mask[edges_ends])
+                           | (below_vertices_mask[crown_faces] & above_vertices_mask[edges_ends]))
+
+    # Intersections of the crossing edges with the plane, computed once per edge
+    edges_starts = crown_faces[crossing_edges_mask]
+    edges_stops = edges_ends[crossing_edges_mask]
+    edges = np.stack((np.minimum(edges_starts, edges_stops), np.maximum(edges_starts, edges_stops)), axis=1)
+    unique_edges, edges_new_vertices = np.unique(edges, axis=0, return_inverse=True)
+    d0 = vertices_distances[unique_edges[:, 0]]
+    d1 = vertices_distances[unique_edges[:, 1]]
+    t = (d0 / (d0 - d1))[:, np.newaxis]
+    intersections_vertices = (1 - t) * vertices[unique_edges[:, 0]] + t * vertices[unique_edges[:, 1]]
+
+    # Each crown face is described by 8 slots: its 4 vertices interleaved with the intersections on its 4 edges.
+    # The unused slots are set to -1.
+    slots = np.full((len(crown_faces), 8), -1, dtype=int)
+    slots[:, 0::2] = np.where(kept_vertices_mask, crown_faces, -1)
+    new_vertices_ids = np.full(crown_faces.shape, -1, dtype=int)
+    new_vertices_ids[crossing_edges_mask] = len(vertices) + edges_new_vertices.reshape(-1)
+    slots[:, 1::2] = new_vertices_ids
+
+    # Start from the first vertex above the plane (if any) and move the unused slots at the end.
+    first_slot = 2*np.argmax(above_vertices_mask[crown_faces], axis=1)
+    rows = np.arange(len(crown_faces))[:, np.newaxis]
+    slots = slots[rows, (first_slot[:, np.newaxis] + np.arange(8)) % 8]
+    slots = np.take_along_axis(slots, np.argsort(slots < 0, axis=1, kind='stable'), axis=1)
+    nb_vertices_per_clipped_face = np.count_nonzero(slots >= 0, axis=1)
+
+    # The clipped faces have from 3 to 6 vertices and are split into triangles and quadrangles.
+    new_faces_patterns = {
+        3: [[0, 1, 2, 0]],
+        4: [[0, 1, 2, 3]],
+        #       *
+        #      / \
+        #  ---o---o---
+        #    0/     \4
+        #   1*       *3
+        #     \     /
+        #      \   /
+        #       \ /
+        #        *2
+        5: [[0, 1, 3, 4], [1, 2, 3, 1]],
+        # Only for non-convex quadrangles crossing the plane twice.
+        6: [[0, 1, 2, 0], [3, 4, 5, 3]],
     }
-
-    return clipped_crown_mesh
-
+    clipped_crown_faces = []
+    clipped_crown_faces_ids = []
+    for nb_vertices, patterns in new_faces_patterns.items():
+        faces_with_this_nb_of_vertices = np.where(nb_vertices_per_clipped_face == nb_vertices)[0]
+        for pattern in patterns:
+            clipped_crown_faces.append(slots[faces_with_this_nb_of_vertices][:, pattern])
+            clipped_crown_faces_ids.append(crown_faces_ids[faces_with_this_nb_of_vertices])
+    clipped_crown_faces_ids = np.concatenate(clipped_crown_faces_ids)
+    order = np.argsort(clipped_crown_faces_ids, kind='stable')
+
+    return (np.concatenate((vertices, intersections_vertices)),
+            np.concatenate((faces[lower_faces_ids], np.concatenate(clipped_crown_faces)[order])),
+            np.concatenate((lower_faces_ids, clipped_crown_faces_ids[order])),
+            len(crown_faces_ids))
@@ -6,14 +6,12 @@
 
 import logging
 import reprlib
-from itertools import chain, accumulate
-from functools import lru_cache
 from typing import Iterable, Union
 
 import numpy as np
 
-from capytaine.meshes.geometry import Abstract3DObject, inplace_transformation
-from capytaine.meshes.meshes import Mesh
+from capytaine.meshes.geometry import Abstract3DObject, inplace_transformation, modifications_stamp
+from capytaine.meshes.meshes import Mesh, FacesView
 
 LOG = logging.getLogger(__name__)
 
@@ -23,6 +21,9 @@ class CollectionOfMeshes(Abstract3DObject):
     It gives access to all the vertices of all the sub-meshes as if it were a mesh itself.
     Collections can be nested to store meshes in a tree structure.
 
+    The concatenated arrays (vertices, faces, faces properties...) are computed at the first access
+    and cached until the collection or one of its sub-meshes is modified.
+
     Parameters
     ----------
     meshes: Iterable of Mesh or CollectionOfMeshes
@@ -40,6 +41,8 @@ class CollectionOfMeshes(Abstract3DObject):
 
         self.name = name
 
+        self.__internals__ = dict()
+
         LOG.debug(f"New collection of meshes: {repr(self)}")
 
     def __repr__(self):
@@ -105,13 +108,49 @@ class CollectionOfMeshes(Abstract3DObject):
     def nb_submeshes(self):
         return len(self)
 
+    def _check_cache(self):
+        """Clear the cached arrays if one of the sub-meshes has been modified since they have been computed.
+        The sub-meshes are only inspected if some 3D object has been modified since the last check."""
+        stamp = modifications_stamp()
+        if self.__internals__.get('checked_at') != stamp:
+            submeshes_state = tuple(_modifications_state(mesh) for mesh in self)
+            if self.__internals__.get('submeshes_state') != submeshes_state:
+                self.__internals__.clear()
+                self.__internals__['submeshes_state'] = submeshes_state
+            self.__internals__['checked_at'] = stamp
+
+    def _concatenated(self, property_name):
+        """Concatenation of a property of all the sub-meshes, computed once and cached."""
+        self._check_cache()
+        if property_name not in self.__internals__:
+            self.__internals__[property_name] = np.concatenate([getattr(mesh, property_name) for mesh in self])
+        return self.__internals__[property_name]
+
+    @property
+    def _vertices_offsets(self):
+        """Index of the first vertex of each sub-mesh in the concatenated array of vertices,
+        followed by the total number of vertices."""
+        self._check_cache()
+        if 'vertices_offsets' not in self.__internals__:
+            self.__internals__['vertices_offsets'] = np.cumsum([0] + [mesh.nb_vertices for mesh in self])
+        return self.__internals__['vertices_offsets']
+
+    @property
+    def _faces_offsets(self):
+        """Index of the first face of each sub-mesh in the concatenated array of faces,
+        followed by the total number of faces."""
+        self._check_cache()
+        if 'faces_offsets' not in self.__internals__:
+            self.__internals__['faces_offsets'] = np.cumsum([0] + [mesh.nb_faces for mesh in self])
+        return self.__internals__['faces_offsets']
+
     @property
     def nb_vertices(self):
-        return sum(mesh.nb_vertices for mesh in self)
+        return int(self._vertices_offsets[-1])
 
     @property
     def nb_faces(self):
-        return sum(mesh.nb_faces for mesh in self)
+        return int(self._faces_offsets[-1])
 
     @property
     def volume(self):
@@ -119,7 +158,7 @@ class CollectionOfMeshes(Abstract3DObject):
 
     @property
     def vertices(self):
-        return np.concatenate([mesh.vertices for mesh in self])
+        return self._concatenated('vertices')
 
     @property
     def faces(self):
@@ -127,32 +166,37 @@ class CollectionOfMeshes(Abstract3DObject):
         later submeshes, the indices of the vertices has to be shifted to
         correspond to their index in the concatenated array self.vertices.
         """
-        nb_vertices = accumulate(chain([0], (mesh.nb_vertices for mesh in self[:-1])))
-        return np.concatenate([mesh.faces + nbv for mesh, nbv in zip(self, nb_vertices)])
+        self._check_cache()
+        if 'faces' not in self.__internals__:
+            self.__internals__['faces'] = np.concatenate([mesh.faces + nbv for mesh, nbv in zip(self, self._vertices_offsets)])
+        return self.__internals__['faces']
 
     @property
     def faces_normals(self):
-        return np.concatenate([mesh.faces_normals for mesh in self])
+        return self._concatenated('faces_normals')
 
     @property
     def faces_areas(self):
-        return np.concatenate([mesh.faces_areas for mesh in self])
+        return self._concatenated('faces_areas')
 
     @property
     def faces_centers(self):
-        return np.concatenate([mesh.faces_centers for mesh in self])
+        return self._concatenated('faces_centers')
 
     @property
     def faces_radiuses(self):
-        return np.concatenate([mesh.faces_radiuses for mesh in self])
+        return self._concatenated('faces_radiuses')
 
     @property
     def quadrature_points(self):
-        quad_submeshes = [mesh.quadrature_points for mesh in self]
-        return (
-            np.concatenate([quad[0] for quad in quad_submeshes]),  # Points
-            np.concatenate([quad[1] for quad in quad_submeshes])   # Weights
-        )
+        self._check_cache()
+        if 'quadrature' not in self.__internals__:
+            quad_submeshes = [mesh.quadrature_points for mesh in self]
+            self.__internals__['quadrature'] = (
+                np.concatenate([quad[0] for quad in quad_submeshes]),  # Points
+                np.concatenate([quad[1] for quad in quad_submeshes])   # Weights
+            )
+        return self.__internals__['quadrature']
 
     @property
     def quadrature_method(self):
@@ -168,24 +212,28 @@ class CollectionOfMeshes(Abstract3DObject):
 
     @property
     def center_of_mass_of_nodes(self):
-        return sum([mesh.nb_vertices*mesh.center_of_mass_of_nodes for mesh in self])/self.nb_vertices
+        self._check_cache()
+        if 'center_of_mass_of_nodes' not in self.__internals__:
+            self.__internals__['center_of_mass_of_nodes'] = \
+                sum([mesh.nb_vertices*mesh.center_of_mass_of_nodes for mesh in self])/self.nb_vertices
+        return self.__internals__['center_of_mass_of_nodes']
 
     @property
-    @lru_cache(maxsize=1024)
     def diameter_of_nodes(self):
-        return self.merged().diameter_of_nodes  # TODO: improve implementation
+        self._check_cache()
+        if 'diameter_of_nodes' not in self.__internals__:
+            self.__internals__['diameter_of_nodes'] = self.merged().diameter_of_nodes  # TODO: improve implementation
+        return self.__internals__['diameter_of_nodes']
 
     def indices_of_mesh(self, mesh_index: int) -> slice:
         """Return the indices of the faces for the sub-mesh given as argument."""
-        start = sum((mesh.nb_faces for mesh in self[:mesh_index]))  # Number of faces in previous meshes
-        return slice(start, start + self[mesh_index].nb_faces)
+        start, stop = self._faces_offsets[mesh_index], self._faces_offsets[mesh_index+1]
+        return slice(int(start), int(stop))
 
     def submesh_containing_face(self, id_face):
-        total_faces = 0
-        for id_mesh in range(self.nb_submeshes):
-            total_faces += self[id_mesh].nb_faces
-            if id_face < total_faces:
-                return id_mesh, id_face - (total_faces - self[id_mesh].nb_faces)
+        if 0 <= id_face < self.nb_faces:
+            id_mesh = int(np.searchsorted(self._faces_offsets, id_face, side='right')) - 1
+            return id_mesh, id_face - int(self._faces_offsets[id_mesh])
 
     ##################
     # Transformation #
@@ -203,17 +251,10 @@ class CollectionOfMeshes(Abstract3DObject):
         return merged
 
     def extract_one_face(self, id_face):
-        id_mesh, relative_id_face = self.submesh_containing_face(id_face)
-        mesh = self[id_mesh]
-
-        extracted_mesh = mesh.extract_one_face(relative_id_face)
-
-        if hasattr(mesh, '__internals__'):
-            for prop in mesh.__internals__:
-                if prop[:4] == "face":
-                    extracted_mesh.__internals__[prop] = mesh.__internals__[prop][[relative_id_face]]
+        return FacesView(self, [id_face], name="some single face")
 
-        return extracted_mesh
+    def faces_view(self, faces_ids, name=None):
+        return FacesView(self, faces_ids, name=name)
 
     def extract_faces(self, *args, **kwargs):
         return self.merged().extract_faces(*args, **kwargs)
@@ -239,7 +280,7 @@ class CollectionOfMeshes(Abstract3DObject):
     @inplace_transformation
     def clip(self, plane):
         self._clipping_data = {'faces_ids': []}
-        faces_shifts = list(accumulate(chain([0], (mesh.nb_faces for mesh in self[:-1]))))
+        faces_shifts = list(self._faces_offsets[:-1])
         for mesh, faces_shift in zip(self, faces_shifts):
             mesh.clip(plane)
             self._clipping_data['faces_ids'].extend([i + faces_shift for i in mesh._clipping_data['faces_ids']])
@@ -261,6 +302,11 @@ class CollectionOfMeshes(Abstract3DObject):
             mesh.keep_immersed_part(**kwargs)
         self.prune_empty_meshes()
 
+    def immersed_parts(self, positions, **kwargs):
+        """Yield the immersed part of the merged mesh for several positions (draft, trim, heel).
+        See :func:`capytaine.meshes.clipper.immersed_parts` for details."""
+        return self.merged().immersed_parts(positions, **kwargs)
+
     @inplace_transformation
     def prune_empty_meshes(self):
         """Remove empty meshes from the collection."""
@@ -294,3 +340,11 @@ class CollectionOfMeshes(Abstract3DObject):
 
     def show_matplotlib(self, *args, **kwargs):
         self.merged().show_matplotlib(*args, **kwargs)
+
+
+def _modifications_state(mesh):
+    """Nested tuple of the last modifications of a mesh or a collection and its sub-meshes."""
+    if isinstance(mesh, CollectionOfMeshes):
+        return getattr(mesh, '_last_modification', None), tuple(_modifications_state(submesh) for submesh in mesh)
+    else:
+        return getattr(mesh, '_last_modification', None)
@@ -6,6 +6,7 @@ Based on meshmagick <https://github.com/LHEEA/meshmagick> by François Rongère.
 # Copyright (C) 2017-2019 Matthieu Ancellin, based on the work of François Rongère
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
+import os
 from abc import ABC, abstractmethod
 
 import numpy as np
@@ -22,7 +23,9 @@ e_z = np.array((0, 0, 1))
 def inplace_transformation(inplace_function):
     """Decorator for methods transforming 3D objects:
     * Add the optional argument `inplace` to return a new object instead of doing the transformation in place.
-    * If the object has properties cached in an "__internals__" dict, they are deleted.
+    * If the object has properties cached in an "__internals__" dict, they are deleted,
+      unless the method has been marked with the decorator `keeps_internals`.
+      The modification is also recorded with `record_modification`.
     """
     def enhanced_inplace_function(self, *args, inplace=True, name=None, **kwargs):
         if not inplace:
@@ -31,11 +34,38 @@ def inplace_transformation(inplace_function):
             object3d = self
         inplace_function(object3d, *args, **kwargs)
         if hasattr(object3d, '__internals__'):
-            object3d.__internals__.clear()
+            if not getattr(inplace_function, 'keeps_internals', False):
+                object3d.__internals__.clear()
+            record_modification(object3d)
         return object3d
     return enhanced_inplace_function
 
 
+# Total number of modifications of 3D objects in the current process.
+_nb_modifications = 0
+
+
+def record_modification(object3d):
+    """Record that an object with cached properties has been modified, such that the collections
+    containing this object know that their own cache is outdated (see `modifications_stamp`)."""
+    global _nb_modifications
+    _nb_modifications += 1
+    object3d._last_modification = (os.getpid(), _nb_modifications)
+
+
+def modifications_stamp():
+    """Identifier of the current state of all the 3D objects of the process.
+    It changes whenever an object is modified."""
+    return os.getpid(), _nb_modifications
+
+
+def keeps_internals(inplace_function):
+    """Decorator for transformations that update by themselves the properties cached in the "__internals__" dict,
+    such as rigid transformations of meshes. To be used below `inplace_transformation`."""
+    inplace_function.keeps_internals = True
+    return inplace_function
+
+
 ##############################
 #  ABSTRACT 3D OBJECT CLASS  #
 ##############################
@@ -58,34 +88,42 @@ class Abstract3DObject(ABC):
         pass
 
     @inplace_transformation
+    @keeps_internals
     def translate_x(self, tx):
         return self.translate((tx, 0., 0.))
 
     @inplace_transformation
+    @keeps_internals
     def translate_y(self, ty):
         return self.translate((0., ty, 0.))
 
     @inplace_transformation
+    @keeps_internals
     def translate_z(self, tz):
         return self.translate((0., 0., tz))
 
     @inplace_transformation
+    @keeps_internals
     def translate_point_to_point(self, point_a, point_b):
         return self.translate(np.asarray(point_b) - np.asarray(point_a))
 
     @inplace_transformation
+    @keeps_internals
     def rotate_x(self, thetax):
         return self.rotate(Ox_axis, thetax)
 
     @inplace_transformation
+    @keeps_internals
     def rotate_y(self, thetay):
         return self.rotate(Oy_axis, thetay)
 
     @inplace_transformation
+    @keeps_internals
     def rotate_z(self, thetaz):
         return self.rotate(Oz_axis, thetaz)
 
     @inplace_transformation
+    @keeps_internals
     def rotate_around_center_to_align_vectors(self, center, vec1, vec2):
         """Rotate self such that if vec1 is in self, then it will point in the same direction as vec2."""
         vec1 = np.asarray(vec1)
@@ -153,6 +191,17 @@ def parallel_vectors_with_same_direction(vec1, vec2) -> bool:
     return parallel_vectors(vec1, vec2) and np.dot(vec1, vec2) > 0
 
 
+def sin_cos(angles):
+    """Sine and cosine of a one-dimensional array of angles, evaluated one angle at a time.
+
+    The vectorized implementations of numpy may differ from the scalar ones by one ulp, depending on the platform.
+    Evaluating the few distinct angles of a structured mesh one by one ensures that the coordinates that should be zero
+    (e.g. :math:`\\cos(\\pi/2)`) have the same sign on all platforms, and the same value as the scalar evaluation in the
+    loops of the previous versions of the mesh generators.
+    """
+    return np.array([np.sin(a) for a in angles]), np.array([np.cos(a) for a in angles])
+
+
 ################
 #  AXIS CLASS  #
 ################
@@ -12,8 +12,10 @@ from itertools import count
 import numpy as np
 from numpy.linalg import norm
 
-from capytaine.meshes.geometry import Abstract3DObject, Plane, inplace_transformation
-from capytaine.meshes.properties import compute_faces_properties, compute_connectivity
+from capytaine.meshes.geometry import (Abstract3DObject, Plane, inplace_transformation, keeps_internals,
+                                      record_modification)
+from capytaine.meshes.properties import (compute_faces_properties, compute_connectivity, sparse_matrix_to_dict_of_sets,
+                                         compute_quadrilateral_quadrature, compute_triangle_quadrature)
 from capytaine.meshes.surface_integrals import compute_faces_integrals
 from capytaine.meshes.quality import (merge_duplicates, heal_normals, remove_unused_vertices,
                                       heal_triangles, remove_degenerated_faces)
@@ -82,6 +84,7 @@ class Mesh(Abstract3DObject):
         assert self._vertices.shape[1] == 3, \
             "Vertices of a mesh should be provided as a sequence of 3-ple."
         self.__internals__.clear()
+        record_modification(self)
 
     @property
     def nb_faces(self) -> int:
@@ -104,6 +107,7 @@ class Mesh(Abstract3DObject):
             "The array of faces should only reference vertices that are in the mesh."
         self._faces = faces
         self.__internals__.clear()
+        record_modification(self)
 
     def copy(self, name=None) -> 'Mesh':
         """Get a copy of the current mesh instance.
@@ -163,14 +167,27 @@ class Mesh(Abstract3DObject):
             return self._faces[face_id]
 
     def extract_one_face(self, id_face):
-        vertices = self.vertices[self.faces[id_face, :], :]
-        mesh = SingleFace(vertices)
+        return FacesView(self, [id_face], name="some single face")
 
-        for prop in self.__internals__:
-            if prop[:4] == "face":
-                mesh.__internals__[prop] = self.__internals__[prop][[id_face]]
+    def faces_view(self, faces_ids, name=None):
+        """Lightweight mesh made of a subset of the faces of this mesh.
+
+        Contrary to :meth:`extract_faces`, the cost of this method only depends on the number of extracted faces
+        and the properties of the faces (areas, normals, quadrature points, ...) are taken from this mesh
+        instead of being recomputed. See :class:`FacesView`.
 
-        return mesh
+        Parameters
+        ----------
+        faces_ids: array of int or slice
+            Indices of the faces to be extracted
+        name: string, optional
+            Name for the new mesh
+
+        Returns
+        -------
+        FacesView
+        """
+        return FacesView(self, faces_ids, name=name)
 
     def extract_faces(self, id_faces_to_extract, return_index=False, name=None):
         """
@@ -190,22 +207,11 @@ class Mesh(Abstract3DObject):
         Mesh
             A new Mesh instance composed of the extracted faces
         """
-        nv = self.nb_vertices
-
-        # Determination of the vertices to keep
-        vertices_mask = np.zeros(nv, dtype=bool)
-        vertices_mask[self._faces[id_faces_to_extract].flatten()] = True
-        id_v = np.arange(nv)[vertices_mask]
-
-        # Building up the vertex array
-        v_extracted = self._vertices[id_v]
-        new_id__v = np.arange(nv)
-        new_id__v[id_v] = np.arange(len(id_v))
-
-        faces_extracted = self._faces[id_faces_to_extract]
-        faces_extracted = new_id__v[faces_extracted.flatten()].reshape((len(id_faces_to_extract), 4))
+        # Sorted indices of the vertices to keep and new indices of the vertices in the faces
+        id_v, faces_extracted = np.unique(self._faces[id_faces_to_extract], return_inverse=True)
+        faces_extracted = faces_extracted.reshape((-1, 4))
 
-        extracted_mesh = Mesh(v_extracted, faces_extracted)
+        extracted_mesh = Mesh(self._vertices[id_v], faces_extracted)
 
         for prop in self.__internals__:
             if prop[:4] == "face":
@@ -311,9 +317,16 @@ class Mesh(Abstract3DObject):
             return None
 
     def compute_quadrature(self, method):
+        """Compute the quadrature points and weights of all the faces at once.
+
+        Parameters
+        ----------
+        method: quadpy scheme or None
+            A quadrilateral scheme (applied on the faces seen as quadrangles, triangles being degenerate quadrangles)
+            or a triangle scheme (applied on each face split into two triangles).
+            If None, the default one-point quadrature at the center of the faces is restored.
+        """
         quadpy = import_optional_dependency("quadpy")
-        transform = quadpy.ncube._helpers.transform
-        get_detJ = quadpy.ncube._helpers.get_detJ
 
         if method is None:
             if 'quadrature' in self.__internals__:
@@ -323,35 +336,21 @@ class Mesh(Abstract3DObject):
                 pass
 
         elif isinstance(method, quadpy.quadrilateral._helpers.QuadrilateralScheme):
-            points = np.empty((self.nb_faces, len(method.points), 3))
-            weights = np.empty((self.nb_faces, len(method.points)))
-
-            self.heal_triangles()
-
-            for i_face in range(self.nb_faces):
-                ref = self.vertices[self.faces[i_face, 0], :]
-                A, B, C, D = self.vertices[self.faces[i_face, :], :] - ref
-                n = self.faces_normals[i_face, :]
-
-                ex = (B-A)/norm(B-A)
-                ez = n/norm(n)
-                ey = np.cross(ex, ez)
-                R = np.array([ex, ey, ez])
-                quadrilateral = np.array([[R @ A, R @ D], [R @ B, R @ C]])[:, :, :2]
-
-                quadpoints = transform(method.points.T, quadrilateral)
-                quadpoints = np.concatenate([quadpoints, np.zeros((quadpoints.shape[0], 1))], axis=1)
-                quadpoints = np.array([R.T @ p for p in quadpoints]) + ref
-                points[i_face, :, :] = quadpoints
-
-                weights[i_face, :] = method.weights * abs(get_detJ(method.points.T, quadrilateral))
+            points, weights = compute_quadrilateral_quadrature(self, method.points, method.weights)
+            self.__internals__['quadrature'] = (points, weights)
+            self.__internals__['quadrature_method'] = method
 
+        elif isinstance(method, quadpy.triangle._helpers.TriangleScheme):
+            barycentric_points = getattr(method, 'bary', method.points)
+            points, weights = compute_triangle_quadrature(self, barycentric_points, method.weights)
             self.__internals__['quadrature'] = (points, weights)
             self.__internals__['quadrature_method'] = method
 
         else:
             raise NotImplementedError
 
+        record_modification(self)
+
     ###############################
     #  Triangles and quadrangles  #
     ###############################
@@ -525,6 +524,7 @@ class Mesh(Abstract3DObject):
     ################################
 
     @inplace_transformation
+    @keeps_internals
     def translate(self, vector) -> 'Mesh':
         """Translates the mesh in 3D giving the 3 distances along coordinate axes.
 
@@ -536,11 +536,14 @@ class Mesh(Abstract3DObject):
         vector = np.asarray(vector, dtype=float)
         assert vector.shape == (3,), "The translation vector should be given as a 3-ple of values."
 
+        internals = self.__internals__.copy()
         self.vertices += vector
+        self._restore_transformed_internals(internals, np.identity(3), vector)
 
         return self
 
     @inplace_transformation
+    @keeps_internals
     def rotate(self, axis, angle) -> 'Mesh':
         """Rotate the mesh of a given wave_direction around an axis.
 
@@ -551,7 +554,9 @@ class Mesh(Abstract3DObject):
         """
         rot_matrix = axis.rotation_matrix(angle)
 
+        internals = self.__internals__.copy()
         self._vertices = np.transpose(np.dot(rot_matrix, self._vertices.T))
+        self._restore_transformed_internals(internals, rot_matrix, np.zeros(3))
 
         return self
 
@@ -565,6 +570,7 @@ class Mesh(Abstract3DObject):
         return self
 
     @inplace_transformation
+    @keeps_internals
     def mirror(self, plane) -> 'Mesh':
         """Flip the mesh with respect to a plane.
 
@@ -573,10 +579,49 @@ class Mesh(Abstract3DObject):
         plane : Plane
             The mirroring plane
         """
+        internals = self.__internals__.copy()
         self.vertices -= 2 * np.outer(np.dot(self.vertices, plane.normal) - plane.c, plane.normal)
         self.flip_normals()
+        reflection_matrix = np.identity(3) - 2 * np.outer(plane.normal, plane.normal)
+        self._restore_transformed_internals(internals, reflection_matrix, 2 * plane.c * plane.normal,
+                                            keep_orientation=False)
         return self
 
+    # Cached properties that are not modified by a rigid transformation of the mesh.
+    _INVARIANT_INTERNALS = ('faces_areas', 'faces_radiuses', 'diameter_of_nodes',
+                            'triangles_ids', 'quadrangles_ids', 'quadrature_method',
+                            'v_v_matrix', 'v_f_matrix', 'f_f_matrix', 'v_v', 'v_f', 'f_f')
+
+    def _restore_transformed_internals(self, internals, matrix, vector, keep_orientation=True):
+        """Restore the cached properties of the mesh after the rigid transformation x -> matrix @ x + vector,
+        instead of computing them again from scratch.
+
+        Parameters
+        ----------
+        internals: dict
+            The content of the cache before the transformation.
+        matrix: array of shape (3, 3)
+            An orthogonal matrix.
+        vector: array of shape (3,)
+        keep_orientation: bool, optional
+            False if the order of the vertices of the faces has been reversed,
+            in which case the boundaries are not restored. Default: True.
+        """
+        self.__internals__.clear()
+        for key in self._INVARIANT_INTERNALS:
+            if key in internals:
+                self.__internals__[key] = internals[key]
+        if keep_orientation and 'boundaries' in internals:
+            self.__internals__['boundaries'] = internals['boundaries']
+        if 'faces_normals' in internals:
+            self.__internals__['faces_normals'] = internals['faces_normals'] @ matrix.T
+        for key in ('faces_centers', 'center_of_mass_of_nodes'):
+            if key in internals:
+                self.__internals__[key] = internals[key] @ matrix.T + vector
+        if 'quadrature' in internals:
+            points, weights = internals['quadrature']
+            self.__internals__['quadrature'] = (points @ matrix.T + vector, weights)
+
     @inplace_transformation
     def clip(self, plane) -> 'Mesh':
         from capytaine.meshes.clipper import clip
@@ -604,6 +649,12 @@ class Mesh(Abstract3DObject):
             self.clip(Plane(normal=(0, 0, -1), point=(0, 0, sea_bottom)))
         return self
 
+    def immersed_parts(self, positions, **kwargs):
+        """Yield the immersed part of the mesh for several positions (draft, trim, heel) of the mesh.
+        See :func:`capytaine.meshes.clipper.immersed_parts` for details."""
+        from capytaine.meshes.clipper import immersed_parts
+        return immersed_parts(self, positions, **kwargs)
+
     @inplace_transformation
     def triangulate_quadrangles(self) -> 'Mesh':
         """Triangulates every quadrangles of the mesh by simple spliting.
@@ -667,10 +718,39 @@ class Mesh(Abstract3DObject):
     #
     # The current implementation below is a rough draft.
     # However, the equality shall still be use for testing.
+    #
+    # For the equality and the hash, the same set of faces is represented by a sorted array,
+    # which is computed with vectorized Numpy operations and cached.
 
     def as_set_of_faces(self):
         return frozenset(frozenset(tuple(vertex) for vertex in face) for face in self.vertices[self.faces])
 
+    def as_sorted_array_of_faces(self):
+        """Canonical representation of the mesh as an array of shape (nb_unique_faces, 12),
+        equivalent to :meth:`as_set_of_faces`: each line contains the coordinates of the distinct vertices
+        of a face in lexicographic order (padded with the first vertex for triangles),
+        and the lines are unique and sorted. Results are cached."""
+        if 'sorted_array_of_faces' not in self.__internals__:
+            faces_vertices = self.vertices[self.faces] + 0.0  # Adding zero turns -0.0 into 0.0.
+
+            # Sort the vertices of each face.
+            order = np.lexsort((faces_vertices[:, :, 2], faces_vertices[:, :, 1], faces_vertices[:, :, 0]), axis=-1)
+            faces_vertices = np.take_along_axis(faces_vertices, order[:, :, np.newaxis], axis=1)
+
+            # Replace the repeated vertices of a face (such as the fourth vertex of a triangle) by its first vertex.
+            repeated = np.zeros(faces_vertices.shape[:2], dtype=bool)
+            repeated[:, 1:] = np.all(faces_vertices[:, 1:, :] == faces_vertices[:, :-1, :], axis=-1)
+            # The distinct vertices are moved first.
+            order = np.argsort(repeated, axis=1, kind='stable')
+            faces_vertices = np.take_along_axis(faces_vertices, order[:, :, np.newaxis], axis=1)
+            repeated = np.take_along_axis(repeated, order, axis=1)
+            faces_vertices = np.where(repeated[:, :, np.newaxis], faces_vertices[:, 0:1, :], faces_vertices)
+
+            # Sort and remove duplicate faces. Faces are compared as raw bytes, which is faster than np.unique(..., axis=0).
+            faces_as_bytes = np.ascontiguousarray(faces_vertices.reshape(-1, 12)).view(f"V{12*faces_vertices.itemsize}")
+            self.__internals__['sorted_array_of_faces'] = np.unique(faces_as_bytes).view(faces_vertices.dtype).reshape(-1, 12)
+        return self.__internals__['sorted_array_of_faces']
+
     @staticmethod
     def from_set_of_faces(set_of_faces):
         faces = []
@@ -697,11 +777,11 @@ class Mesh(Abstract3DObject):
         if not isinstance(other, Mesh):
             return NotImplemented
         else:
-            return self.as_set_of_faces() == other.as_set_of_faces()
+            return np.array_equal(self.as_sorted_array_of_faces(), other.as_sorted_array_of_faces())
 
     def __hash__(self):
         if 'hash' not in self.__internals__:
-            self.__internals__['hash'] = hash(self.as_set_of_faces())
+            self.__internals__['hash'] = hash(self.as_sorted_array_of_faces().tobytes())
         return self.__internals__['hash']
 
     ##################
@@ -793,25 +873,47 @@ class Mesh(Abstract3DObject):
     #  Connectivities  #
     ####################
 
+    @property
+    def vv_matrix(self):
+        """Get the vertex / vertex connectivity as a sparse boolean matrix."""
+        if 'v_v_matrix' not in self.__internals__:
+            self.__internals__.update(compute_connectivity(self))
+        return self.__internals__['v_v_matrix']
+
+    @property
+    def vf_matrix(self):
+        """Get the vertex / faces connectivity as a sparse boolean matrix."""
+        if 'v_f_matrix' not in self.__internals__:
+            self.__internals__.update(compute_connectivity(self))
+        return self.__internals__['v_f_matrix']
+
+    @property
+    def ff_matrix(self):
+        """Get the face / faces connectivity as a sparse matrix.
+        The value is 1 if the two faces have consistent orientations, -1 otherwise."""
+        if 'f_f_matrix' not in self.__internals__:
+            self.__internals__.update(compute_connectivity(self))
+        return self.__internals__['f_f_matrix']
+
     @property
     def vv(self) -> dict:
         """Get the vertex / vertex connectivity dictionary."""
         if 'v_v' not in self.__internals__:
-            self.__internals__.update(compute_connectivity(self))
+            self.__internals__['v_v'] = sparse_matrix_to_dict_of_sets(self.vv_matrix)
         return self.__internals__['v_v']
 
     @property
     def vf(self) -> dict:
         """Get the vertex / faces connectivity dictionary."""
         if 'v_f' not in self.__internals__:
-            self.__internals__.update(compute_connectivity(self))
+            self.__internals__['v_f'] = sparse_matrix_to_dict_of_sets(self.vf_matrix)
         return self.__internals__['v_f']
 
     @property
     def ff(self) -> dict:
         """Get the face / faces connectivity dictionary."""
         if 'f_f' not in self.__internals__:
-            self.__internals__.update(compute_connectivity(self))
+            self.__internals__['f_f'] = sparse_matrix_to_dict_of_sets(self.ff_matrix)
         return self.__internals__['f_f']
 
     @property
@@ -829,13 +931,76 @@ class Mesh(Abstract3DObject):
         return len(self.__internals__['boundaries'])
 
 
-class SingleFace(Mesh):
-    """A view on a single face of a mesh.
-    To be used for ACA."""
+class FacesView(Mesh):
+    """A lightweight mesh made of a subset of the faces of another mesh.
+    To be used in the inner loops of the matrix building, such as the ACA or the chunked evaluation of the potential.
+
+    Only the vertices of the extracted faces are copied (once per face, without looking for the vertices shared
+    between faces) and the properties of the faces are indexed in the (cached) properties of the parent mesh.
+    Hence, the cost of the construction does not depend on the size of the parent mesh.
+    The copies and the pickles of a view are plain :class:`Mesh` objects, without the parent mesh.
+
+    Parameters
+    ----------
+    mesh: Mesh or CollectionOfMeshes
+        The parent mesh
+    faces_ids: array of int or slice
+        Indices of the faces of the parent mesh
+    name: string, optional
+        Name for the new mesh
+    """
+
+    def __init__(self, mesh, faces_ids, name=None):
+        if isinstance(faces_ids, slice):
+            faces_ids = np.arange(*faces_ids.indices(mesh.nb_faces))
+        else:
+            faces_ids = np.asarray(faces_ids, dtype=int)
 
-    _faces = np.arange(4).reshape((1, 4))
-    name = "some single face"
+        parent_faces = mesh.faces[faces_ids]
+        self._vertices = mesh.vertices[parent_faces.ravel()]
+        self._faces = np.arange(4*len(faces_ids)).reshape((-1, 4))
+        triangles = parent_faces[:, 0] == parent_faces[:, 3]
+        self._faces[triangles, 3] = self._faces[triangles, 0]
 
-    def __init__(self, vertices=None):
-        self._vertices = vertices
+        self.name = f"view_of_{mesh.name}" if name is None else str(name)
+        self.parent = mesh
+        self.faces_ids = faces_ids
         self.__internals__ = dict()
+
+    def __reduce_ex__(self, protocol):
+        # Copies (including the copies made by the transformations with inplace=False) and pickles of the view
+        # are plain meshes with the properties already computed, such that the parent mesh is neither copied nor pickled.
+        return Mesh, (self.vertices, self.faces, self.name), {'__internals__': dict(self.__internals__)}
+
+    def _from_parent(self, prop):
+        """Get a property of the faces by indexing the same property of the parent mesh.
+        Once the view has been modified (e.g. moved), the properties are computed from its own vertices instead."""
+        if prop not in self.__internals__:
+            if getattr(self, '_last_modification', None) is not None:
+                return getattr(Mesh, prop).fget(self)
+            self.__internals__[prop] = getattr(self.parent, prop)[self.faces_ids]
+        return self.__internals__[prop]
+
+    @property
+    def faces_areas(self) -> np.ndarray:
+        return self._from_parent('faces_areas')
+
+    @property
+    def faces_centers(self) -> np.ndarray:
+        return self._from_parent('faces_centers')
+
+    @property
+    def faces_normals(self) -> np.ndarray:
+        return self._from_parent('faces_normals')
+
+    @property
+    def faces_radiuses(self) -> np.ndarray:
+        return self._from_parent('faces_radiuses')
+
+    @property
+    def quadrature_points(self):
+        if 'quadrature' not in self.__internals__ and getattr(self, '_last_modification', None) is None:
+            points, weights = self.parent.quadrature_points
+            self.__internals__['quadrature'] = (points[self.faces_ids], weights[self.faces_ids])
+            self.__internals__['quadrature_method'] = self.parent.quadrature_method
+        return Mesh.quadrature_points.fget(self)
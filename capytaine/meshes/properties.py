@@ -6,7 +6,12 @@ Based on meshmagick <https://github.com/LHEEA/meshmagick> by François Rongère.
 # Copyright (C) 2017-2019 Matthieu Ancellin, based on the work of François Rongère
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
+import logging
+
 import numpy as np
+from scipy import sparse
+
+LOG = logging.getLogger(__name__)
 
 
 def compute_faces_properties(mesh):
@@ -91,11 +96,94 @@ def compute_radiuses(mesh, faces_centers):
     return faces_radiuses
 
 
+def _projected_faces_vertices(mesh):
+    """Coordinates of the vertices of each face, projected on the plane of the face
+    (the plane orthogonal to the normal of the face passing through its first vertex)."""
+    faces_vertices = mesh.vertices[mesh.faces, :]
+    # faces_vertices.shape == (nb_faces, 4, 3)
+    normals = mesh.faces_normals / np.linalg.norm(mesh.faces_normals, axis=1)[:, np.newaxis]
+    heights = np.einsum('fvk,fk->fv', faces_vertices - faces_vertices[:, 0:1, :], normals)
+    return faces_vertices - heights[:, :, np.newaxis] * normals[:, np.newaxis, :]
+
+
+def compute_quadrilateral_quadrature(mesh, points, weights):
+    """Map a quadrature rule of the reference square on all the faces of the mesh.
+
+    The faces are projected on their plane and the quadrature points are mapped with the bilinear transformation
+    sending the corners (-1, -1), (1, -1), (1, 1), (-1, 1) of the square on the four vertices of the face.
+    Triangles are seen as degenerate quadrangles with two identical vertices.
+
+    Parameters
+    ----------
+    mesh: Mesh
+    points: array of shape (nb_points, 2)
+        Quadrature points in the reference square [-1, 1]².
+    weights: array of shape (nb_points,)
+        Quadrature weights in the reference square (their sum is 4).
+
+    Returns
+    -------
+    array of shape (nb_faces, nb_points, 3), array of shape (nb_faces, nb_points)
+        Quadrature points and weights on the faces of the mesh.
+    """
+    xi, eta = np.asarray(points, dtype=float).T
+    shape_functions = 0.25*np.array([(1-xi)*(1-eta), (1+xi)*(1-eta), (1+xi)*(1+eta), (1-xi)*(1+eta)]).T
+    d_shape_functions_d_xi = 0.25*np.array([-(1-eta), (1-eta), (1+eta), -(1+eta)]).T
+    d_shape_functions_d_eta = 0.25*np.array([-(1-xi), -(1+xi), (1+xi), (1-xi)]).T
+    # shape_functions.shape == (nb_points, 4)
+
+    faces_vertices = _projected_faces_vertices(mesh)
+    quad_points = np.einsum('pv,fvk->fpk', shape_functions, faces_vertices)
+    jacobian_determinants = np.linalg.norm(np.cross(
+        np.einsum('pv,fvk->fpk', d_shape_functions_d_xi, faces_vertices),
+        np.einsum('pv,fvk->fpk', d_shape_functions_d_eta, faces_vertices),
+    ), axis=2)
+    quad_weights = np.asarray(weights, dtype=float)[np.newaxis, :] * jacobian_determinants
+    return quad_points, quad_weights
+
+
+def compute_triangle_quadrature(mesh, points, weights):
+    """Map a quadrature rule of the reference triangle on all the faces of the mesh.
+
+    The faces are projected on their plane and split into the two triangles (0, 1, 2) and (0, 2, 3).
+    For a triangle, one of them is degenerate and its quadrature points have a zero weight,
+    such that all faces have the same number of quadrature points whatever the position of the repeated vertex.
+
+    Parameters
+    ----------
+    mesh: Mesh
+    points: array of shape (nb_points, 3)
+        Barycentric coordinates of the quadrature points in the reference triangle.
+    weights: array of shape (nb_points,)
+        Quadrature weights in the reference triangle (their sum is 1).
+
+    Returns
+    -------
+    array of shape (nb_faces, 2*nb_points, 3), array of shape (nb_faces, 2*nb_points)
+        Quadrature points and weights on the faces of the mesh.
+    """
+    points = np.asarray(points, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+
+    faces_vertices = _projected_faces_vertices(mesh)
+    sub_triangles = faces_vertices[:, [[0, 1, 2], [0, 2, 3]], :]
+    # sub_triangles.shape == (nb_faces, 2, 3, 3)
+    areas = 0.5*np.linalg.norm(np.cross(sub_triangles[:, :, 1, :] - sub_triangles[:, :, 0, :],
+                                        sub_triangles[:, :, 2, :] - sub_triangles[:, :, 0, :]), axis=2)
+
+    quad_points = np.einsum('pv,ftvk->ftpk', points, sub_triangles).reshape((mesh.nb_faces, -1, 3))
+    quad_weights = (areas[:, :, np.newaxis] * weights[np.newaxis, np.newaxis, :]).reshape((mesh.nb_faces, -1))
+    return quad_points, quad_weights
+
+
 def compute_connectivity(mesh):
     """Compute the connectivities of the mesh.
 
     It concerns further connectivity than simple faces/vertices connectivities. It computes the vertices / vertices, vertices / faces and faces / faces connectivities.
 
+    The connectivities are computed with Numpy from a table of the edges of the faces,
+    and returned both as sparse matrices and as dictionaries of sets (for backward compatibility).
+
     Note
     ----
     * Note that if the mesh is not conformal, the algorithm may not perform correctly
@@ -105,79 +193,69 @@ def compute_connectivity(mesh):
 
     nv = mesh.nb_vertices
     nf = mesh.nb_faces
+    faces = mesh._faces
 
-    mesh_closed = True
+    # Table of the oriented edges of all the faces.
+    # For a triangle [a, b, c, a], the fourth edge a -> a is dropped.
+    edges_origins = faces.ravel()
+    edges_targets = np.roll(faces, -1, axis=1).ravel()
+    edges_faces = np.repeat(np.arange(nf), 4)
+    is_edge = edges_origins != edges_targets
+    edges_origins, edges_targets, edges_faces = edges_origins[is_edge], edges_targets[is_edge], edges_faces[is_edge]
 
-    # Building connectivities
+    # Identify the edges shared by several faces, independently of their orientation.
+    edges_keys = np.minimum(edges_origins, edges_targets) * nv + np.maximum(edges_origins, edges_targets)
+    _, edges_ids, edges_nb_faces = np.unique(edges_keys, return_inverse=True, return_counts=True)
+    edges_nb_faces = edges_nb_faces[edges_ids]
 
-    # Establishing v_v and v_f connectivities
-    v_v = dict([(i, set()) for i in range(nv)])
-    v_f = dict([(i, set()) for i in range(nv)])
-    for (iface, face) in enumerate(mesh._faces):
-        if face[0] == face[-1]:
-            face_w = face[:3]
-        else:
-            face_w = face
-        for (index, iV) in enumerate(face_w):
-            v_f[iV].add(iface)
-            v_v[face_w[index - 1]].add(iV)
-            v_v[iV].add(face_w[index - 1])
+    if np.any(edges_nb_faces > 2):
+        raise RuntimeError('Unexpected error while computing mesh connectivities')
+
+    # Connectivity v_v
+    v_v = sparse.coo_matrix((np.ones(2*len(edges_origins), dtype=bool),
+                             (np.concatenate([edges_origins, edges_targets]), np.concatenate([edges_targets, edges_origins]))),
+                            shape=(nv, nv)).tocsr()
+
+    # Connectivity v_f
+    v_f = sparse.coo_matrix((np.ones(len(edges_origins), dtype=bool), (edges_origins, edges_faces)),
+                            shape=(nv, nf)).tocsr()
 
     # Connectivity f_f
-    boundary_edges = dict()
-
-    f_f = dict([(i, set()) for i in range(nf)])
-    for ivertex in range(nv):
-        set1 = v_f[ivertex]
-        for iadj_v in v_v[ivertex]:
-            set2 = v_f[iadj_v]
-            intersection = list(set1 & set2)
-            if len(intersection) == 2:
-                f_f[intersection[0]].add(intersection[1])
-                f_f[intersection[1]].add(intersection[0])
-
-            elif len(intersection) == 1:
-                boundary_face = mesh._faces[intersection[0]]
-
-                if boundary_face[0] == boundary_face[-1]:
-                    boundary_face = boundary_face[:3]
-                ids = np.where((boundary_face == ivertex) + (boundary_face == iadj_v))[0]
-
-                if ids[1] != ids[0]+1:
-                    i_v_orig, i_v_target = boundary_face[ids]
-                else:
-                    i_v_target, i_v_orig = boundary_face[ids]
-
-                boundary_edges[i_v_orig] = i_v_target
-            else:
-                raise RuntimeError('Unexpected error while computing mesh connectivities')
+    # The value is 1 if the two faces go through their common edge in opposite directions (consistent normals),
+    # and -1 otherwise.
+    interior = np.flatnonzero(edges_nb_faces == 2)
+    interior = interior[np.argsort(edges_ids[interior], kind='stable')]
+    first, second = interior[0::2], interior[1::2]
+    orientation = np.where(edges_origins[first] == edges_targets[second], 1, -1)
+    f_f = sparse.coo_matrix((np.concatenate([orientation, orientation]),
+                             (np.concatenate([edges_faces[first], edges_faces[second]]),
+                              np.concatenate([edges_faces[second], edges_faces[first]]))),
+                            shape=(nf, nf)).tocsr()
 
     # Computing boundaries
+    # The boundary edges are oriented in the direction opposite to the one of their face.
+    boundary = np.flatnonzero(edges_nb_faces == 1)
+    boundary_edges = dict(zip(edges_targets[boundary].tolist(), edges_origins[boundary].tolist()))
     boundaries = list()
     # TODO: calculer des boundaries fermees et ouvertes (closed_boundaries et open_boundaries) et mettre dans dict
-    while True:
-        try:
-            boundary = list()
-            i_v0_init, i_v1 = boundary_edges.popitem()
-            boundary.append(i_v0_init)
+    while len(boundary_edges) > 0:
+        i_v0, i_v1 = boundary_edges.popitem()
+        boundary = [i_v0, i_v1]
+        while i_v1 in boundary_edges:
+            i_v1 = boundary_edges.pop(i_v1)
             boundary.append(i_v1)
-            i_v0 = i_v1
-
-            while True:
-                try:
-                    i_v1 = boundary_edges.pop(i_v0)
-                    boundary.append(i_v1)
-                    i_v0 = i_v1
-                except KeyError:
-                    if boundary[0] != boundary[-1]:
-                        print('Boundary is not closed !!!')
-                    else:
-                        boundaries.append(boundary)
-                    break
-        except KeyError:
-            break
-
-    return {'v_v': v_v,
-            'v_f': v_f,
-            'f_f': f_f,
-            'boundaries': boundaries}
\ No newline at end of file
+        if boundary[0] != boundary[-1]:
+            LOG.warning('Boundary is not closed !!!')
+        else:
+            boundaries.append(boundary)
+
+    return {'v_v_matrix': v_v,
+            'v_f_matrix': v_f,
+            'f_f_matrix': f_f,
+            'boundaries': boundaries}
+
+
+def sparse_matrix_to_dict_of_sets(matrix):
+    """Convert a sparse adjacency matrix into a dictionary associating each line to the set of its non-zero columns."""
+    matrix = sparse.csr_matrix(matrix)
+    return {i: set(matrix.indices[matrix.indptr[i]:matrix.indptr[i+1]].tolist()) for i in range(matrix.shape[0])}
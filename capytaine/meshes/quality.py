@@ -9,6 +9,7 @@ Based on meshmagick <https://github.com/LHEEA/meshmagick> by François Rongère.
 import logging
 
 import numpy as np
+from scipy.sparse.csgraph import breadth_first_order, connected_components
 
 from capytaine.meshes.geometry import inplace_transformation
 
@@ -72,83 +73,53 @@ def merge_duplicate_rows(arr, atol=1e-8):
     newID : ndarray
         array of the new new vertices IDs
     """
-    # This function is a bottleneck in the clipping routines
-    # TODO: use np.unique to cluster groups --> acceleration !!
-
-    # atol = pow(10, -decimals)
-
     arr = np.asarray(arr)
 
     nv, nbdim = arr.shape
 
-    levels = [0, nv]
-    iperm = np.arange(nv)
+    # The rows are sorted dimension by dimension, within the groups found in the previous dimensions.
+    # In each dimension, a group is split in levels: a new level starts at the first value that is farther than atol
+    # from the first value of the current level.
+    order = np.arange(nv)
+    group_ids = np.zeros(nv, dtype=int)
 
     for dim in range(nbdim):
-        # Sorting the first dimension
-        values = arr[:, dim].copy()
-        if dim > 0:
-            values = values[iperm]
-        levels_tmp = []
-        for (ilevel, istart) in enumerate(levels[:-1]):
-            istop = levels[ilevel+1]
-
-            if istop-istart > 1:
-                level_values = values[istart:istop]
-                iperm_view = iperm[istart:istop]
-
-                iperm_tmp = level_values.argsort()
-
-                level_values[:] = level_values[iperm_tmp]
-                iperm_view[:] = iperm_view[iperm_tmp]
-
-                levels_tmp.append(istart)
-                vref = values[istart]
-
-                for idx in range(istart, istop):
-                    cur_val = values[idx]
-                    if np.abs(cur_val - vref) > atol:
-                        levels_tmp.append(idx)
-                        vref = cur_val
-
-            else:
-                levels_tmp.append(levels[ilevel])
-        if len(levels_tmp) == nv:
-            # No duplicate rows
-            # if verbose:
-            # LOG.debug "\t -> No duplicate _vertices detected :)"
-            newID = np.arange(nv)
-
-        levels_tmp.append(nv)
-        levels = levels_tmp
+        # The quicksort of np.argsort is stable on the arrays of at most 16 elements (which are sorted by insertion),
+        # such that the stable np.lexsort sorts the small groups in the same order as np.argsort on each group.
+        # The larger groups are sorted again one by one with np.argsort, such that the ties (such as 0.0 and -0.0)
+        # are in the same order as in the former implementation and the same vertex is kept for each merged cluster.
+        groups_starts = np.flatnonzero(np.diff(group_ids, prepend=-1))
+        groups_stops = np.append(groups_starts[1:], nv)
+        large_groups = groups_stops - groups_starts > 16
+        sorted_order = order[np.lexsort((arr[order, dim], group_ids))]
+        for istart, istop in zip(groups_starts[large_groups], groups_stops[large_groups]):
+            group = order[istart:istop]
+            sorted_order[istart:istop] = group[np.argsort(arr[group, dim])]
+        order = sorted_order
+        values = arr[order, dim]
+
+        # Since the values are sorted, a gap larger than atol between two consecutive values always starts a new level.
+        starts = np.ones(nv, dtype=bool)
+        starts[1:] = (group_ids[1:] != group_ids[:-1]) | (np.abs(values[1:] - values[:-1]) > atol)
+
+        # Between these starts, new levels only need to be looked for in the (rare) runs spanning more than atol.
+        runs_starts = np.flatnonzero(starts)
+        runs_stops = np.append(runs_starts[1:], nv)[:len(runs_starts)]
+        wide_runs = values[runs_stops-1] - values[runs_starts] > atol
+        for istart, istop in zip(runs_starts[wide_runs], runs_stops[wide_runs]):
+            vref = values[istart]
+            for idx in range(istart+1, istop):
+                if np.abs(values[idx] - vref) > atol:
+                    starts[idx] = True
+                    vref = values[idx]
+
+        group_ids = np.cumsum(starts) - 1
+
+    # Building the new merged node list
+    newID = np.empty(nv, dtype=int)
+    newID[order] = group_ids
+    arr = np.array(arr[order[np.flatnonzero(starts)]], dtype=float)
 
-    else:
-        # Building the new merged node list
-        arr_tmp = []
-        newID = np.arange(nv)
-        for (ilevel, istart) in enumerate(levels[:-1]):
-            istop = levels[ilevel+1]
-
-            arr_tmp.append(arr[iperm[istart]])
-            newID[iperm[list(range(istart, istop))]] = ilevel
-        arr = np.array(arr_tmp, dtype=float)
-        # Applying renumbering to cells
-        # if F is not None:
-        #     for cell in F:
-        #         cell[:] = newID[cell]
-
-        # if verbose:
-        # nv_new = arr.shape[0]
-        # LOG.debug "\t -> Initial number of nodes : {:d}".format(nv)
-        # LOG.debug "\t -> New number of nodes     : {:d}".format(nv_new)
-        # LOG.debug "\t -> {:d} nodes have been merged".format(nv-nv_new)
-
-    # if F is not None:
-    #     if return_index:
-    #         return arr, F, newID
-    #     else:
-    #         return arr, F
-    # else:
     return arr, newID
 
 
@@ -158,14 +129,11 @@ def heal_normals(mesh):
     """
     # TODO: return the different groups of a mesh in case it is made of several unrelated groups
 
-    nv = mesh.nb_vertices
     nf = mesh.nb_faces
     faces = mesh._faces
 
     # Building connectivities
-    v_v = mesh.vv
-    v_f = mesh.vf
-    f_f = mesh.ff
+    f_f = mesh.ff_matrix  # 1 if the two faces have consistent orientations, -1 otherwise
     boundaries = mesh.boundaries
 
     if len(boundaries) > 0:
@@ -173,62 +141,32 @@ def heal_normals(mesh):
     else:
         mesh_closed = True
 
-    # Flooding the mesh to find inconsistent normals
-    type_cell = np.zeros(nf, dtype=np.int32)
-    type_cell[:] = 4
-    type_cell[mesh.triangles_ids] = 3
-
-    f_vis = np.zeros(nf, dtype=bool)
-    f_vis[0] = True
-    stack = [0]
-    nb_reversed = 0
-    while 1:
-        if len(stack) == 0:
-            if np.any(np.logical_not(f_vis)):
-                iface = np.where(np.logical_not(f_vis))[0][0]
-                stack.append(iface)
-                f_vis[iface] = True
-            else:
-                break
-
-        iface = stack.pop()
-        face = faces[iface]
-        s1 = set(face)
-
-        for iadj_f in f_f[iface]:
-            if f_vis[iadj_f]:
-                continue
-            f_vis[iadj_f] = True
-            # Removing the other pointer
-            f_f[iadj_f].remove(iface)  # So as it won't go from iadj_f to iface in the future
-
-            # Shared vertices
-            adjface = faces[iadj_f]
-            s2 = set(adjface)
-            # try:
-            common_vertices = list(s1 & s2)
-            if len(common_vertices) == 2:
-                i_v1, i_v2 = common_vertices
-            else:
-                LOG.warning('faces %u and %u have more than 2 vertices in common !', iface, iadj_f)
-                continue
-
-            # Checking normal consistency
-            face_ref = np.roll(face[:type_cell[iface]], -np.where(face == i_v1)[0][0])
-            adj_face_ref = np.roll(adjface[:type_cell[iadj_f]], -np.where(adjface == i_v1)[0][0])
-
-            if face_ref[1] == i_v2:
-                i = 1
-            else:
-                i = -1
-
-            if adj_face_ref[i] == i_v2:
-                # Reversing normal
-                nb_reversed += 1
-                faces[iadj_f] = np.flipud(faces[iadj_f])
-
-            # Appending to the stack
-            stack.append(iadj_f)
+    # Flooding the mesh to find inconsistent normals:
+    # the faces are visited in breadth-first order from the first face of each connected component,
+    # and a face is reversed if its orientation is not consistent with the face from which it has been reached.
+    predecessors = np.full(nf, -9999)  # Same convention as scipy for the first face of each component.
+    _, components = connected_components(f_f, directed=False)
+    _, first_face_of_each_component = np.unique(components, return_index=True)
+    for iface in first_face_of_each_component:
+        order, component_predecessors = breadth_first_order(f_f, iface, directed=False, return_predecessors=True)
+        predecessors[order[1:]] = component_predecessors[order[1:]]
+
+    # A face is reversed if the number of inconsistent orientations along its path to the first face of its component
+    # is odd. This parity is accumulated along the predecessors by pointer jumping: at each iteration, the parity of
+    # the path to an ancestor is combined with the one of the path from this ancestor to its own ancestor, which then
+    # becomes the new ancestor of the face. The number of iterations is the logarithm of the depth of the tree.
+    reached_faces = np.flatnonzero(predecessors >= 0)
+    reversed_faces = np.zeros(nf, dtype=bool)
+    reversed_faces[reached_faces] = np.asarray(f_f[reached_faces, predecessors[reached_faces]]).ravel() < 0
+    ancestors = predecessors.copy()
+    pending_faces = reached_faces
+    while len(pending_faces) > 0:
+        reversed_faces[pending_faces] ^= reversed_faces[ancestors[pending_faces]]
+        ancestors[pending_faces] = ancestors[ancestors[pending_faces]]
+        pending_faces = pending_faces[ancestors[pending_faces] >= 0]
+
+    nb_reversed = np.count_nonzero(reversed_faces)
+    faces[reversed_faces] = np.fliplr(faces[reversed_faces])
 
     LOG.debug("* Healing normals to make them consistent and if possible outward")
     if nb_reversed > 0:
@@ -279,8 +217,8 @@ def remove_unused_vertices(mesh):
     vertices, faces = mesh._vertices, mesh._faces
 
     used_v = np.zeros(nv, dtype=bool)
-    used_v[sum(list(map(list, faces)), [])] = True
-    nb_used_v = sum(used_v)
+    used_v[faces.ravel()] = True
+    nb_used_v = np.count_nonzero(used_v)
 
     if nb_used_v < nv:
         new_id__v = np.arange(nv)
@@ -292,8 +230,6 @@ def remove_unused_vertices(mesh):
 
     LOG.debug("* Removing unused vertices in the mesh:")
     if nb_used_v < nv:
-        unused_v = np.where(np.logical_not(used_v))[0]
-        vlist_str = '[' + ', '.join(str(iV) for iV in unused_v) + ']'
         LOG.debug("\t--> %u unused vertices have been removed" % (nv - nb_used_v))
     else:
         LOG.debug("\t--> No unused vertices")
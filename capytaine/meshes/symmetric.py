@@ -294,7 +294,7 @@ class AxialSymmetricMesh(SymmetricMesh):
         rotated_profile.rotate_z(angle)
 
         nodes_slice = np.concatenate([profile_array, rotated_profile.vertices])
-        faces_slice = np.array([[i, i+n, i+n+1, i+1] for i in range(n-1)])
+        faces_slice = np.arange(n-1)[:, None] + np.array([0, n, n+1, 1])
         body_slice = Mesh(nodes_slice, faces_slice, name=f"slice_of_{name}")
         body_slice.merge_duplicates()
         body_slice.heal_triangles()
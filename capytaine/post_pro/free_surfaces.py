@@ -5,7 +5,6 @@
 # See LICENSE file at <https://github.com/mancellin/capytaine>
 
 import logging
-from itertools import product
 
 import numpy as np
 
@@ -61,19 +60,14 @@ class FreeSurface():
 
     def _generate_mesh(self):
         """Generate a 2D cartesian mesh."""
-        nodes = np.zeros(((self.nx+1)*(self.ny+1), 3), dtype=float)
-        panels = np.zeros((self.nx*self.ny, 4), dtype=int)
-
         X = np.linspace(*self.x_range, self.nx+1)
         Y = np.linspace(*self.y_range, self.ny+1)
-        for i, (x, y, z) in enumerate(product(X, Y, [0.0])):
-            nodes[i, :] = x, y, z
-
-        for k, (i, j) in enumerate(product(range(0, self.nx), range(0, self.ny))):
-            panels[k, :] = (j+i*(self.ny+1),
-                            (j+1)+i*(self.ny+1),
-                            (j+1)+(i+1)*(self.ny+1),
-                            j+(i+1)*(self.ny+1))
+        nodes = np.zeros(((self.nx+1)*(self.ny+1), 3), dtype=float)
+        nodes[:, 0], nodes[:, 1] = (coord.ravel() for coord in np.meshgrid(X, Y, indexing='ij'))
+
+        # Index of the first node of each panel, then of the other nodes by offsets in the grid.
+        first_nodes = (np.arange(self.nx)[:, None]*(self.ny+1) + np.arange(self.ny)[None, :]).ravel()
+        panels = first_nodes[:, None] + np.array([0, 1, self.ny+2, self.ny+1])
 
         return Mesh(nodes, panels, name=f"{self.name}_mesh")
 
@@ -30,23 +30,63 @@ def compute_kochin(result, theta, ref_point=(0.0, 0.0)):
         They probably have not been stored by the solver because the option keep_details=True have not been set.
         Please re-run the resolution with this option.""")
 
-    k = result.wavenumber
-    h = result.depth
+    return _kochin_kernel(result.body.mesh, result.wavenumber, result.depth, theta, ref_point) @ result.sources/(4*np.pi)
 
+
+def compute_kochins(results, theta, ref_point=(0.0, 0.0), chunk_size=100):
+    """Compute the far field coefficients of several results at once.
+
+    The results sharing the same body and the same wavenumber are computed together: the kernel is evaluated once
+    for all of them and applied to the matrix of their sources with a single matrix product.
+
+    Parameters
+    ----------
+    results: list of LinearPotentialFlowResult
+        solved potential flow problems
+    theta: float or 1-dim array of floats
+        angles at which the coefficient is computed
+    ref_point: couple of float, optional
+        point of reference around which the far field coefficient is computed
+    chunk_size: int, optional
+        the kernel is evaluated for at most this number of angles at a time, to limit the memory usage (default: 100)
+
+    Returns
+    -------
+    array of shape (len(results), len(theta))
+        values of the Kochin function
+    """
+    theta = np.atleast_1d(np.asarray(theta, dtype=float))
+
+    groups = {}
+    for i, result in enumerate(results):
+        if result.sources is None:
+            raise Exception(f"""The values of the sources of {result} cannot been found.
+            They probably have not been stored by the solver because the option keep_details=True have not been set.
+            Please re-run the resolution with this option.""")
+        groups.setdefault((result.body, result.omega, result.depth, result.g), []).append(i)
+
+    kochin = np.empty((len(results), len(theta)), dtype=complex)
+    for (body, omega, depth, g), indices in groups.items():
+        k = results[indices[0]].wavenumber
+        sources = np.array([results[i].sources for i in indices]).T  # shape (nb_faces, nb_results_in_group)
+        for start in range(0, len(theta), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            zs = _kochin_kernel(body.mesh, k, depth, theta[chunk], ref_point)
+            kochin[indices, chunk] = (zs @ sources).T/(4*np.pi)
+    return kochin
+
+
+def _kochin_kernel(mesh, k, h, theta, ref_point):
+    """Matrix of shape (nb_theta, nb_faces) such that the Kochin function is this matrix times the sources/(4π)."""
     # omega_bar.shape = (nb_faces, 2) @ (2, nb_theta)
-    omega_bar = (result.body.mesh.faces_centers[:, 0:2] - ref_point) @ (np.cos(theta), np.sin(theta))
+    omega_bar = (mesh.faces_centers[:, 0:2] - ref_point) @ (np.cos(theta), np.sin(theta))
 
     if 0 <= k*h < 20:
-        cih = np.cosh(k*(result.body.mesh.faces_centers[:, 2]+h))/np.cosh(k*h)
+        cih = np.cosh(k*(mesh.faces_centers[:, 2]+h))/np.cosh(k*h)
     else:
-        cih = np.exp(k*result.body.mesh.faces_centers[:, 2])
+        cih = np.exp(k*mesh.faces_centers[:, 2])
 
     # cih.shape = (nb_faces,)
     # omega_bar.T.shape = (nb_theta, nb_faces)
-    # result.body.mesh.faces_areas.shape = (nb_faces,)
-    zs = cih * np.exp(-1j * k * omega_bar.T) * result.body.mesh.faces_areas
-
-    # zs.shape = (nb_theta, nb_faces)
-    # result.sources.shape = (nb_faces,)
-    return zs @ result.sources/(4*np.pi)
-
+    # mesh.faces_areas.shape = (nb_faces,)
+    return cih * np.exp(-1j * k * omega_bar.T) * mesh.faces_areas
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""Tools to store some precomputed data on disk and share them between Python processes."""
+# Copyright (C) 2017-2019 Matthieu Ancellin
+# See LICENSE file at <https://github.com/mancellin/capytaine>
+
+import os
+import logging
+import tempfile
+
+import numpy as np
+
+from capytaine.__about__ import __version__
+
+LOG = logging.getLogger(__name__)
+
+CACHE_DIR_ENVIRONMENT_VARIABLE = "CAPYTAINE_CACHE_DIR"
+
+
+def cache_directory(cache_dir=None):
+    """Return the directory in which the data should be cached, or None if the data should not be cached on disk.
+
+    Parameters
+    ----------
+    cache_dir: string, optional
+        Path to the directory. If None (default), the content of the environment variable
+        :code:`CAPYTAINE_CACHE_DIR` is used, if it is defined.
+        Otherwise, nothing is cached on disk.
+
+    Returns
+    -------
+    string or None
+        Path to a subdirectory specific to the current version of Capytaine.
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE, None)
+    if cache_dir is None or cache_dir == "":
+        return None
+    return os.path.join(os.path.expanduser(cache_dir), f"capytaine-{__version__}")
+
+
+def load_arrays(cache_dir, filename):
+    """Load the arrays stored in the file :code:`filename` in :code:`cache_dir` by :func:`save_arrays`.
+
+    Returns
+    -------
+    dict of arrays or None
+        None if the cache is disabled (:code:`cache_dir` is None) or the file does not exist or can not be read.
+    """
+    if cache_dir is None:
+        return None
+    path = os.path.join(cache_dir, filename)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as error:
+        LOG.warning("Ignoring unreadable cache file %s (%s)", path, error)
+        return None
+    LOG.debug("Loaded cached data from %s", path)
+    return arrays
+
+
+def save_arrays(cache_dir, filename, **arrays):
+    """Store the arrays in the file :code:`filename` in :code:`cache_dir`.
+
+    The file is first written with a temporary name and then renamed,
+    such that concurrent processes never read a partially written file.
+    Errors are logged but not raised, since the cache is not essential.
+    """
+    if cache_dir is None:
+        return
+    path = os.path.join(cache_dir, filename)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as error:
+        LOG.warning("Could not write cache file %s (%s)", path, error)
+        return
+    LOG.debug("Saved cached data in %s", path)
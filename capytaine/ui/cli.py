@@ -7,10 +7,13 @@
 import argparse
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from capytaine.io.legacy import import_cal_file, write_dataset_as_tecplot_files
 from capytaine.io.xarray import assemble_dataset
 from capytaine.bem.solver import BEMSolver
+from capytaine.bem.engines import BasicMatrixEngine, HierarchicalToeplitzMatrixEngine
+from capytaine.green_functions.delhommeau import Delhommeau
 
 logging.basicConfig(level=logging.INFO,
                     format="%(levelname)s:\t%(message)s")
@@ -22,27 +25,120 @@ parser.add_argument('paramfiles',
                     default=['./Nemoh.cal'],
                     nargs='*',
                     help='path of parameters files (default: ./Nemoh.cal)')
+parser.add_argument('-j', '--n-jobs',
+                    type=int, default=1,
+                    help='number of processes solving the problems in parallel, or -1 to use all the processors (default: 1)')
+parser.add_argument('--engine',
+                    choices=['basic', 'hierarchical'], default='basic',
+                    help='engine building and solving the linear systems (default: basic)')
+parser.add_argument('--linear-solver',
+                    choices=['gmres', 'direct'], default='gmres',
+                    help='linear solver of the basic engine (default: gmres)')
+parser.add_argument('--ACA-distance',
+                    type=float, default=8.0,
+                    help='distance above which the hierarchical engine compresses the interactions (default: 8.0)')
+parser.add_argument('--ACA-tol',
+                    type=float, default=1e-2,
+                    help='tolerance of the compression of the hierarchical engine (default: 1e-2)')
+parser.add_argument('--matrix-cache-size',
+                    type=int, default=1,
+                    help='number of interaction matrices kept in memory by each process (default: 1)')
+parser.add_argument('--pairs-geometry-cache-size',
+                    type=int, default=0,
+                    help='number of geometries of pairs of faces kept in memory by each process (default: 0)')
+
+
+def _solver_settings(args):
+    """Keyword arguments of the engine and of the Green function defined by the command-line arguments."""
+    if args.engine == 'hierarchical':
+        engine_settings = dict(ACA_distance=args.ACA_distance, ACA_tol=args.ACA_tol,
+                               matrix_cache_size=args.matrix_cache_size)
+    else:
+        engine_settings = dict(linear_solver=args.linear_solver, matrix_cache_size=args.matrix_cache_size)
+    green_function_settings = dict(pairs_geometry_cache_size=args.pairs_geometry_cache_size)
+    if args.engine == 'hierarchical' and args.pairs_geometry_cache_size > 0:
+        LOG.warning("The cache of the geometry of the pairs of faces does not speed up the hierarchical engine, "
+                    "whose many small blocks are cheaper to recompute than to look up. "
+                    "Consider using --pairs-geometry-cache-size only with the basic engine.")
+    return args.engine, engine_settings, green_function_settings
+
+
+# Solver of the current process.
+# The solvers are not sent to the worker processes, each of them builds its own from the settings.
+_solver = None
+
+
+def _init_solver(settings):
+    global _solver
+    engine, engine_settings, green_function_settings = settings
+    if engine == 'hierarchical':
+        engine = HierarchicalToeplitzMatrixEngine(**engine_settings)
+    else:
+        engine = BasicMatrixEngine(**engine_settings)
+    _solver = BEMSolver(green_function=Delhommeau(**green_function_settings), engine=engine)
+
+
+def _solve_problems(problems):
+    # The problems of a task share the same frequency, such that the matrices are reused from the cache of the engine.
+    results = [_solver.solve(problem, keep_details=False) for problem in sorted(problems)]
+    for result in results:
+        # The body is not sent back to the main process with each result, see `_results_with_body`.
+        result.problem.body = None
+    return results
+
+
+def _results_with_body(bodies, results_of_tasks):
+    """Give back to the results of each task the body of the main process, shared by all the problems of the task.
+    The bodies are collected before the resolution, since the problems of the main process are modified
+    when they are solved without worker processes."""
+    for body, results in zip(bodies, results_of_tasks):
+        for result in results:
+            result.problem.body = body
+            yield result
+
+
+def _tasks(problems):
+    """Group the problems by body and frequency."""
+    tasks = {}
+    for problem in problems:
+        tasks.setdefault((problem.body.name, problem.omega), []).append(problem)
+    return list(tasks.values())
 
 
 def main():
     args = parser.parse_args()
-    for paramfile in args.paramfiles:
-        problems = import_cal_file(paramfile)
-        solver = BEMSolver()
-        results = [solver.solve(pb) for pb in problems]
-        data = assemble_dataset(results)
-        print(data)
+    settings = _solver_settings(args)
 
-        results_directory = os.path.join(os.path.dirname(paramfile), 'results')
-        try:
-            os.mkdir(results_directory)
-        except FileExistsError:
-            LOG.warning("The 'results' directory already exists. You might be overwriting existing data.")
+    tasks = {paramfile: _tasks(import_cal_file(paramfile)) for paramfile in args.paramfiles}
+    bodies = {paramfile: [problems[0].body for problems in tasks[paramfile]] for paramfile in tasks}
 
-        LOG.info("Write results in legacy tecplot format.")
-        write_dataset_as_tecplot_files(results_directory, data)
+    if args.n_jobs == 1:
+        _init_solver(settings)
+        results = {paramfile: map(_solve_problems, tasks[paramfile]) for paramfile in tasks}
+        executor = None
+    else:
+        # All the tasks of all the parameters files are submitted at once to the pool of processes.
+        executor = ProcessPoolExecutor(max_workers=args.n_jobs if args.n_jobs > 0 else None,
+                                       initializer=_init_solver, initargs=(settings,))
+        results = {paramfile: executor.map(_solve_problems, tasks[paramfile]) for paramfile in tasks}
+
+    try:
+        for paramfile in tasks:
+            data = assemble_dataset(_results_with_body(bodies[paramfile], results[paramfile]))
+            print(data)
+
+            results_directory = os.path.join(os.path.dirname(paramfile), 'results')
+            try:
+                os.mkdir(results_directory)
+            except FileExistsError:
+                LOG.warning("The 'results' directory already exists. You might be overwriting existing data.")
+
+            LOG.info("Write results in legacy tecplot format.")
+            write_dataset_as_tecplot_files(results_directory, data)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 
 if __name__ == '__main__':
     main()
-
@@ -66,8 +66,8 @@ def test_exponential_integral(x, y):
 
 
 tabulation = {
-    Delhommeau_f90: Delhommeau_f90.initialize_green_wave.initialize_tabulated_integrals(328, 46, 251),
-    XieDelhommeau_f90: XieDelhommeau_f90.initialize_green_wave.initialize_tabulated_integrals(328, 46, 251),
+    Delhommeau_f90: Delhommeau_f90.initialize_green_wave.initialize_tabulated_integrals(328, 46, 100.0, -16.0, 251),
+    XieDelhommeau_f90: XieDelhommeau_f90.initialize_green_wave.initialize_tabulated_integrals(328, 46, 100.0, -16.0, 251),
 }
 
 def test_tabulations():
@@ -131,3 +131,101 @@ def test_symmetry_of_the_derivative_of_the_Green_function(X1, X2, omega, core):
                       rtol=1e-4)
 
 
+def test_pairs_geometry_cache():
+    """The precomputation of the wavenumber-independent data does not change the matrices."""
+    from capytaine.green_functions.delhommeau import Delhommeau
+    from capytaine.bodies.predefined.spheres import Sphere
+    mesh = Sphere(radius=1.0, ntheta=6, nphi=6, clip_free_surface=True).mesh.merged()
+    other_mesh = mesh.translated_x(4.0)
+
+    reference_gf = Delhommeau()
+    gf = Delhommeau(pairs_geometry_cache_size=2)
+    for wavenumber in [0.5, 1.0, 2.0]:
+        for mesh1, mesh2 in [(mesh, mesh), (mesh, other_mesh)]:
+            S_ref, K_ref = reference_gf.evaluate(mesh1, mesh2, 0.0, -np.infty, wavenumber)
+            S, K = gf.evaluate(mesh1, mesh2, 0.0, -np.infty, wavenumber)
+            assert np.allclose(S, S_ref, rtol=1e-10)
+            assert np.allclose(K, K_ref, rtol=1e-10)
+
+
+def test_custom_tabulation(tmp_path):
+    """A finer and larger tabulation gives close results, and is stored in the cache directory."""
+    from capytaine.green_functions.delhommeau import Delhommeau
+    from capytaine.bodies.predefined.spheres import Sphere
+    mesh = Sphere(radius=1.0, ntheta=6, nphi=6, clip_free_surface=True).mesh.merged()
+
+    S_ref, K_ref = Delhommeau().evaluate(mesh, mesh, 0.0, -np.infty, 1.0)
+
+    gf = Delhommeau(tabulation_nr=676, tabulation_rmax=200.0, tabulation_nz=48, tabulation_zmin=-30.0,
+                    cache_dir=tmp_path)
+    assert gf.tabulated_integrals[0].shape == (676,)
+    assert gf.tabulated_integrals[1].shape == (48,)
+    assert len(list(tmp_path.glob("*/*.npz"))) == 1
+    S, K = gf.evaluate(mesh, mesh, 0.0, -np.infty, 1.0)
+    assert np.abs(S - S_ref).max() < 1e-3*np.abs(S_ref).max()
+    assert np.abs(K - K_ref).max() < 1e-3*np.abs(K_ref).max()
+
+    Delhommeau.build_tabulated_integrals.cache_clear()
+    gf_from_disk = Delhommeau(tabulation_nr=676, tabulation_rmax=200.0, tabulation_nz=48, tabulation_zmin=-30.0,
+                              cache_dir=tmp_path)
+    for a, b in zip(gf.tabulated_integrals, gf_from_disk.tabulated_integrals):
+        assert np.all(a == b)
+
+    with pytest.raises(ValueError):
+        Delhommeau(tabulation_nz=46, tabulation_zmin=-10.0)
+
+
+def test_vectorized_ff():
+    from capytaine.green_functions.delhommeau import ff
+    X = np.linspace(-0.1, 20.0, 201)
+    for dimless_wavenumber in [0.3, 1.0, 5.0]:
+        dimless_omega = dimless_wavenumber*np.tanh(dimless_wavenumber)
+        reference = np.array([Delhommeau_f90.initialize_green_wave.ff(x, dimless_omega, dimless_wavenumber) for x in X])
+        assert np.allclose(ff(X, dimless_omega, dimless_wavenumber), reference, rtol=1e-6)
+
+
+def test_prony_decomposition_disk_cache(tmp_path):
+    from capytaine.green_functions.delhommeau import Delhommeau, _cached_exponential_decomposition
+    gf = Delhommeau(finite_depth_prony_decomposition_method='python', cache_dir=tmp_path)
+    a, lamda = gf.find_best_exponential_decomposition(1.0*np.tanh(1.0), 1.0)
+    assert len(list(tmp_path.glob("*/prony_python_*.npz"))) == 1
+
+    _cached_exponential_decomposition.cache_clear()
+    a_from_disk, lamda_from_disk = gf.find_best_exponential_decomposition(1.0*np.tanh(1.0), 1.0)
+    assert np.all(a == a_from_disk) and np.all(lamda == lamda_from_disk)
+
+
+@pytest.mark.parametrize("wavenumber", [0.01, 0.1, 1.0, 5.0])
+def test_prony_decomposition_table(wavenumber):
+    """The decomposition with fixed growth rates gives the same matrices as Nemoh's decomposition."""
+    from capytaine.green_functions.delhommeau import Delhommeau
+    from capytaine.bodies.predefined.spheres import Sphere
+    mesh = Sphere(radius=1.0, center=(0, 0, -2), ntheta=6, nphi=6, clip_free_surface=True).mesh.merged()
+    depth = 10.0
+
+    S_ref, K_ref = Delhommeau(finite_depth_prony_decomposition_method='fortran').evaluate(mesh, mesh, 0.0, -depth, wavenumber)
+    S, K = Delhommeau(finite_depth_prony_decomposition_method='table').evaluate(mesh, mesh, 0.0, -depth, wavenumber)
+    assert np.abs(S - S_ref).max() < 1e-3*np.abs(S_ref).max()
+    assert np.abs(K - K_ref).max() < 1e-3*np.abs(K_ref).max()
+
+
+def test_far_field_approximation():
+    from capytaine.green_functions.delhommeau import Delhommeau
+    from scipy.special import j0
+    gf = Delhommeau(far_field_kr=10.0)
+    assert gf.tabulated_integrals[0][-1] <= 10.0
+    assert gf.exportable_settings['far_field_kr'] == 10.0
+
+    # The imaginary part of the wave term is 2πk exp(kz) J0(kr)
+    for r, z in product([15.0, 30.0, 60.0], [-0.5, -2.0, -4.0]):
+        SP, _ = Delhommeau_f90.green_wave.wave_part_infinite_depth(
+            1.0, np.array([0.0, 0.0, z/2]), np.array([r, 0.0, z/2]), *gf.tabulated_integrals)
+        amplitude = 2*pi*np.exp(z)*np.sqrt(2/(pi*r))
+        assert abs(SP.imag - 2*pi*np.exp(z)*j0(r)) < 1e-2*amplitude
+
+    with pytest.raises(ValueError, match="kr < 2 "):
+        Delhommeau(far_field_kr=1.0)
+    with pytest.raises(ValueError, match="kr < 10.12 "):
+        Delhommeau(tabulation_nr=100, tabulation_rmax=300.0, far_field_kr=3.0)
+
+    assert Delhommeau().exportable_settings['far_field_kr'] == 100.0
@@ -218,3 +218,34 @@ def test_array_of_spheres():
     assert np.isclose(result.added_masses['2_0__Heave'], result2.added_masses['2_0__Heave'], atol=15.0)
     assert np.isclose(result.radiation_dampings['2_0__Heave'], result2.radiation_dampings['2_0__Heave'], atol=15.0)
 
+
+def test_pairs_geometry_cache_with_hierarchical_matrices(monkeypatch):
+    """The geometry of the full blocks is computed once for all the frequencies, and never for the rows and columns of the ACA."""
+    from capytaine.green_functions.delhommeau import Delhommeau
+    from capytaine.bem.engines import HierarchicalToeplitzMatrixEngine
+    from capytaine.meshes.meshes import FacesView
+
+    computed_pairs = []
+    compute_pairs_geometry = Delhommeau.compute_pairs_geometry
+    def counting_compute_pairs_geometry(self, mesh1, mesh2):
+        computed_pairs.append((mesh1, mesh2))
+        return compute_pairs_geometry(self, mesh1, mesh2)
+    monkeypatch.setattr(Delhommeau, "compute_pairs_geometry", counting_compute_pairs_geometry)
+
+    cylinder = HorizontalCylinder(length=10.0, radius=1.0, center=(0, 0, -2), clever=True, nr=2, ntheta=10, nx=10)
+    cylinder.add_translation_dof(name="Heave")
+    solver = cpt.BEMSolver(green_function=Delhommeau(pairs_geometry_cache_size=100),
+                           engine=HierarchicalToeplitzMatrixEngine(ACA_distance=2, matrix_cache_size=0))
+    reference_solver = cpt.BEMSolver(engine=HierarchicalToeplitzMatrixEngine(ACA_distance=2, matrix_cache_size=0))
+
+    nb_computed_pairs = []
+    for omega in [0.5, 1.0, 1.5]:
+        problem = RadiationProblem(body=cylinder, omega=omega, radiating_dof="Heave")
+        result = solver.solve(problem)
+        nb_computed_pairs.append(len(computed_pairs))
+        reference_result = reference_solver.solve(problem)
+        assert np.isclose(result.added_masses["Heave"], reference_result.added_masses["Heave"], rtol=1e-8)
+
+    assert nb_computed_pairs[0] > 0
+    assert nb_computed_pairs[2] == nb_computed_pairs[0]
+    assert not any(isinstance(mesh, FacesView) for pair in computed_pairs for mesh in pair)
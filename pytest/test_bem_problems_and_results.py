@@ -142,6 +142,29 @@ def test_Froude_Krylov():
     assert np.isclose(froude_krylov_force(problem)['Heave'], 27610, rtol=1e-3)
 
 
+@pytest.mark.parametrize("convention", ["Nemoh", "WAMIT"])
+@pytest.mark.parametrize("water_depth", [np.infty, 10.0])
+def test_batched_Froude_Krylov(convention, water_depth):
+    from capytaine.bem.airy_waves import airy_waves_potential, froude_krylov_forces
+    from capytaine.bodies.predefined.spheres import Sphere
+    from capytaine.bem.problems_and_results import DiffractionProblem
+
+    sphere = Sphere(radius=1.0, center=(1.0, 0.5, 0.0), ntheta=6, nphi=12, clip_free_surface=True)
+    sphere.add_all_rigid_body_dofs()
+    omegas = [0.5, 1.0, 2.0]
+    wave_directions = [0.0, np.pi/3, np.pi]
+    forces = froude_krylov_forces(sphere, omegas, wave_directions, water_depth=water_depth, convention=convention)
+    assert forces.shape == (3, 3, 6)
+
+    for i, omega in enumerate(omegas):
+        for j, wave_direction in enumerate(wave_directions):
+            pb = DiffractionProblem(body=sphere, omega=omega, wave_direction=wave_direction, sea_bottom=-water_depth)
+            pressure = -1j*omega*pb.rho*airy_waves_potential(sphere.mesh.faces_centers, pb, convention=convention)
+            for k, dof in enumerate(sphere.dofs.values()):
+                expected = np.sum(pressure * np.sum(dof * sphere.mesh.faces_normals, axis=1) * sphere.mesh.faces_areas)
+                assert np.isclose(forces[i, j, k], expected)
+
+
 def test_import_cal_file():
     """Test the importation of legacy Nemoh.cal files."""
     current_file_path = os.path.dirname(os.path.abspath(__file__))
@@ -227,6 +250,35 @@ def test_problems_from_dataset():
     assert len(problems) == 12
 
 
+def test_problems_grid():
+    from capytaine.io.xarray import ProblemsGrid
+    body = Sphere(center=(0, 0, -4), name="sphere")
+    body.add_translation_dof(name="Heave")
+    body.add_translation_dof(name="Surge", direction=(1, 0, 0))
+    other_body = body.translated_y(5.0, name="other_sphere")
+
+    dset = xr.Dataset(coords={'omega': [1.5, 0.5, 1.0],
+                              'radiating_dof': ["Surge", "Heave"],
+                              'wave_direction': [np.pi, 0.0],
+                              'water_depth': [np.infty, 10.0]})
+    grid = ProblemsGrid(dset, [body, other_body])
+    assert len(grid) == 2*3*2*(2 + 2)
+    problems = list(grid)
+    assert len(problems) == len(grid)
+    assert problems == sorted(problems)
+    assert all(problem in problems for problem in
+        [RadiationProblem(body=b, omega=omega, radiating_dof=dof, sea_bottom=-h)
+         for b in [body, other_body] for omega in [0.5, 1.0, 1.5] for dof in ["Surge", "Heave"] for h in [np.infty, 10.0]]
+        + [DiffractionProblem(body=b, omega=omega, wave_direction=beta, sea_bottom=-h)
+           for b in [body, other_body] for omega in [0.5, 1.0, 1.5] for beta in [np.pi, 0.0] for h in [np.infty, 10.0]])
+
+    # Invalid parameters are detected before building any problem.
+    with pytest.raises(ValueError):
+        ProblemsGrid(dset.assign_coords(radiating_dof=["Heave", "Pitch"]), [body])
+    with pytest.raises(NotImplementedError):
+        ProblemsGrid(dset.assign_coords(omega=[0.0, 1.0]), [body])
+
+
 def test_assemble_dataset():
     body = Sphere(center=(0, 0, -4), name="sphere")
     body.add_translation_dof(name="Heave")
@@ -52,3 +52,81 @@ def test_resolution():
     assert data_1['quadrature_method'] == "Sommariva 1"
     assert data_3['quadrature_method'] == "Sommariva 3"
     assert np.allclose(data_1["added_mass"].data, data_3["added_mass"].data, rtol=1e-2)
+
+
+class _QuadrilateralScheme:
+    def __init__(self, name, points, weights):
+        self.name, self.points, self.weights = name, np.array(points), np.array(weights)
+
+
+class _TriangleScheme:
+    def __init__(self, name, points, weights, bary=None):
+        self.name, self.points, self.weights = name, np.array(points), np.array(weights)
+        if bary is not None:
+            self.bary = np.array(bary)
+
+
+@pytest.fixture
+def fake_quadpy(monkeypatch):
+    """Minimal replacement of the quadpy module, such that the quadratures can be tested without quadpy."""
+    import sys
+    import types
+    fake = types.ModuleType("quadpy")
+    fake.quadrilateral = types.SimpleNamespace(_helpers=types.SimpleNamespace(QuadrilateralScheme=_QuadrilateralScheme))
+    fake.triangle = types.SimpleNamespace(_helpers=types.SimpleNamespace(TriangleScheme=_TriangleScheme))
+    monkeypatch.setitem(sys.modules, "quadpy", fake)
+    return fake
+
+
+def test_quadrature_schemes_without_quadpy(fake_quadpy):
+    mesh = cpt.Sphere(radius=1.0, ntheta=6, nphi=8, clever=False).mesh
+    assert mesh.nb_triangles > 0 and mesh.nb_quadrangles > 0
+
+    # Three-point rule on the midpoints of the edges of the triangle, exact for quadratic polynomials.
+    midpoints = [[0.5, 0.5, 0.0], [0.0, 0.5, 0.5], [0.5, 0.0, 0.5]]
+    weights = [1/3, 1/3, 1/3]
+    triangle_schemes = [
+        _TriangleScheme("midpoints", points=midpoints, weights=weights),
+        # Newer versions of quadpy store the barycentric coordinates in "bary" and something else in "points".
+        _TriangleScheme("midpoints", points=np.zeros((3, 2)), weights=weights, bary=midpoints),
+    ]
+    gauss_points = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])/np.sqrt(3)
+    quadrilateral_scheme = _QuadrilateralScheme("gauss_2x2", points=gauss_points, weights=[1.0]*4)
+
+    integrals = []
+    for scheme in triangle_schemes + [quadrilateral_scheme]:
+        mesh.compute_quadrature(scheme)
+        assert mesh.quadrature_method is scheme
+        points, weights = mesh.quadrature_points
+        assert np.allclose(weights.sum(axis=1), mesh.faces_areas, rtol=1e-2)
+        integrals.append(np.einsum('fp,fp->f', weights, points[:, :, 2]**2))
+    assert np.allclose(integrals[0], integrals[1])
+    assert np.allclose(integrals[0], integrals[2], rtol=1e-2)
+
+    mesh.compute_quadrature(None)
+    assert mesh.quadrature_method is None
+
+
+def test_pairs_geometry_cache_with_quadrature(fake_quadpy):
+    """The geometry of the pairs of faces cached for a quadrature is not reused for another quadrature of an equal mesh."""
+    from capytaine.green_functions.delhommeau import Delhommeau
+    mesh = cpt.Sphere(radius=1.0, ntheta=6, nphi=6, clip_free_surface=True).mesh.merged()
+    gf = Delhommeau(pairs_geometry_cache_size=4)
+    reference_gf = Delhommeau()
+    gf.evaluate(mesh, mesh, 0.0, -np.infty, 1.0)
+
+    gauss_points = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])/np.sqrt(3)
+    other_mesh = mesh.copy()
+    other_mesh.compute_quadrature(_QuadrilateralScheme("gauss_2x2", points=gauss_points, weights=[1.0]*4))
+    assert other_mesh == mesh and hash(other_mesh) == hash(mesh)
+
+    for mesh2 in [other_mesh, mesh]:
+        S, K = gf.evaluate(mesh, mesh2, 0.0, -np.infty, 1.0)
+        S_ref, K_ref = reference_gf.evaluate(mesh, mesh2, 0.0, -np.infty, 1.0)
+        assert np.allclose(S, S_ref, rtol=1e-10)
+        assert np.allclose(K, K_ref, rtol=1e-10)
+
+    with pytest.raises(ValueError):
+        pairs_geometry, _, _ = gf.compute_pairs_geometry(mesh, mesh)
+        gf._build_matrices(mesh, other_mesh, 1.0, np.infty, np.array((0.0, 0.0, 1.0)),
+                           np.empty(1), np.empty(1), pairs_geometry=pairs_geometry)
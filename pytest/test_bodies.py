@@ -99,6 +99,32 @@ def test_clipping_of_dofs(z_center, collection_of_meshes):
         assert len(clipped_sphere.dofs['test_dof']) == 0
 
 
+@pytest.mark.parametrize("collection_of_meshes", [True, False])
+def test_immersed_parts_dofs(collection_of_meshes):
+    """Check that the dofs of the body in a given position are the same as the dofs defined on the moved body."""
+    center = np.array([1.0, 0.0, 0.5])
+    cylinder = HorizontalCylinder(length=5.0, radius=1.0, center=center, nx=10, nr=2, ntheta=10,
+                                  clever=collection_of_meshes, name="cylinder")
+    cylinder.add_translation_dof(name="Heave")
+    cylinder.add_rotation_dof(Axis(vector=(1, 0, 0), point=center), name="Roll")
+
+    draft, trim, heel = 0.8, 0.1, 0.2
+    body, = cylinder.immersed_parts([(draft, trim, heel)], rotation_center=center)
+    assert body.name == "cylinder_draft_0.8_trim_0.1_heel_0.2"
+
+    matrix = Axis(vector=(0, 1, 0)).rotation_matrix(trim) @ Axis(vector=(1, 0, 0)).rotation_matrix(heel)
+    moved_center = center - np.array([0.0, 0.0, draft])
+    other_body = FloatingBody(mesh=body.mesh, name="other_cylinder")
+    other_body.add_translation_dof(direction=matrix @ (0, 0, 1), name="Heave")
+    other_body.add_rotation_dof(Axis(vector=matrix @ (1, 0, 0), point=moved_center), name="Roll")
+
+    assert body.mesh.vertices[:, 2].max() < 1e-12
+    assert np.allclose(body.dofs["Heave"], other_body.dofs["Heave"])
+    # The dofs of the clipped faces are the ones of the original faces, hence the comparison on the other faces only.
+    not_clipped = np.isclose(body.mesh.faces_areas, cylinder.mesh.merged().faces_areas[body.mesh._clipping_data['faces_ids']])
+    assert np.allclose(body.dofs["Roll"][not_clipped], other_body.dofs["Roll"][not_clipped])
+
+
 def test_mincing():
     body = HorizontalCylinder(length=10, radius=0.5, clever=False)
     body = body.minced((4, 1, 1))
@@ -128,3 +128,62 @@ def test_cylinder():
     HorizontalCylinder()
     VerticalCylinder()
     # TODO
+
+
+def test_free_surface_mesh():
+    from capytaine.post_pro.free_surfaces import FreeSurface
+    fs = FreeSurface(x_range=(-2, 5), nx=7, y_range=(0, 1), ny=4)
+    assert fs.mesh.nb_vertices == 8*5
+    assert fs.mesh.nb_faces == 7*4
+    assert np.allclose(fs.mesh.faces_areas, 0.25)
+    assert np.allclose(np.abs(fs.mesh.faces_normals), (0, 0, 1))
+    assert np.isclose(fs.mesh.faces_areas.sum(), fs.area)
+    assert np.allclose(fs.mesh.vertices[:, 2], 0.0)
+
+
+def test_generated_meshes_match_former_generators():
+    """The vectorized generators give the same vertices, bit for bit, as the former loop-based ones."""
+    from capytaine.bodies.predefined.spheres import Sphere
+    sphere = Sphere(radius=2.0, ntheta=4, nphi=4, clever=False)
+    former_sphere_vertices = np.array([
+        [-2.0, 1.2246467991473532e-16, -1.2246467991473532e-16],
+        [-1.4142135623730951, 8.659560562354934e-17, -1.4142135623730954],
+        [-1.4142135623730954, 8.659560562354935e-17, 1.414213562373095],
+        [2.4492935982947064e-16, -2.0, -1.2246467991473532e-16],
+        [-1.7319121124709868e-16, -1.4142135623730951, -1.4142135623730954],
+        [-1.731912112470987e-16, -1.4142135623730954, 1.414213562373095],
+        [0.0, 0.0, -2.0],
+        [-2.999519565323715e-32, -2.4492935982947064e-16, 2.0],
+        [0.0, 1.4142135623730951, -1.4142135623730954],
+        [0.0, 1.4142135623730954, 1.414213562373095],
+        [0.0, 2.0, -1.2246467991473532e-16],
+        [1.4142135623730951, 8.659560562354934e-17, -1.4142135623730954],
+        [1.4142135623730954, 8.659560562354935e-17, 1.414213562373095],
+        [2.0, 1.2246467991473532e-16, -1.2246467991473532e-16],
+    ])
+    former_sphere_faces = np.array([
+        [6, 4, 1, 6], [6, 1, 8, 6], [6, 8, 11, 6], [6, 11, 4, 6], [3, 0, 1, 4], [0, 10, 8, 1], [10, 13, 11, 8], [13, 3, 4, 11],
+        [5, 2, 0, 3], [2, 9, 10, 0], [9, 12, 13, 10], [12, 5, 3, 13], [7, 2, 5, 7], [7, 9, 2, 7], [7, 12, 9, 7], [7, 5, 12, 7],
+    ])
+    assert np.array_equal(sphere.mesh.vertices, former_sphere_vertices)
+    assert np.array_equal(np.signbit(sphere.mesh.vertices), np.signbit(former_sphere_vertices))
+    assert np.array_equal(sphere.mesh.faces, former_sphere_faces)
+
+    parallelepiped = RectangularParallelepiped(size=(1.0, 2.0, 3.0), resolution=(2, 3, 2), center=(0.0, 0.0, -1.5))
+    former_parallelepiped_vertices = np.array([
+        [-0.5, -1.0, -3.0], [-0.5, -1.0, -1.5], [-0.5000000000000001, -1.0, 0.0],
+        [-0.5, -0.33333333333333337, -3.0], [-0.5, -0.33333333333333326, -1.5], [-0.5, -0.33333333333333337, 0.0],
+        [-0.5, 0.33333333333333326, -3.0], [-0.49999999999999994, 0.33333333333333337, -1.5], [-0.5, 0.33333333333333326, 0.0],
+        [-0.5, 1.0, -3.0], [-0.5, 1.0, -1.5], [-0.4999999999999999, 1.0, 0.0],
+        [0.0, -1.0, -3.0], [0.0, -1.0, -1.5], [0.0, -1.0, 0.0],
+        [0.0, -0.33333333333333337, -3.0], [0.0, -0.33333333333333337, 0.0],
+        [0.0, 0.33333333333333326, -3.0], [0.0, 0.33333333333333326, 0.0],
+        [0.0, 1.0, -3.0], [0.0, 1.0, -1.5], [0.0, 1.0, 0.0],
+        [0.5000000000000001, -1.0, -3.0], [0.5, -1.0, -1.5], [0.5000000000000001, -1.0, 0.0],
+        [0.5, -0.33333333333333337, -3.0], [0.5, -0.33333333333333326, -1.5], [0.5, -0.33333333333333337, 0.0],
+        [0.5, 0.33333333333333326, -3.0], [0.49999999999999994, 0.33333333333333337, -1.5], [0.5, 0.33333333333333326, 0.0],
+        [0.4999999999999999, 1.0, -3.0], [0.4999999999999999, 1.0, -1.5], [0.5, 1.0, 0.0],
+    ])
+    vertices = parallelepiped.mesh.merged().vertices
+    assert np.array_equal(vertices, former_parallelepiped_vertices)
+    assert np.array_equal(np.signbit(vertices), np.signbit(former_parallelepiped_vertices))
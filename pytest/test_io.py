@@ -1,4 +1,5 @@
 
+import pytest
 import xarray as xr
 import numpy as np
 import capytaine as cpt
@@ -44,3 +45,120 @@ def test_xarray_dataset_with_more_data():
     ds = cpt.assemble_dataset(results, mesh=True)
     assert 'nb_faces' in ds.coords
     assert set(ds.coords['nb_faces'].values) == set([b.mesh.nb_faces for b in bodies])
+
+
+def test_fill_dataset_to_netcdf(tmp_path):
+    sphere = cpt.Sphere(radius=1.0, center=(0, 0, -2), ntheta=5, nphi=5, name="sphere")
+    sphere.add_translation_dof(name="Heave")
+    test_matrix = xr.Dataset(coords={'omega': [0.5, 1.0], 'radiating_dof': ["Heave"], 'wave_direction': [0.0]})
+    dataset = cpt.BEMSolver().fill_dataset(test_matrix, [sphere])
+
+    separate_complex_values(dataset).to_netcdf(tmp_path / "dataset.nc")
+    with xr.open_dataset(tmp_path / "dataset.nc") as saved:
+        reloaded = merge_complex_values(saved.load())
+    assert np.allclose(reloaded['added_mass'].values, dataset['added_mass'].values)
+    assert np.allclose(reloaded['diffraction_force'].values, dataset['diffraction_force'].values)
+    assert reloaded.attrs['far_field_kr'] == dataset.attrs['far_field_kr']
+
+
+def test_results_store(tmp_path):
+    sphere = cpt.Sphere(radius=1.0, center=(0, 0, -2), ntheta=6, nphi=6, name="sphere")
+    sphere.add_all_rigid_body_dofs()
+    sphere.mass = sphere.add_dofs_labels_to_matrix(np.eye(6))
+    solver = cpt.BEMSolver()
+    test_matrix = xr.Dataset(coords={
+        'omega': [0.5, 1.0, 1.5],
+        'radiating_dof': list(sphere.dofs),
+        'wave_direction': [0.0, np.pi/2],
+        'theta': [0.0, np.pi],
+    })
+    reference = solver.fill_dataset(test_matrix, [sphere], wavenumber=True)
+
+    # Interrupted sweep: only a part of the problems has been solved.
+    store = cpt.ResultsStore(tmp_path / "store", keep_sources=True)
+    solver.fill_dataset(test_matrix.sel(omega=[0.5]), [sphere], store=store)
+    assert len(store) == 8
+    with open(tmp_path / "store" / "records.jsonl", "a") as f:
+        f.write('{"problem": {"incomplete')  # Partially written last line.
+
+    store = cpt.ResultsStore(tmp_path / "store", keep_sources=True)
+    assert len(store) == 8
+    problems = cpt.io.xarray.problems_from_dataset(test_matrix, [sphere])
+    assert sum(problem in store for problem in problems) == 8
+
+    dataset = solver.fill_dataset(test_matrix, [sphere], store=store, wavenumber=True)
+    assert len(store) == 24
+    for variable in ['added_mass', 'radiation_damping', 'diffraction_force', 'Froude_Krylov_force',
+                     'kochin', 'kochin_diffraction', 'wavenumber', 'mass']:
+        assert np.allclose(dataset[variable], reference[variable])
+    assert list(dataset.coords['radiating_dof'].values) == list(sphere.dofs)
+
+    result = store.result(problems[0])
+    assert np.allclose(result.sources, solver.solve(problems[0]).sources)
+
+    with pytest.raises(ValueError):
+        solver.fill_dataset(test_matrix, [sphere], store=cpt.ResultsStore(tmp_path / "other_store"))
+
+    # The store is not resumed with another body with the same name.
+    store = cpt.ResultsStore(tmp_path / "store", keep_sources=True)
+    assert problems[0] in store
+    moved_sphere = sphere.translated_z(-1.0, name="sphere")
+    with pytest.raises(ValueError):
+        solver.fill_dataset(test_matrix, [moved_sphere], store=store)
+    sphere_with_other_dofs = cpt.Sphere(radius=1.0, center=(0, 0, -2), ntheta=6, nphi=6, name="sphere")
+    sphere_with_other_dofs.add_translation_dof(name="Surge")
+    with pytest.raises(ValueError):
+        store.append(solver.solve(cpt.RadiationProblem(body=sphere_with_other_dofs, omega=2.0)))
+
+
+def test_results_store_computes_the_fingerprint_once_per_body(tmp_path, monkeypatch):
+    import capytaine.io.results_store as results_store
+    computed = []
+    body_fingerprint = results_store._body_fingerprint
+    def counting_body_fingerprint(body):
+        computed.append(body.name)
+        return body_fingerprint(body)
+    monkeypatch.setattr(results_store, "_body_fingerprint", counting_body_fingerprint)
+
+    sphere = cpt.Sphere(radius=1.0, center=(0, 0, -2), ntheta=5, nphi=5, name="sphere")
+    sphere.add_translation_dof(name="Heave")
+    problems = [cpt.RadiationProblem(body=sphere, omega=omega) for omega in [0.5, 1.0, 1.5]]
+    store = cpt.ResultsStore(tmp_path / "store")
+    solver = cpt.BEMSolver()
+    for problem in problems:
+        if problem not in store:
+            store.append(solver.solve(problem))
+    assert all(problem in store for problem in problems)
+    assert len(computed) == 1
+
+    # The fingerprint is computed again when the body is modified.
+    sphere.dofs["Heave"] = -sphere.dofs["Heave"]
+    with pytest.raises(ValueError):
+        problems[0] in store
+    assert len(computed) == 2
+    sphere.dofs["Heave"] = -sphere.dofs["Heave"]
+    assert problems[0] in store
+    sphere.mesh.translate_z(-1.0)
+    with pytest.raises(ValueError):
+        problems[0] in store
+    assert len(computed) == 4
+
+
+def test_assemble_dataset_of_incomplete_grid():
+    body = cpt.Sphere(radius=1.0, center=(0, 0, -2), ntheta=6, nphi=6, name="sphere")
+    body.add_translation_dof(name="Surge")
+    body.add_translation_dof(name="Heave")
+    problems = [cpt.RadiationProblem(body=body, omega=omega, radiating_dof="Heave") for omega in [2.0, 1.0]]
+    problems += [cpt.RadiationProblem(body=body, omega=1.0, radiating_dof="Surge")]
+    problems += [cpt.DiffractionProblem(body=body, omega=1.0, wave_direction=0.0)]
+    results = cpt.BEMSolver().solve_all(problems, keep_details=False)
+    dataset = cpt.assemble_dataset(results)
+
+    assert list(dataset.coords['omega'].values) == [1.0, 2.0]
+    assert list(dataset.coords['radiating_dof'].values) == ["Surge", "Heave"]
+    assert list(dataset.coords['influenced_dof'].values) == ["Surge", "Heave"]
+    assert dataset['added_mass'].dims == ('omega', 'radiating_dof', 'influenced_dof')
+    assert np.all(np.isnan(dataset['added_mass'].sel(omega=2.0, radiating_dof="Surge")))
+    assert np.all(np.isnan(dataset['diffraction_force'].sel(omega=2.0)))
+    assert dataset['added_mass'].sel(omega=2.0, radiating_dof="Heave", influenced_dof="Heave") \
+        == [r for r in results if r.omega == 2.0][0].added_masses["Heave"]
@@ -6,23 +6,117 @@ import pytest
 
 import numpy as np
 
-from capytaine.io.mesh_writers import write_STL
-from capytaine.io.mesh_loaders import load_STL
+from capytaine.io.mesh_writers import write_STL, write_mesh
+from capytaine.io.mesh_loaders import load_STL, load_mesh
 from capytaine.bodies.predefined import Sphere
 
-try:
-    import vtk
-except ImportError:
-    vtk = None
 
-@pytest.mark.skipif(vtk is None,
-                    reason='vtk is not installed')
-def test_STL(tmp_path):
+@pytest.mark.parametrize("binary", [False, True])
+def test_STL(tmp_path, binary):
     mesh = Sphere().mesh.merged()
+    faces = mesh.faces.copy()
     filepath = tmp_path / "test.stl"
-    write_STL(filepath, mesh.vertices, mesh.faces)
+    write_STL(filepath, mesh.vertices, mesh.faces, binary=binary)
+    assert np.all(mesh.faces == faces)  # The writer does not modify its inputs.
     reloaded_mesh = load_STL(str(filepath), name="Bla")
 
     assert reloaded_mesh.name == "Bla"
-    assert np.allclose(mesh.vertices, reloaded_mesh.vertices)
+    assert np.allclose(mesh.vertices, reloaded_mesh.vertices, atol=1e-6)
     # Cannot compare the faces. The STL writer changed all quadrangles to two triangles.
+    assert reloaded_mesh.nb_faces == mesh.nb_triangles + 2*mesh.nb_quadrangles
+    assert np.isclose(reloaded_mesh.volume, mesh.volume)
+
+
+@pytest.mark.parametrize("file_format", ["gdf", "mar", "nem", "hst", "tec", "nat"])
+def test_text_formats(tmp_path, file_format):
+    mesh = Sphere(ntheta=6, nphi=8, clever=False).mesh
+    filepath = str(tmp_path / f"test.{file_format}")
+    write_mesh(filepath, mesh.vertices, mesh.faces, file_format)
+    reloaded_mesh = load_mesh(filepath, name="Bla")
+
+    assert reloaded_mesh.name == "Bla"
+    assert reloaded_mesh.nb_faces == mesh.nb_faces
+    # The GDF format duplicates the vertices, hence compare the coordinates of the vertices of each face.
+    assert np.allclose(reloaded_mesh.vertices[reloaded_mesh.faces], mesh.vertices[mesh.faces], atol=1e-5)
+
+
+def test_invalid_text_file(tmp_path):
+    filepath = tmp_path / "test.nem"
+    filepath.write_text("2\n1\n0.0 0.0 0.0\n1.0 nan_or_not 0.0\n1 2 2 1\n")
+    with pytest.raises(ValueError):
+        load_mesh(str(filepath))
+
+
+def test_invalid_numbers_with_silent_numpy(monkeypatch):
+    """Some versions of numpy silently stop parsing at the first invalid value, without warning."""
+    from capytaine.io.mesh_loaders import _parse_numbers
+    fromstring = np.fromstring
+    def silent_fromstring(text, dtype=float, sep=" "):
+        return fromstring(text.split("nan_or_not")[0], dtype=dtype, sep=sep)
+    monkeypatch.setattr(np, "fromstring", silent_fromstring)
+
+    assert np.all(_parse_numbers("1.0 2.0\n3.0 4.0", nb_columns=2) == [[1.0, 2.0], [3.0, 4.0]])
+    with pytest.raises(ValueError):
+        _parse_numbers("0.0 0.0 0.0\n1.0 nan_or_not 0.0\n", nb_columns=3)
+    with pytest.raises(ValueError):
+        _parse_numbers("1 2 3 nan_or_not 4", dtype=int)
+    with pytest.raises(ValueError):
+        _parse_numbers("1 2 3 4.5", dtype=int)
+    assert _parse_numbers("1 2 3 4", dtype=int).dtype == int
+
+
+@pytest.mark.parametrize("file_format", ["gdf", "mar", "hst", "vtk"])
+def test_writers_chunk_size(tmp_path, file_format):
+    mesh = Sphere(ntheta=6, nphi=8, clever=False).mesh
+    write_mesh(str(tmp_path / "all.mesh"), mesh.vertices, mesh.faces, file_format)
+    write_mesh(str(tmp_path / "chunked.mesh"), mesh.vertices, mesh.faces, file_format, chunk_size=5)
+    with open(tmp_path / "all.mesh") as f1, open(tmp_path / "chunked.mesh") as f2:
+        # The header may contain the date.
+        assert [l for l in f1 if "generated" not in l] == [l for l in f2 if "generated" not in l]
+
+
+@pytest.mark.parametrize("mmap_mode", ['c', None])
+def test_archive_of_symmetric_mesh(tmp_path, mmap_mode):
+    from capytaine.io.archive import save_archive, load_archive
+    from capytaine.meshes.symmetric import ReflectionSymmetricMesh, TranslationalSymmetricMesh
+    from capytaine.bodies.predefined import HorizontalCylinder
+    mesh = HorizontalCylinder(length=10.0, nx=6, nr=2, ntheta=8, clever=True).mesh
+    assert isinstance(mesh[0], TranslationalSymmetricMesh) and isinstance(mesh[0].first_slice, ReflectionSymmetricMesh)
+    mesh[0].first_slice.half.faces_normals  # Compute the properties of the faces of the first slice.
+
+    filepath = tmp_path / "cylinder.npz"
+    save_archive(filepath, mesh)
+    reloaded_mesh = load_archive(filepath, mmap_mode=mmap_mode)
+
+    assert isinstance(reloaded_mesh[0], TranslationalSymmetricMesh)
+    assert isinstance(reloaded_mesh[0].first_slice, ReflectionSymmetricMesh)
+    assert reloaded_mesh.tree_view() == mesh.tree_view()
+    assert 'faces_normals' in reloaded_mesh[0].first_slice.half.__internals__
+    assert np.allclose(reloaded_mesh.merged().vertices, mesh.merged().vertices)
+    assert np.all(reloaded_mesh.merged().faces == mesh.merged().faces)
+    assert np.allclose(reloaded_mesh.faces_normals, mesh.faces_normals)
+    assert np.isclose(reloaded_mesh.volume, mesh.volume)
+
+
+def test_archive_of_body(tmp_path):
+    from capytaine.io.archive import save_archive, load_archive
+    body = Sphere(radius=1.0, ntheta=6, nphi=6, name="ball")
+    body.add_all_rigid_body_dofs()
+    body.center_of_mass = np.array([0.0, 0.0, -0.5])
+
+    filepath = tmp_path / "ball.npz"
+    save_archive(filepath, body)
+    reloaded_body = load_archive(filepath)
+
+    assert reloaded_body.name == "ball"
+    assert list(reloaded_body.dofs) == list(body.dofs)
+    for dof in body.dofs:
+        assert np.allclose(reloaded_body.dofs[dof], body.dofs[dof])
+    assert np.allclose(reloaded_body.center_of_mass, body.center_of_mass)
+    assert np.allclose(reloaded_body.mesh.merged().vertices, body.mesh.merged().vertices)
+
+    reloaded_body.mesh.translate_z(-1.0)  # The file is never modified by the transformations of the reloaded mesh.
+    assert np.allclose(load_archive(filepath).mesh.merged().vertices, body.mesh.merged().vertices)
+
+    with pytest.raises(TypeError):
+        save_archive(filepath, "not a mesh")
@@ -9,7 +9,7 @@ from numpy.linalg import norm
 
 from capytaine.meshes.meshes import Mesh
 from capytaine.meshes.clipper import clip
-from capytaine.meshes.geometry import Plane, xOz_Plane
+from capytaine.meshes.geometry import Axis, Plane, xOz_Plane
 from capytaine.bodies.predefined import HorizontalCylinder, Sphere, Rectangle
 
 # Some meshes that will be used in the following tests.
@@ -75,6 +75,18 @@ def test_as_set_of_faces():
     assert Mesh.from_set_of_faces(faces) == cylinder  # The mesh can be reconstructed from a set of faces.
 
 
+def test_equality_and_hash():
+    """The equality and the hash do not depend on the numbering of the vertices and the faces."""
+    other_cylinder = Mesh(vertices=cylinder.vertices[::-1],
+                          faces=(cylinder.nb_vertices - 1 - cylinder.faces[::-1, ::-1]))
+    assert other_cylinder == cylinder
+    assert hash(other_cylinder) == hash(cylinder)
+    assert other_cylinder.as_set_of_faces() == cylinder.as_set_of_faces()
+
+    assert cylinder.translated_x(1e-3) != cylinder
+    assert Mesh.from_set_of_faces(cylinder.as_set_of_faces()).as_sorted_array_of_faces().shape == (cylinder.nb_faces, 12)
+
+
 def mesh_from_set_of_faces():
     A, B, C, D = (0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0)
 
@@ -127,6 +139,26 @@ def test_mirror():
     assert new_cylinder == cylinder
 
 
+@pytest.mark.parametrize("transformation", [
+    lambda mesh: mesh.translated((1.0, 2.0, 3.0)),
+    lambda mesh: mesh.rotated(Axis(vector=(1.0, 1.0, 0.3)), 0.7),
+    lambda mesh: mesh.mirrored(Plane(normal=(1.0, 0.2, 0.3), point=(0.5, 0.0, 1.0))),
+    lambda mesh: mesh.rotated_x(0.3).translated_z(2.0),
+])
+def test_cached_properties_under_rigid_transformations(transformation):
+    mesh = HorizontalCylinder(length=3.0, radius=1.0, nx=6, nr=2, ntheta=8, clever=False).mesh
+    mesh.faces_centers, mesh.center_of_mass_of_nodes, mesh.ff
+
+    transformed_mesh = transformation(mesh)
+    assert {'faces_centers', 'faces_normals', 'center_of_mass_of_nodes', 'f_f'} <= set(transformed_mesh.__internals__)
+
+    reference = Mesh(transformed_mesh.vertices, transformed_mesh.faces)
+    for prop in ('faces_areas', 'faces_normals', 'faces_centers', 'faces_radiuses', 'center_of_mass_of_nodes'):
+        assert np.allclose(getattr(transformed_mesh, prop), getattr(reference, prop))
+    assert transformed_mesh.ff == reference.ff
+    assert transformed_mesh == reference
+
+
 def test_symmetrized():
     from capytaine.meshes.symmetric import ReflectionSymmetricMesh
     sym = cylinder.merged().symmetrized(xOz_Plane)
@@ -140,6 +172,95 @@ def test_mesh_quality():
     cylinder.heal_mesh()
 
 
+def test_connectivity():
+    # Two quadrangles and a triangle sharing some edges
+    #  3---4---5
+    #  | 0 | 1 |
+    #  0---1---2
+    #       \2|
+    #         6
+    mesh = Mesh(vertices=[(0, 0, 0), (1, 0, 0), (2, 0, 0), (0, 1, 0), (1, 1, 0), (2, 1, 0), (2, -1, 0)],
+                faces=[(0, 1, 4, 3), (1, 2, 5, 4), (1, 6, 2, 1)])
+    assert mesh.vv[1] == {0, 2, 4, 6}
+    assert mesh.vf[1] == {0, 1, 2}
+    assert mesh.ff == {0: {1}, 1: {0, 2}, 2: {1}}
+    assert mesh.nb_boundaries == 1
+    assert set(mesh.boundaries[0]) == {0, 1, 2, 3, 4, 5, 6}
+
+    # Reverse one face and heal the mesh
+    mesh.faces = [(0, 1, 4, 3), (4, 5, 2, 1), (1, 6, 2, 1)]
+    assert mesh.ff_matrix[0, 1] == -1 and mesh.ff_matrix[1, 2] == -1
+    mesh.heal_normals()
+    assert np.allclose(mesh.faces_normals, (0, 0, 1))
+
+
+def test_heal_normals_of_long_strips():
+    # Two disconnected strips of 20 quadrangles, with some reversed faces, but not the first face of each strip.
+    n = 20
+    vertices = [(x, y, 0) for y in [0, 1, 3, 4] for x in range(n+1)]
+    faces = [(j*(n+1)+i, j*(n+1)+i+1, (j+1)*(n+1)+i+1, (j+1)*(n+1)+i) for j in [0, 2] for i in range(n)]
+    rng = np.random.default_rng(seed=0)
+    faces = [face[::-1] if i % n > 0 and rng.random() < 0.5 else face for i, face in enumerate(faces)]
+    mesh = Mesh(vertices, faces)
+    assert not np.allclose(mesh.faces_normals, (0, 0, 1))
+    mesh.heal_normals()
+    assert np.allclose(mesh.faces_normals, (0, 0, 1))
+
+
+def test_quadrature():
+    from capytaine.meshes.properties import compute_quadrilateral_quadrature, compute_triangle_quadrature
+    vertices = np.array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [3.0, 1.0, 0.0], [0.0, 1.0, 0.0], [1.0, 3.0, 1.0]])
+    faces = np.array([[0, 1, 2, 3], [3, 2, 4, 4]])  # The triangle does not follow the usual convention
+    mesh = Mesh(vertices, faces)
+
+    # Product of Gauss-Legendre rules on the square and three-point rule on the triangle
+    x, w = np.polynomial.legendre.leggauss(2)
+    square_points, square_weights = np.array([[xi, eta] for xi in x for eta in x]), np.outer(w, w).ravel()
+    triangle_points, triangle_weights = np.array([[2/3, 1/6, 1/6], [1/6, 2/3, 1/6], [1/6, 1/6, 2/3]]), np.ones(3)/3
+
+    for points, weights in [compute_quadrilateral_quadrature(mesh, square_points, square_weights),
+                            compute_triangle_quadrature(mesh, triangle_points, triangle_weights)]:
+        assert points.shape[:2] == weights.shape
+        assert np.allclose(weights.sum(axis=1), mesh.faces_areas)
+        assert np.allclose(np.einsum('fp,fpk->fk', weights, points), mesh.faces_areas[:, None] * mesh.faces_centers)
+
+
+def test_merge_duplicate_rows():
+    from capytaine.meshes.quality import merge_duplicate_rows
+    rows = np.array([[0.0, 0.0, 0.0],
+                     [1.0, 0.0, 0.0],
+                     [0.0, 0.0, 1e-9],  # Duplicate of the first row
+                     [1.0, 1.0, 0.0],
+                     [1.0+1e-9, 0.0, -1e-9],  # Duplicate of the second row
+                     [0.0, 0.0, 2e-8],  # Not a duplicate
+                     ])
+    unique_rows, new_ids = merge_duplicate_rows(rows, atol=1e-8)
+    assert unique_rows.shape == (4, 3)
+    assert new_ids[0] == new_ids[2]
+    assert new_ids[1] == new_ids[4]
+    assert len({new_ids[0], new_ids[1], new_ids[3], new_ids[5]}) == 4
+    assert np.allclose(unique_rows[new_ids], rows, atol=1e-8)
+
+    # Chains of close values are split in groups of width atol.
+    unique_rows, new_ids = merge_duplicate_rows(np.array([[0.0], [0.6e-8], [1.2e-8], [1.8e-8]]), atol=1e-8)
+    assert list(new_ids) == [0, 0, 1, 1]
+
+
+def test_merge_duplicate_rows_kept_rows():
+    """The same row is kept for each group of merged rows as in the former implementation, including the sign of zeros."""
+    from capytaine.meshes.quality import merge_duplicate_rows
+    rows = np.array([[1., -0., -0.], [0., 0., 0.], [0., 0., 0.], [1., -0., 1.], [-0., -0., 1.],
+                     [1., -0., -0.], [-0., 1., 0.], [1., 1., 0.], [-0., 1., -0.], [0., 1., 1.],
+                     [1., 0., 0.], [1., 0., -0.], [0., 0., -0.], [-0., -0., 0.], [0., 0., 0.],
+                     [1., -0., -0.], [0., -0., 1.], [-0., -0., 1.], [1., 1., -0.], [1., 1., -0.]])
+    kept_rows = np.array([[0., 0., 0.], [-0., -0., 1.], [-0., 1., 0.], [0., 1., 1.],
+                          [1., -0., -0.], [1., -0., 1.], [1., 1., -0.]])
+    unique_rows, new_ids = merge_duplicate_rows(rows, atol=1e-8)
+    assert np.array_equal(unique_rows, kept_rows)
+    assert np.array_equal(np.signbit(unique_rows), np.signbit(kept_rows))
+    assert np.array_equal(unique_rows[new_ids], rows)
+
+
 def test_clipper():
     """Test clipping of mesh."""
     mesh = Sphere(radius=5.0, ntheta=10).mesh.merged()
@@ -174,6 +295,36 @@ def test_clipper_indices(size):
                for i, face_id in enumerate(faces_ids))
 
 
+def test_clipper_crown_faces():
+    """Clip a quadrangle with two vertices above the plane, a triangle with one vertex above the plane
+    and a quadrangle with one vertex above the plane."""
+    vertices = np.array([[0.0, 0.0, -1.0], [1.0, 0.0, -1.0], [1.0, 0.0, 1.0], [0.0, 0.0, 1.0],
+                         [2.0, 0.0, -1.0], [3.0, 0.0, -1.0], [2.5, 0.0, 1.0],
+                         [4.0, 0.0, -1.0], [5.0, 0.0, -1.0], [5.0, 0.0, 1.0], [4.0, 0.0, 0.0]])
+    faces = np.array([[0, 1, 2, 3], [4, 5, 6, 4], [7, 8, 9, 10]])
+    mesh = Mesh(vertices, faces)
+    clipped_mesh = clip(mesh, plane=Plane(point=(0, 0, 0.5), normal=(0, 0, 1)))
+
+    assert list(clipped_mesh._clipping_data['faces_ids']) == [0, 1, 2, 2]
+    assert np.isclose(clipped_mesh.vertices[:, 2].max(), 0.5)
+    assert np.allclose(clipped_mesh.faces_areas[[0, 1]], [1.5, 15/16])
+    assert np.isclose(clipped_mesh.faces_areas[[2, 3]].sum(), 1.375)
+    assert np.allclose(clipped_mesh.faces_normals, mesh.faces_normals[[0, 1, 2, 2]])
+
+
+@pytest.mark.parametrize("position", [(0.0, 0.0, 0.0), (0.3, 0.1, 0.0), (-0.2, 0.0, -0.3), (5.0, 0.0, 0.0), (-5.0, 0.0, 0.0)])
+def test_immersed_parts(position):
+    mesh = Sphere(radius=1.0, ntheta=10, nphi=10, clever=False).mesh
+    draft, trim, heel = position
+    immersed_mesh, = mesh.immersed_parts([position])
+    reference = mesh.rotated_x(heel).rotated_y(trim).translated_z(-draft).keep_immersed_part()
+    assert immersed_mesh.nb_faces == reference.nb_faces
+    assert sorted(immersed_mesh._clipping_data['faces_ids']) == sorted(reference._clipping_data['faces_ids'])
+    assert np.isclose(immersed_mesh.faces_areas.sum(), reference.faces_areas.sum())
+    assert np.allclose(immersed_mesh.faces_areas @ immersed_mesh.faces_centers,
+                       reference.faces_areas @ reference.faces_centers)
+
+
 def test_clipper_corner_cases():
     mesh = sphere.translated_z(10.0)
 
@@ -196,3 +347,41 @@ def test_extract_one_face():
     i = 2
     one_face = sphere.extract_one_face(i)
     assert np.all(one_face.faces_centers[0] == sphere.faces_centers[i])
+
+
+def test_faces_view():
+    from capytaine.green_functions.delhommeau import Delhommeau
+    mesh = HorizontalCylinder(nx=6, ntheta=8, nr=2, center=(0, 0, -3), clever=False).mesh
+    assert mesh.nb_triangles > 0
+    ids = np.arange(3, mesh.nb_faces, 5)
+
+    view = mesh.faces_view(ids)
+    extracted = mesh.extract_faces(ids)
+    assert view.nb_faces == len(ids)
+    assert np.array_equal(view.triangles_ids, extracted.triangles_ids)
+    for prop in ('faces_areas', 'faces_centers', 'faces_normals', 'faces_radiuses'):
+        assert np.allclose(getattr(view, prop), getattr(extracted, prop))
+        assert np.all(view.__internals__[prop] == getattr(mesh, prop)[ids])
+
+    assert view.faces_view(slice(2, 4)).faces_centers.shape == (2, 3)
+
+    moved_view = mesh.faces_view(ids).translated_z(1.0)
+    assert np.allclose(moved_view.faces_centers, extracted.faces_centers + np.array([0, 0, 1]))
+
+    # Copies and pickles of the view do not include the parent mesh.
+    import pickle
+    for copied_view in (view.copy(name="copied_view"), pickle.loads(pickle.dumps(view)), moved_view):
+        assert type(copied_view) is Mesh
+        assert np.all(copied_view.faces_centers[:, 0:2] == view.faces_centers[:, 0:2])
+    assert view.copy(name="copied_view").name == "copied_view"
+    assert len(pickle.dumps(mesh.faces_view([0, 1]))) < len(pickle.dumps(mesh))/10
+
+    gf = Delhommeau()
+    S, K = gf.evaluate(mesh, mesh, wavenumber=1.0)
+    S_rows, K_rows = gf.evaluate(view, mesh, wavenumber=1.0)
+    assert np.allclose(S_rows, S[ids, :])
+    self_interaction = 0.5*(ids[:, None] == np.arange(mesh.nb_faces)[None, :])  # Only added when same_body=True
+    assert np.allclose(K_rows + self_interaction, K[ids, :])
+    S_cols, _ = gf.evaluate(mesh, view, wavenumber=1.0)
+    assert np.allclose(S_cols[~np.isin(np.arange(mesh.nb_faces), ids), :],
+                       S[~np.isin(np.arange(mesh.nb_faces), ids), :][:, ids])
@@ -54,6 +54,23 @@ def test_collection_of_meshes():
     assert isinstance(merged, Mesh)
 
 
+def test_cached_arrays_of_collections():
+    spheres = [Sphere(center=(0, 0, z), ntheta=4, nphi=4, clever=False).mesh for z in (-2.0, 2.0)]
+    inner = CollectionOfMeshes(spheres)
+    outer = CollectionOfMeshes([inner, Sphere(center=(4, 0, 0), ntheta=4, nphi=4, clever=False).mesh])
+
+    assert outer.faces_centers is outer.faces_centers  # Cached
+    assert outer.submesh_containing_face(outer.nb_faces - 1) == (1, outer[1].nb_faces - 1)
+    assert outer.indices_of_mesh(1) == slice(inner.nb_faces, outer.nb_faces)
+
+    # Modifying a sub-mesh or a sub-collection updates the arrays of the collection
+    spheres[0].translate_x(1.0)
+    assert np.allclose(outer.faces_centers[:spheres[0].nb_faces], spheres[0].faces_centers)
+    inner.translate_y(1.0)
+    assert np.allclose(outer.vertices[:inner.nb_vertices], inner.vertices)
+    assert np.allclose(outer.faces_centers, np.concatenate([inner.faces_centers, outer[1].faces_centers]))
+
+
 def test_collection():
     sphere = Sphere(name="foo", center=(0, 0, -2)).mesh
     other_sphere = Sphere(name="bar", center=(0, 0, 2)).mesh
@@ -42,3 +42,20 @@ def test_fill_dataset_with_kochin_functions():
     # Because of the symmetries of the body
     assert np.isclose(ds['kochin_diffraction'].sel(wave_direction=-pi/2, theta=0.0),
                       ds['kochin_diffraction'].sel(wave_direction=0.0, theta=pi/2))
+
+
+def test_batched_kochin_functions():
+    from capytaine.post_pro.kochin import compute_kochin, compute_kochins
+    sphere = cpt.Sphere(radius=1.0, center=(0.5, 0.0, -2.0), ntheta=6, nphi=6)
+    sphere.add_all_rigid_body_dofs()
+    solver = cpt.BEMSolver()
+    problems = [cpt.RadiationProblem(body=sphere, omega=omega, radiating_dof=dof, sea_bottom=-depth)
+                for omega in [0.5, 1.0] for dof in sphere.dofs for depth in [np.infty, 5.0]]
+    problems += [cpt.DiffractionProblem(body=sphere, omega=1.0, wave_direction=beta) for beta in [0.0, pi/3]]
+    results = solver.solve_all(problems)
+
+    theta = np.linspace(0.0, 2*pi, 11)
+    kochin = compute_kochins(results, theta, chunk_size=4)
+    assert kochin.shape == (len(results), len(theta))
+    for result, kochin_of_result in zip(results, kochin):
+        assert np.allclose(kochin_of_result, compute_kochin(result, theta))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import os
+import shutil
+
+import pytest
+
+from capytaine.ui import cli
+
+cylinder_case = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Nemoh_verification_cases", "Cylinder")
+
+
+def run_cli(monkeypatch, *args):
+    monkeypatch.setattr("sys.argv", ["capytaine", *args])
+    cli.main()
+
+
+@pytest.mark.parametrize("options", [["--linear-solver", "direct"], ["-j", "2"]])
+def test_cli_on_several_cal_files(tmp_path, monkeypatch, options):
+    reference_dir = tmp_path / "reference"
+    shutil.copytree(cylinder_case, reference_dir)
+    run_cli(monkeypatch, str(reference_dir / "Nemoh.cal"))
+
+    cases = [tmp_path / f"case_{i}" for i in range(2)]
+    for case in cases:
+        shutil.copytree(cylinder_case, case)
+    run_cli(monkeypatch, *options, *(str(case / "Nemoh.cal") for case in cases))
+
+    for case in cases:
+        for filename in ("RadiationCoefficients.tec", "ExcitationForce.tec"):
+            reference = (reference_dir / "results" / filename).read_text().split()
+            output = (case / "results" / filename).read_text().split()
+            assert len(output) == len(reference)
+            for word, reference_word in zip(output, reference):
+                try:
+                    assert float(word) == pytest.approx(float(reference_word), rel=1e-3, abs=1e-6)
+                except ValueError:
+                    assert word == reference_word
+
+
+def test_results_of_workers_share_the_body_of_the_main_process():
+    import pickle
+    from capytaine.io.legacy import import_cal_file
+    problems = import_cal_file(os.path.join(cylinder_case, "Nemoh.cal"))
+    body = problems[0].body
+
+    cli._init_solver(cli._solver_settings(cli.parser.parse_args([])))
+    tasks = cli._tasks(problems)
+    assert len(tasks) == 2  # One task per frequency.
+    # The results are pickled as they would be when sent back from a worker process.
+    sent_results = [pickle.dumps(cli._solve_problems(task)) for task in tasks]
+    assert all(len(sent) < len(pickle.dumps(body))/2 for sent in sent_results)
+
+    results = list(cli._results_with_body([body]*len(tasks), map(pickle.loads, sent_results)))
+    assert len(results) == len(problems)
+    assert all(result.body is body for result in results)
+
+
+def test_warning_for_pairs_geometry_cache_with_hierarchical_engine(caplog):
+    with caplog.at_level("WARNING"):
+        cli._solver_settings(cli.parser.parse_args(["--pairs-geometry-cache-size", "4"]))
+    assert len(caplog.records) == 0
+    with caplog.at_level("WARNING"):
+        cli._solver_settings(cli.parser.parse_args(["--engine", "hierarchical", "--pairs-geometry-cache-size", "4"]))
+    assert "hierarchical engine" in caplog.text